@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+데이터베이스 부트스트랩 벤치마크
+페이지 재실행마다 스키마 확인 + 기본 데이터 삭제/재삽입 + 샘플 데이터 COUNT 확인을 하던 방식과
+bootstrap() (적용 기록만 확인), st.cache_resource 로 감싼 경우(프로세스당 한 번)를 비교한다.
+
+실행: python benchmarks/bench_bootstrap.py [--reruns 200]
+"""
+
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_bootstrap import Seed, bootstrap
+from cnucnm_database import connect, close_all
+from cnucnm_migrations import migrate
+
+# 페이지별 기본 데이터 크기 (사료 원료 13종, NASEM 표준 20종)
+INGREDIENTS = [(f'원료{i}', '곡류', 88.0, 10.0, 2.8, 500) for i in range(13)]
+STANDARDS = [(f'N{i}', '%', '미네랄', 0.1, 0.3, 0.2) for i in range(20)]
+COUNT_CHECKED = ['growth_records', 'cost_records', 'revenue_records',
+                 'notification_settings', 'feed_inventory', 'health_records']
+
+
+def seed_feed_ingredients(conn):
+    conn.execute('DELETE FROM feed_ingredients')
+    conn.executemany('''
+        INSERT INTO feed_ingredients (ingredient_name, category, dry_matter, crude_protein, energy_mcal, price_per_kg)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', INGREDIENTS)
+
+
+def seed_nasem_standards(conn):
+    conn.execute('DELETE FROM nasem_standards')
+    conn.executemany('''
+        INSERT INTO nasem_standards (nutrient_name, unit, category, min_value, max_value, recommended_value)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', STANDARDS)
+
+
+def seed_counted(table):
+    def seed(conn):
+        conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()
+    return seed
+
+
+SEEDS = ([Seed('feed_ingredients', 1, seed_feed_ingredients), Seed('nasem_standards', 1, seed_nasem_standards)]
+         + [Seed(table, 1, seed_counted(table)) for table in COUNT_CHECKED])
+
+
+def rerun_every_time(db_path):
+    """비교용: 이전 방식 (재실행마다 네 페이지 초기화 함수가 하던 일)"""
+    conn = connect(db_path)
+    migrate(conn)
+    for seed in SEEDS:
+        seed.apply(conn)
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reruns', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        first = bootstrap(SEEDS, db_path)
+        print(f"첫 부트스트랩 (마이그레이션 {first['migrations']}, 기본 데이터 {len(first['seeds'])}종) "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        cached = functools.lru_cache(maxsize=None)(lambda: bootstrap(SEEDS, db_path))   # st.cache_resource 대용
+        results = {}
+        for name, run in [('재실행마다 초기화 (이전)', lambda: rerun_every_time(db_path)),
+                          ('bootstrap() 매번 호출', lambda: bootstrap(SEEDS, db_path)),
+                          ('캐시된 초기화 (프로세스당 한 번)', cached)]:
+            start = time.perf_counter()
+            for _ in range(args.reruns):
+                run()
+            results[name] = (time.perf_counter() - start) / args.reruns
+        close_all()
+
+    print(f"페이지 재실행 {args.reruns}회 평균")
+    for name, seconds in results.items():
+        print(f"  {name:<24}{seconds * 1000:>10.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
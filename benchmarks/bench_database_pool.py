@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SQLite 연결 풀 벤치마크
+대시보드 한 번 그리기에 해당하는 조회 묶음을 쿼리마다 새로 연결하는 방식(sqlite3.connect/close)과
+연결 풀(cnucnm_database.connect) 방식으로 실행해 비교한다. 여러 스레드 동시 실행과 쓰기도 측정한다.
+
+실행: python benchmarks/bench_database_pool.py [--renders 200] [--threads 8]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_database import connect, pool_metrics, close_all
+
+# 대시보드 한 번에 실행되는 조회 (동물 관리/리포트/알림 페이지에서 쓰는 형태)
+DASHBOARD_QUERIES = [
+    "SELECT COUNT(*) FROM animals",
+    "SELECT species, COUNT(*) FROM animals GROUP BY species",
+    "SELECT gender, COUNT(*) FROM animals GROUP BY gender",
+    "SELECT COUNT(*) FROM animals WHERE status = 'active'",
+    "SELECT AVG(current_weight) FROM animals WHERE current_weight > 0",
+    "SELECT measurement_date, weight FROM weight_records WHERE animal_id = 7 ORDER BY measurement_date",
+    "SELECT animal_id, AVG(weight) FROM weight_records WHERE measurement_date >= '2026-01-01' GROUP BY animal_id",
+    "SELECT * FROM animals ORDER BY created_at DESC LIMIT 50",
+] * 3
+
+
+def write_database(path, n_animals=2000, records_per_animal=10, seed=0):
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE animals (id INTEGER PRIMARY KEY AUTOINCREMENT, animal_id TEXT UNIQUE, species TEXT, gender TEXT,
+                              status TEXT DEFAULT 'active', current_weight REAL,
+                              created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE weight_records (id INTEGER PRIMARY KEY AUTOINCREMENT, animal_id INTEGER, weight REAL NOT NULL,
+                                     measurement_date DATE NOT NULL, notes TEXT);
+        CREATE INDEX idx_weight_records_animal_date ON weight_records (animal_id, measurement_date);
+    ''')
+    conn.executemany('INSERT INTO animals (animal_id, species, gender, current_weight) VALUES (?, ?, ?, ?)',
+                     [(f'ANM{i:05d}', ['소', '염소'][i % 2], ['수컷', '암컷'][i % 2], float(w))
+                      for i, w in enumerate(rng.uniform(200, 700, n_animals))])
+    conn.executemany('INSERT INTO weight_records (animal_id, weight, measurement_date) VALUES (?, ?, ?)',
+                     [(i, 400.0 + d, f'2026-{1 + d % 12:02d}-01') for i in range(1, n_animals + 1)
+                      for d in range(records_per_animal)])
+    conn.commit()
+    conn.close()
+
+
+def render_raw(path):
+    for query in DASHBOARD_QUERIES:
+        conn = sqlite3.connect(path)
+        pd.read_sql_query(query, conn)
+        conn.close()
+
+
+def render_pooled(path):
+    for query in DASHBOARD_QUERIES:
+        conn = connect(path)
+        pd.read_sql_query(query, conn)
+        conn.close()
+
+
+def write_raw(path, i):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('INSERT INTO weight_records (animal_id, weight, measurement_date) VALUES (?, ?, ?)',
+                 (i % 100 + 1, 500.0, '2026-12-01'))
+    conn.commit()
+    conn.close()
+
+
+def write_pooled(path, i):
+    conn = connect(path)
+    conn.execute('INSERT INTO weight_records (animal_id, weight, measurement_date) VALUES (?, ?, ?)',
+                 (i % 100 + 1, 500.0, '2026-12-01'))
+    conn.commit()
+    conn.close()
+
+
+def timed(function, path, renders, threads):
+    start = time.perf_counter()
+    if threads == 1:
+        for i in range(renders):
+            function(path) if function in (render_raw, render_pooled) else function(path, i)
+    else:
+        with ThreadPoolExecutor(threads) as executor:
+            if function in (render_raw, render_pooled):
+                list(executor.map(lambda _: function(path), range(renders)))
+            else:
+                list(executor.map(lambda i: function(path, i), range(renders)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=200)
+    parser.add_argument('--animals', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        raw_path, pooled_path = os.path.join(directory, 'raw.db'), os.path.join(directory, 'pooled.db')
+        write_database(raw_path, args.animals)
+        write_database(pooled_path, args.animals)
+
+        print(f"대시보드 {args.renders}회 (회당 쿼리 {len(DASHBOARD_QUERIES)}개, 동물 {args.animals}두)")
+        for threads in (1, args.threads):
+            raw = timed(render_raw, raw_path, args.renders, threads)
+            pooled = timed(render_pooled, pooled_path, args.renders, threads)
+            print(f"  스레드 {threads:>2}: 쿼리마다 연결 {raw * 1000:>8.1f} ms, 연결 풀 {pooled * 1000:>8.1f} ms "
+                  f"({raw / pooled:.1f}배)")
+
+        raw = timed(write_raw, raw_path, args.writes, args.threads)
+        pooled = timed(write_pooled, pooled_path, args.writes, args.threads)
+        print(f"쓰기 {args.writes}건 (스레드 {args.threads}, 건마다 커밋): 기본 설정 {raw * 1000:.1f} ms, "
+              f"연결 풀(WAL, synchronous=NORMAL) {pooled * 1000:.1f} ms ({raw / pooled:.1f}배)")
+
+        metrics = pool_metrics(pooled_path)[0]
+        print(f"풀 통계: 생성 {metrics['created']}, 재사용 {metrics['reused']:,} "
+              f"(재사용률 {metrics['reuse_ratio']:.1%}), 최대 동시 사용 {metrics['peak_in_use']}, "
+              f"유휴 {metrics['idle']}, 롤백 {metrics['rolled_back']}")
+        close_all()
+
+
+if __name__ == '__main__':
+    main()
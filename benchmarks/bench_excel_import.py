@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Excel 통합문서 수식 가져오기 벤치마크
+시트 간 참조/범위/공유 수식이 있는 합성 통합문서(수식 약 27,000개)를 만들어
+스트리밍 가져오기, 바이너리 캐시 로드, 컴파일/계산 시간과 Excel 저장 값과의 일치를 확인한다.
+저장소의 통합문서(사료배합비_calculation_S1.xlsx, 0824.xlsx)도 가져와 요약한다.
+
+실행: python benchmarks/bench_excel_import.py [--rows 4500] [--trace-memory]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cnucnm_excel_import import import_workbook, load_workbook_graph, iter_cells, cell_name
+
+FIXTURES = ['사료배합비_calculation_S1.xlsx', '0824.xlsx']
+RUMEN, INTESTINE = '반추위 모델', '소장 모델'
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '</Types>'
+)
+_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def _cell(ref, value=None, formula=None, shared=None):
+    parts = [f'<c r="{ref}"' + (' t="str"' if isinstance(value, str) else '') + '>']
+    if formula is not None or shared is not None:
+        attributes = ''
+        if shared is not None:
+            index, shared_ref = shared
+            attributes = f' t="shared" si="{index}"' + (f' ref="{shared_ref}"' if shared_ref else '')
+        parts.append(f'<f{attributes}>{escape(formula)}</f>' if formula else f'<f{attributes}/>')
+    if value is not None:
+        parts.append(f'<v>{escape(value) if isinstance(value, str) else repr(float(value))}</v>')
+    parts.append('</c>')
+    return ''.join(parts)
+
+
+def _sheet_xml(rows):
+    body = ''.join(f'<row r="{r}">{"".join(cells)}</row>' for r, cells in sorted(rows.items()))
+    return f'<?xml version="1.0" encoding="UTF-8"?><worksheet xmlns="{_MAIN}"><sheetData>{body}</sheetData></worksheet>'
+
+
+def synthetic_workbook(path, n_rows, seed=0):
+    """반추위/소장 모델 두 시트의 합성 통합문서 (Excel 저장 값 포함), 반환값: 수식 수"""
+    rng = np.random.default_rng(seed)
+    a = rng.uniform(1, 10, n_rows)
+    b = a * 2 + a[0]
+    c = (a + b) / 2
+    d = np.where(b > 10, b - 10, 0.0)
+    x = c * 0.5 + d
+    y = np.maximum(x, 1) + np.sqrt(x)
+    z = np.round(y * 1.5, 2)
+
+    rumen, intestine = {}, {}
+    quoted = f"'{RUMEN}'"
+    for i in range(n_rows):
+        r = i + 1
+        master = i == 0
+        rumen[r] = [
+            _cell(f'A{r}', a[i]),
+            # B열은 공유 수식 (첫 셀만 수식 본문)
+            _cell(f'B{r}', b[i], 'A1*2+$A$1' if master else None, (0, f'B1:B{n_rows}' if master else None)),
+            _cell(f'C{r}', c[i], f'SUM(A{r}:B{r})/2'),
+            _cell(f'D{r}', d[i], f'IF(B{r}>10,B{r}-10,0)'),
+        ]
+        intestine[r] = [
+            _cell(f'A{r}', x[i], f'{quoted}!C{r}*0.5+{quoted}!D{r}'),
+            _cell(f'B{r}', y[i], f'MAX(A{r},1)+SQRT(A{r})'),
+            _cell(f'C{r}', z[i], f'ROUND(B{r}*1.5,2)'),
+            _cell(f'D{r}', x[i] * 2, f'{quoted}!C{r}+{quoted}!D{r}*2'),
+        ]
+    intestine[1].append(_cell('E1', x.sum(), f'SUM(A1:A{n_rows})'))
+    intestine[2].append(_cell('E2', 0.0, 'VLOOKUP(A1,A1:B10,2,0)'))   # 지원하지 않는 함수
+    intestine[3].append(_cell('E3', '계산값', '"계산값"&A1'))          # 문자열 수식
+    # 연산자 우선순위 (부호가 ^보다 먼저, ^는 왼쪽 결합)
+    intestine[4].append(_cell('E4', x[0] ** 2, '-A1^2'))
+    intestine[5].append(_cell('E5', 64.0, '2^3^2'))
+    intestine[6].append(_cell('E6', 1 - (-2.0) ** 2 * 0.5, '1--2^2*2^-1'))
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('xl/workbook.xml', (
+            f'<?xml version="1.0" encoding="UTF-8"?><workbook xmlns="{_MAIN}" xmlns:r="{_REL}"><sheets>'
+            f'<sheet name="{RUMEN}" sheetId="1" r:id="rId1"/><sheet name="{INTESTINE}" sheetId="2" r:id="rId2"/>'
+            '</sheets></workbook>'))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{_REL}/worksheet" Target="/xl/worksheets/sheet2.xml"/>'
+            '</Relationships>'))
+        archive.writestr('xl/worksheets/sheet1.xml', _sheet_xml(rumen))
+        archive.writestr('xl/worksheets/sheet2.xml', _sheet_xml(intestine))
+    return n_rows * 7 + 6
+
+
+def cached_values(path):
+    """비교용: 수식 셀의 Excel 저장 값 {노드 이름: 값}"""
+    return {cell_name(sheet, ref): value for sheet, ref, formula, value in iter_cells(path)
+            if formula is not None and isinstance(value, float)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=4500)
+    parser.add_argument('--trace-memory', action='store_true', help='가져오기 최대 메모리 측정 (tracemalloc, 느림)')
+    args = parser.parse_args()
+
+    for fixture in FIXTURES:
+        graph, report = import_workbook(ROOT / fixture)
+        print(f"{fixture}: 시트 {len(report['sheets'])}개 {report['sheets']}, 수식 {report['formulas']}개, "
+              f"숫자 상수 {report['constants']}개, 문자열 셀 {report['text_cells']}개")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'synthetic_model.xlsm')
+        n_formulas = synthetic_workbook(path, args.rows)
+        cache_path = path + '.cache'
+
+        start = time.perf_counter()
+        graph, report = load_workbook_graph(path, cache_path)
+        import_time = time.perf_counter() - start
+
+        memory = ''
+        if args.trace_memory:
+            tracemalloc.start()
+            import_workbook(path)
+            memory = f" (최대 메모리 {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB)"
+            tracemalloc.stop()
+
+        start = time.perf_counter()
+        cached_graph, cached_report = load_workbook_graph(path, cache_path)
+        cache_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = cached_graph.compile()
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = plan.evaluate()
+        evaluate_time = time.perf_counter() - start
+
+        expected = cached_values(path)
+        compared = [name for name in expected if plan.slots.get(name) in plan.dependency_slots]
+        mismatches = [name for name in compared if not np.isclose(result[name], expected[name])]
+
+        print(f"합성 통합문서: 수식 셀 {n_formulas:,}개 (.xlsm {os.path.getsize(path) / 1e6:.1f} MB)")
+        print(f"  가져오기(스트리밍)  {import_time * 1000:>10.1f} ms{memory}")
+        print(f"  캐시 로드          {cache_time * 1000:>10.1f} ms (캐시 {os.path.getsize(cache_path) / 1e6:.1f} MB, "
+              f"사용={cached_report['cached']})")
+        print(f"  위상 정렬+컴파일   {compile_time * 1000:>10.1f} ms")
+        print(f"  전체 계산          {evaluate_time * 1000:>10.2f} ms")
+        print(f"  변환 수식 {report['formulas']:,}개, 변환 불가 {len(report['unsupported'])}개: "
+              f"{[(name, reason) for name, _, reason in report['unsupported']]}")
+        print(f"  Excel 저장 값과 불일치 {len(mismatches)}개 / {len(compared):,}개")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+수식 그래프 엔진 벤치마크
+Excel 통합문서 규모(수식 27,061개)의 합성 수식 그래프로 파싱/컴파일/전체 계산 시간과
+계획 캐시 파일을 사용하는 시작 시간 측정
+
+실행: python benchmarks/bench_formula_engine.py [--formulas 27061] [--inputs 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_formula_engine import FormulaGraph, FormulaNode, load_formula_graph, load_formula_plan
+
+OPERATORS = [' + ', ' - ', ' x ', ' / ']
+
+
+def synthetic_graph(n_formulas, n_inputs, seed=0):
+    """앞선 노드만 참조하는 임의 수식 그래프 (입력값 기본값 포함)"""
+    rng = np.random.default_rng(seed)
+    graph = FormulaGraph()
+    names = [f"입력_{i}" for i in range(n_inputs)]
+    for name in names:
+        graph.add(FormulaNode(name))
+        graph.set_default(name, float(rng.uniform(1, 10)))
+
+    for i in range(n_formulas):
+        n_terms = int(rng.integers(1, 5))
+        # 최근 노드를 더 자주 참조 (깊은 계층 구조)
+        picks = np.minimum(len(names) - 1 - rng.geometric(0.002, n_terms), len(names) - 1)
+        terms = [names[max(int(j), 0)] for j in picks]
+        body = terms[0]
+        for term in terms[1:]:
+            body += OPERATORS[int(rng.integers(len(OPERATORS) - 1))] + term
+        body = f"({body}) x {rng.uniform(0.5, 1.5):.3f}" if rng.random() < 0.5 else body
+        name = f"수식_{i}"
+        graph.add(FormulaNode(name, f"{name} = {body}", level=0))
+        names.append(name)
+    return graph
+
+
+def naive_evaluate(graph, order, defaults):
+    """비교용: 수식마다 딕셔너리 조회로 해석 실행"""
+    values = dict(defaults)
+    for name in order:
+        node = graph.nodes[name]
+        stack = []
+        for kind, value in node.tokens:
+            stack.append(f"values[{value!r}]" if kind == 'name' else value)
+        values[name] = eval(' '.join(stack), {'values': values})
+    return values
+
+
+def write_database(graph, directory):
+    """합성 그래프를 CNUCNM_Database.json 형식(+ 빈 SQL)으로 저장"""
+    json_path = os.path.join(directory, 'CNUCNM_Database.json')
+    sql_path = os.path.join(directory, 'CNUCNM_Database.sql')
+    data = {
+        'formulas': [{'name': name, 'expression': node.expression, 'level': node.level}
+                     for name, node in graph.nodes.items() if not node.is_input],
+        'input_values': [{'name': name, 'default_value': value} for name, value in graph.defaults.items()]
+    }
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    with open(sql_path, 'w', encoding='utf-8') as f:
+        f.write('')
+    return json_path, sql_path
+
+
+def cold_start(graph, repeat):
+    """원본 파싱+컴파일 대비 계획 캐시(메모리 매핑) 로드 시간"""
+    with tempfile.TemporaryDirectory() as directory:
+        json_path, sql_path = write_database(graph, directory)
+        start = time.perf_counter()
+        plan = load_formula_graph(json_path, sql_path).compile()
+        parse_compile = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_formula_plan(json_path, sql_path)   # 캐시 파일 생성
+        first = time.perf_counter() - start
+
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cached = load_formula_plan(json_path, sql_path)
+            times.append(time.perf_counter() - start)
+        size = os.path.getsize(json_path + '.plan')
+        expected, result = plan.evaluate(), cached.evaluate()
+        mismatches = sum(1 for name in plan.order if not np.isclose(result[name], expected[name], equal_nan=True))
+    return parse_compile, first, float(np.median(times)), size, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--formulas', type=int, default=27061)
+    parser.add_argument('--inputs', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = synthetic_graph(args.formulas, args.inputs)
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plan = graph.compile()
+    compile_time = time.perf_counter() - start
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = plan.evaluate()
+        times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    naive = naive_evaluate(graph, plan.order, graph.defaults)
+    naive_time = time.perf_counter() - start
+
+    mismatches = sum(1 for name in plan.order if not np.isclose(result[name], naive[name], equal_nan=True))
+
+    # 입력값 하나씩 바꿀 때의 증분 재계산
+    session = plan.session()
+    start = time.perf_counter()
+    session.plan.node_functions
+    node_compile = time.perf_counter() - start
+    rng = np.random.default_rng(1)
+    update_times, evaluated = [], []
+    for _ in range(args.repeat * 5):
+        name = plan.inputs[int(rng.integers(len(plan.inputs)))]
+        start = time.perf_counter()
+        evaluated.append(session.update({name: float(rng.uniform(1, 10))}))
+        update_times.append(time.perf_counter() - start)
+    print(f"수식 {len(plan):,}개, 입력값 {len(plan.inputs):,}개")
+    print(f"  파싱            {parse * 1000:>10.1f} ms")
+    print(f"  위상 정렬+컴파일 {compile_time * 1000:>10.1f} ms (1회)")
+    print(f"  전체 계산        {np.median(times) * 1000:>10.2f} ms (중앙값, {args.repeat}회)")
+    print(f"  수식별 해석 실행 {naive_time * 1000:>10.1f} ms (비교용)")
+    print(f"  결과 불일치      {mismatches}개")
+    print(f"  수식별 함수 컴파일 {node_compile * 1000:>8.1f} ms (증분 계산 최초 1회)")
+    print(f"  입력값 1개 변경   {np.median(update_times) * 1000:>10.3f} ms (중앙값), "
+          f"재계산 수식 중앙값 {int(np.median(evaluated)):,}개 / 최대 {max(evaluated):,}개")
+
+    parse_compile, first, cached, size, cache_mismatches = cold_start(graph, min(args.repeat, 5))
+    print(f"  시작: JSON 파싱+컴파일 {parse_compile * 1000:>8.1f} ms")
+    print(f"  시작: 캐시 생성(최초) {first * 1000:>9.1f} ms")
+    print(f"  시작: 캐시 로드(mmap) {cached * 1000:>9.1f} ms (캐시 {size / 1e6:.1f} MB, 결과 불일치 {cache_mismatches}개)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+우군 단위 수식 계산 벤치마크
+두수별 입력값 배열로 수식 그래프 전체를 벡터 계산(evaluate_herd)한 시간과
+개체마다 계산 계획을 실행하는 Python 반복문을 비교
+
+실행: python benchmarks/bench_formula_herd.py [--herd 5000] [--formulas 27061] [--loop-sample 200]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_formula_engine import load_formula_graph
+from bench_formula_engine import synthetic_graph
+
+
+def herd_inputs(plan, herd_size, seed=0):
+    """입력값마다 기본값(없으면 1) 주변 ±20% 두수별 배열"""
+    rng = np.random.default_rng(seed)
+    inputs = {}
+    for name in plan.inputs:
+        default = plan.defaults.get(name)
+        center = float(default) if default else 1.0
+        inputs[name] = center * rng.uniform(0.8, 1.2, herd_size)
+    return inputs
+
+
+def per_animal_loop(plan, inputs, animals):
+    """비교용: 개체마다 입력값 딕셔너리를 만들어 전체 계산"""
+    results = []
+    for i in animals:
+        results.append(plan.evaluate({name: float(values[i]) for name, values in inputs.items()}))
+    return results
+
+
+def compare(label, plan, herd_size, loop_sample, outputs):
+    inputs = herd_inputs(plan, herd_size)
+
+    start = time.perf_counter()
+    herd = plan.evaluate_herd(inputs, outputs)
+    herd_time = time.perf_counter() - start
+
+    sample = np.linspace(0, herd_size - 1, min(loop_sample, herd_size)).astype(int)
+    start = time.perf_counter()
+    looped = per_animal_loop(plan, inputs, sample)
+    loop_time = (time.perf_counter() - start) / len(sample) * herd_size
+
+    mismatches = sum(1 for k, i in enumerate(sample) for name in outputs
+                     if not np.isclose(herd[name][i], looped[k][name], equal_nan=True))
+    print(f"{label}: 수식 {len(plan):,}개, 입력값 {len(plan.inputs):,}개, {herd_size:,}두")
+    print(f"  벡터 계산        {herd_time * 1000:>12.1f} ms")
+    print(f"  개체별 반복문    {loop_time * 1000:>12.1f} ms (표본 {len(sample)}두 기준 환산)")
+    print(f"  속도 향상        {loop_time / herd_time:>12.1f} 배")
+    print(f"  결과 불일치      {mismatches}개 (표본 {len(sample)}두 × 출력 {len(outputs)}개)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--herd', type=int, default=5000)
+    parser.add_argument('--formulas', type=int, default=27061)
+    parser.add_argument('--inputs', type=int, default=2000)
+    parser.add_argument('--loop-sample', type=int, default=200)
+    args = parser.parse_args()
+
+    # CNUCNM 수식 DB (MP/ME 등 53개 수식)
+    plan = load_formula_graph().compile()
+    compare('CNUCNM 수식 DB', plan, args.herd, args.herd, plan.names)
+
+    # Excel 통합문서 규모 합성 그래프 (마지막 수식 100개만 반환)
+    plan = synthetic_graph(args.formulas, args.inputs).compile()
+    compare('합성 수식 그래프', plan, args.herd, args.loop_sample, plan.order[-100:])
+
+
+if __name__ == '__main__':
+    main()
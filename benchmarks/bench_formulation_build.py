@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+사료 배합 모델 생성/풀이 시간 벤치마크
+기존 DataFrame 조회 방식과 행렬 기반 엔진을 원료 13, 200, 2,000개에서 비교
+
+실행: python benchmarks/bench_formulation_build.py [--skip-legacy]
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pulp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_formulation_engine import (
+    IngredientMatrix, build_formulation_lp, solve_lp, summarize_formulation, NUTRIENT_COLUMNS
+)
+
+DB_PATH = Path(__file__).resolve().parent.parent / 'cnucnm_data' / 'cnucnm.db'
+SIZES = [13, 200, 2000]
+TARGETS = (2.6, 20.0, 90.0)  # 에너지, 단백질, 건물 (기본 원료로 실행 가능한 목표)
+
+
+def load_library(n_ingredients, seed=0):
+    """기본 원료 13종을 기준으로 ±10% 변동을 준 합성 원료 라이브러리 생성"""
+    conn = sqlite3.connect(DB_PATH)
+    base = pd.read_sql_query('SELECT * FROM feed_ingredients ORDER BY id', conn)
+    conn.close()
+
+    if n_ingredients <= len(base):
+        return base.head(n_ingredients).reset_index(drop=True)
+
+    rng = np.random.default_rng(seed)
+    extra = base.sample(n_ingredients - len(base), replace=True, random_state=seed).reset_index(drop=True)
+    for col in NUTRIENT_COLUMNS + ['price_per_kg']:
+        extra[col] = extra[col] * rng.uniform(0.9, 1.1, len(extra))
+    extra['ingredient_name'] = [f"{name}_{i}" for i, name in enumerate(extra['ingredient_name'])]
+    extra['min_inclusion'] = 0.0  # 합성 원료는 최소 함량 제한 없음
+
+    return pd.concat([base, extra], ignore_index=True)
+
+
+def legacy_optimize(ingredients_df, target_energy, target_protein, target_dry_matter):
+    """기존 방식: 원료명으로 DataFrame을 매번 조회하며 제약조건 생성"""
+    prob = pulp.LpProblem("Feed_Formulation_Optimization", pulp.LpMinimize)
+    names = ingredients_df['ingredient_name']
+    ingredient_vars = pulp.LpVariable.dicts("Ingredient", range(len(names)), lowBound=0, upBound=1)
+    var = dict(zip(names, ingredient_vars.values()))
+
+    def lookup(name, col):
+        return ingredients_df[ingredients_df['ingredient_name'] == name][col].iloc[0]
+
+    def expr(col):
+        return pulp.lpSum([var[name] * lookup(name, col) for name in names])
+
+    prob += pulp.lpSum([var[name] for name in names]) == 1.0
+    energy, protein = expr('energy_mcal'), expr('crude_protein')
+    prob += energy >= target_energy * 0.95
+    prob += energy <= target_energy * 1.05
+    prob += protein >= target_protein * 0.95
+    prob += protein <= target_protein * 1.05
+    prob += expr('dry_matter') >= target_dry_matter * 0.95
+    for _, row in ingredients_df.iterrows():
+        prob += var[row['ingredient_name']] <= row['max_inclusion'] / 100.0
+        prob += var[row['ingredient_name']] >= row['min_inclusion'] / 100.0
+    ndf = expr('ndf')
+    prob += ndf >= 25.0
+    prob += ndf <= 35.0
+    ca, p = expr('ca'), expr('p')
+    prob += ca >= 1.5 * p
+    prob += ca <= 2.5 * p
+    prob += expr('price_per_kg')
+
+    build_done = time.perf_counter()
+    prob.solve(pulp.PULP_CBC_CMD(msg=False))
+    return build_done, pulp.LpStatus[prob.status], pulp.value(prob.objective)
+
+
+def bench_legacy(df):
+    start = time.perf_counter()
+    build_done, status, cost = legacy_optimize(df, *TARGETS)
+    end = time.perf_counter()
+    return build_done - start, end - build_done, status, cost
+
+
+def bench_matrix(df):
+    start = time.perf_counter()
+    matrix = IngredientMatrix.from_dataframe(df)
+    lp = build_formulation_lp(matrix, *TARGETS)
+    build_done = time.perf_counter()
+    status, ratios = solve_lp(lp, solver='pulp')  # 기존 방식과 같은 CBC로 비교
+    cost = None
+    if ratios is not None:
+        cost = summarize_formulation(matrix, ratios, *TARGETS)['total_cost']
+    end = time.perf_counter()
+    return build_done - start, end - build_done, status, cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skip-legacy', action='store_true', help='기존 방식 측정 생략')
+    args = parser.parse_args()
+
+    print(f"{'원료 수':>8} {'방식':>8} {'생성(ms)':>10} {'풀이(ms)':>10} {'합계(ms)':>10} {'상태':>12} {'비용':>10}")
+    for n in SIZES:
+        df = load_library(n)
+        runs = [('matrix', bench_matrix)]
+        if not args.skip_legacy:
+            runs.insert(0, ('legacy', bench_legacy))
+        for label, fn in runs:
+            build, solve, status, cost = fn(df)
+            cost_text = f"{cost:.1f}" if cost is not None else '-'
+            print(f"{n:>8} {label:>8} {build * 1000:>10.1f} {solve * 1000:>10.1f} "
+                  f"{(build + solve) * 1000:>10.1f} {status:>12} {cost_text:>10}")
+
+
+if __name__ == '__main__':
+    main()
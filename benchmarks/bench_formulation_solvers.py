@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+사료 배합 솔버 백엔드 벤치마크
+feed_ingredients 기본 원료로 목표값 격자를 풀어 백엔드별 지연시간과 결과 일치도를 비교
+
+실행: python benchmarks/bench_formulation_solvers.py [--sizes 13 200]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cnucnm_formulation_engine import IngredientMatrix, FormulationModel, SOLVER_BACKENDS
+from bench_formulation_build import load_library
+
+# 목표 에너지(Mcal/kg DM) × 단백질(%) 격자, 건물 90%
+ENERGY_GRID = np.arange(2.0, 3.01, 0.1)
+PROTEIN_GRID = np.arange(12.0, 24.01, 1.0)
+TARGET_DRY_MATTER = 90.0
+
+
+def run_backend(model, name, targets):
+    """목표값 격자 전체를 풀고 (지연시간 목록, 상태 목록, 해 목록) 반환"""
+    solver = SOLVER_BACKENDS[name]
+    latencies, statuses, solutions = [], [], []
+    for target in targets:
+        lp = model.lp(*target)
+        start = time.perf_counter()
+        status, ratios = solver.solve(lp)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(status)
+        solutions.append(ratios)
+    return np.array(latencies), statuses, solutions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[13], help='원료 수 (13 = 기본 원료만)')
+    args = parser.parse_args()
+
+    targets = [(e, p, TARGET_DRY_MATTER) for e in ENERGY_GRID for p in PROTEIN_GRID]
+
+    for n in args.sizes:
+        matrix = IngredientMatrix.from_dataframe(load_library(n))
+        model = FormulationModel(matrix)
+        results = {name: run_backend(model, name, targets) for name in SOLVER_BACKENDS}
+
+        print(f"\n원료 {n}개, 목표 {len(targets)}건")
+        print(f"{'백엔드':>8} {'평균(ms)':>10} {'중앙값(ms)':>11} {'p95(ms)':>10} {'최적해 수':>10}")
+        for name, (latencies, statuses, _) in results.items():
+            print(f"{name:>8} {latencies.mean() * 1000:>10.2f} {np.median(latencies) * 1000:>11.2f} "
+                  f"{np.percentile(latencies, 95) * 1000:>10.2f} {statuses.count('Optimal'):>10}")
+
+        # 결과 일치도: 상태 일치, 최적 비용 차이
+        names = list(results)
+        base, other = results[names[0]], results[names[1]]
+        status_match = sum(a == b for a, b in zip(base[1], other[1]))
+        cost_gaps = [
+            abs(matrix.prices @ x - matrix.prices @ y) / max(abs(matrix.prices @ x), 1.0)
+            for x, y in zip(base[2], other[2]) if x is not None and y is not None
+        ]
+        print(f"상태 일치: {status_match}/{len(targets)}")
+        if cost_gaps:
+            print(f"최적 비용 상대 오차: 최대 {max(cost_gaps):.2e}, 평균 {np.mean(cost_gaps):.2e}")
+
+
+if __name__ == '__main__':
+    main()
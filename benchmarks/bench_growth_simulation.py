@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+성장 시뮬레이션 벤치마크
+개체 × 사료 시나리오 격자를 한 번에 적분하는 배열 계산(simulate_growth)과
+개체/시나리오마다 365일을 스칼라로 반복하는 계산을 비교한다.
+
+실행: python benchmarks/bench_growth_simulation.py [--animals 1000] [--scenarios 50]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cnucnm_growth_simulation as growth
+from cnucnm_growth_simulation import simulate_growth, SIMULATION_DAYS
+from cnucnm_nasem_requirements import maintenance_requirements, DRY_MATTER_INTAKE_RATIO, GROWTH_PROTEIN
+
+
+def scalar_trajectory(weight, energy_mcal_kg, days=SIMULATION_DAYS,
+                      protein_percent=growth.REFERENCE_PROTEIN_PERCENT):
+    """비교용: 한 개체/시나리오를 하루씩 스칼라로 적분 (유지 단계)"""
+    trajectory = [weight]
+    for _ in range(days):
+        maintenance_energy, maintenance_protein = maintenance_requirements(weight)
+        intake = weight * DRY_MATTER_INTAKE_RATIO
+        energy_balance = intake * energy_mcal_kg * 1000 - maintenance_energy
+        protein_balance = intake * protein_percent * 10 * growth.PROTEIN_EFFICIENCY - maintenance_protein
+        if energy_balance >= 0:
+            retained_energy = energy_balance * growth.GAIN_EFFICIENCY / 1000
+            energy_gain = (growth.EMPTY_BODY_GAIN_COEFFICIENT * retained_energy ** growth.RETAINED_ENERGY_EXPONENT
+                           * (weight * growth.EMPTY_BODY_RATIO) ** growth.EMPTY_BODY_WEIGHT_EXPONENT
+                           / growth.EMPTY_GAIN_RATIO)
+            maturity = max(1 - (weight / growth.MATURE_WEIGHT) ** growth.MATURITY_EXPONENT, 0.0)
+            gain = min(energy_gain, max(protein_balance, 0.0) / GROWTH_PROTEIN) * maturity
+        else:
+            gain = energy_balance / (growth.MOBILIZED_ENERGY * 1000)
+        weight += gain
+        trajectory.append(weight)
+    return trajectory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--animals', type=int, default=1000)
+    parser.add_argument('--scenarios', type=int, default=50)
+    parser.add_argument('--days', type=int, default=SIMULATION_DAYS)
+    parser.add_argument('--sample', type=int, default=20, help='스칼라 반복으로 계산해 비교할 궤적 수')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    weights = rng.uniform(200, 600, (args.animals, 1))
+    energy = np.linspace(1.8, 3.0, args.scenarios)[None, :]
+
+    start = time.perf_counter()
+    simulation = simulate_growth(weights, energy, days=args.days)
+    batched = time.perf_counter() - start
+
+    picks = [(int(rng.integers(args.animals)), int(rng.integers(args.scenarios))) for _ in range(args.sample)]
+    start = time.perf_counter()
+    expected = [scalar_trajectory(float(weights[i, 0]), float(energy[0, j]), args.days) for i, j in picks]
+    looped = (time.perf_counter() - start) / args.sample * args.animals * args.scenarios
+
+    error = max(float(np.max(np.abs(simulation.weights[:, i, j] - np.asarray(trajectory)) / np.asarray(trajectory)))
+                for (i, j), trajectory in zip(picks, expected))
+    arrays = sum(array.nbytes for array in simulation)
+    print(f"개체 {args.animals:,} × 시나리오 {args.scenarios} × {args.days}일 "
+          f"(궤적 {args.animals * args.scenarios:,}개, float32 {arrays / 1e6:.1f} MB)")
+    print(f"  배열 적분             {batched * 1000:>12.1f} ms")
+    print(f"  궤적별 스칼라 반복 (추정) {looped * 1000:>8.0f} ms ({looped / batched:.0f}배)")
+    print(f"  최대 상대 오차 (표본 {args.sample}개, float32 저장) {error:.1e}")
+    print(f"  365일 체중 범위 {simulation.weights[-1].min():.1f} - {simulation.weights[-1].max():.1f} kg")
+
+
+if __name__ == '__main__':
+    main()
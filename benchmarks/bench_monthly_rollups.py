@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+월간 성과 집계표 벤치마크
+ROI 차트(12개월)를 월마다 비용/수익/성장 원본 테이블을 GROUP BY 하던 방식과
+집계표(monthly_rollups) 기간 조회 한 번으로 계산하는 방식을 비교하고, 트리거로 늘어난 입력 비용을 측정한다.
+
+실행: python benchmarks/bench_monthly_rollups.py [--animals 1400] [--days 730]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_database import month_range
+from cnucnm_migrations import migrate
+from cnucnm_rollups import ROLLUP_SOURCES, read_rollups, monthly_performance, performance_summary
+
+YEAR = 2025
+MONTHS = [f'{YEAR}-{month:02d}' for month in range(1, 13)]
+COST_CATEGORIES = ('사료비', '의료비', '인건비', '시설비')
+
+
+def growth_rows(rng, n_animals, dates):
+    for d, day in enumerate(dates):
+        gains = rng.normal(0.9, 0.2, n_animals)
+        for i in range(n_animals):
+            yield f'ANM{i:06d}', day, 250 + 0.9 * d, float(gains[i]), 8.5, 2125.0
+
+
+def write_database(path, n_animals, days, seed=0):
+    """성장 기록 (개체 × 일), 비용 기록 (개체 × 10일마다 × 분류), 수익 기록 (개체당 1건)"""
+    rng = np.random.default_rng(seed)
+    dates = [(date(YEAR - 1, 1, 1) + timedelta(days=d)).isoformat() for d in range(days)]
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    with conn:
+        conn.executemany('''
+            INSERT INTO growth_records (animal_id, measurement_date, weight, daily_gain, feed_intake, feed_cost)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', growth_rows(rng, n_animals, dates))
+        conn.executemany('INSERT INTO cost_records (record_date, category, amount, animal_id) VALUES (?, ?, ?, ?)',
+                         ((day, category, float(rng.uniform(1000, 50000)), f'ANM{i:06d}')
+                          for day in dates[::10] for category in COST_CATEGORIES for i in range(n_animals)))
+        conn.executemany('INSERT INTO revenue_records (record_date, category, amount, animal_id) VALUES (?, ?, ?, ?)',
+                         ((dates[int(rng.integers(days))], '도축판매', 2_500_000.0, f'ANM{i:06d}')
+                          for i in range(n_animals)))
+    conn.close()
+
+
+def monthly_from_source(conn, year, month):
+    """비교용: 이전 calculate_monthly_performance (월마다 원본 테이블 세 번 GROUP BY)"""
+    month_dates = month_range(year, month)
+    costs_df = pd.read_sql_query('''
+        SELECT category, SUM(amount) as total_amount FROM cost_records
+        WHERE record_date >= ? AND record_date < ? GROUP BY category''', conn, params=month_dates)
+    revenue_df = pd.read_sql_query('''
+        SELECT category, SUM(amount) as total_amount FROM revenue_records
+        WHERE record_date >= ? AND record_date < ? GROUP BY category''', conn, params=month_dates)
+    growth_df = pd.read_sql_query('''
+        SELECT animal_id, AVG(daily_gain) as avg_daily_gain, SUM(feed_cost) as total_feed_cost,
+               COUNT(*) as measurement_count
+        FROM growth_records WHERE measurement_date >= ? AND measurement_date < ? GROUP BY animal_id''',
+                                  conn, params=month_dates)
+    total_cost = costs_df['total_amount'].sum()
+    net_profit = revenue_df['total_amount'].sum() - total_cost
+    return {'roi': net_profit / total_cost * 100 if total_cost > 0 else 0, 'net_profit': net_profit,
+            'total_cost': total_cost, 'avg_daily_gain': growth_df['avg_daily_gain'].mean()}
+
+
+def time_inserts(path, rows, triggers):
+    conn = sqlite3.connect(path)
+    if not triggers:
+        for spec in ROLLUP_SOURCES:
+            for event in ('insert', 'update', 'delete'):
+                conn.execute(f'DROP TRIGGER IF EXISTS trg_{spec.table}_rollup_{event}')
+    start = time.perf_counter()
+    with conn:
+        for row in rows:
+            conn.execute('''
+                INSERT INTO growth_records (animal_id, measurement_date, weight, daily_gain, feed_intake, feed_cost)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', row)
+    elapsed = time.perf_counter() - start
+    conn.rollback()
+    conn.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--animals', type=int, default=1400)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--inserts', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        write_database(path, args.animals, args.days)
+        conn = sqlite3.connect(path)
+        counts = {spec.table: conn.execute(f'SELECT COUNT(*) FROM {spec.table}').fetchone()[0]
+                  for spec in ROLLUP_SOURCES}
+        rollup_rows = conn.execute('SELECT COUNT(*) FROM monthly_rollups').fetchone()[0]
+        print(f"기록 생성 (트리거로 집계 포함) {time.perf_counter() - start:.0f} s: "
+              + ', '.join(f'{table} {count:,}' for table, count in counts.items()) + f", 집계 행 {rollup_rows:,}")
+
+        source_time = rollup_time = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            expected = pd.DataFrame([monthly_from_source(conn, YEAR, month) for month in range(1, 13)])
+            source_time = min(source_time, time.perf_counter() - start)
+            start = time.perf_counter()
+            roi_df = monthly_performance(conn, MONTHS[0], MONTHS[-1])
+            rollup_time = min(rollup_time, time.perf_counter() - start)
+        error = max(float(np.max(np.abs(roi_df[column] - expected[column]) / np.maximum(np.abs(expected[column]), 1)))
+                    for column in ('roi', 'net_profit', 'total_cost', 'avg_daily_gain'))
+
+        # 한 달 상세 (분류별 비용/수익, 개체별 증체량)
+        start = time.perf_counter()
+        performance_summary(read_rollups(conn, MONTHS[0], MONTHS[0]))
+        month_time = time.perf_counter() - start
+        conn.close()
+
+        rng = np.random.default_rng(1)
+        rows = [(f'ANM{i % args.animals:06d}', f'{YEAR}-{1 + i % 12:02d}-15', 400.0, float(rng.normal(0.9, 0.2)),
+                 8.5, 2125.0) for i in range(args.inserts)]
+        with_triggers = time_inserts(path, rows, True)
+        without_triggers = time_inserts(path, rows, False)
+
+    print(f"ROI 차트 12개월")
+    print(f"  월마다 원본 GROUP BY (36회)  {source_time * 1000:>10.1f} ms")
+    print(f"  집계표 기간 조회 1회         {rollup_time * 1000:>10.1f} ms ({source_time / rollup_time:.0f}배)")
+    print(f"  최대 상대 오차 {error:.1e}")
+    print(f"한 달 상세 (집계표)            {month_time * 1000:>10.1f} ms")
+    print(f"성장 기록 {args.inserts:,}행 입력: 트리거 없음 {without_triggers * 1000:.0f} ms, "
+          f"집계 트리거 {with_triggers * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+우군 영양 요구량 계산 벤치마크
+열 단위 계산(calculate_herd_requirements)과 한 마리씩 스칼라 계산하는 반복문 비교
+
+실행: python benchmarks/bench_nasem_requirements.py [--herd 5000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_nasem_requirements import calculate_herd_requirements, REQUIREMENT_FIELDS, PRODUCTION_STAGES
+
+
+def scalar_requirements(weight, age_months, production_stage, milk_yield=0, pregnancy_stage=0):
+    """비교용: 기존 한 마리 계산 (스칼라 연산 + 중첩 딕셔너리)"""
+    basal_metabolic_rate = 70 * (weight ** 0.75)
+    maintenance_energy = basal_metabolic_rate + basal_metabolic_rate * 0.15
+    maintenance_protein = 3.8 * (weight ** 0.75)
+
+    production_energy = 0
+    production_protein = 0
+    if production_stage == "유우":
+        production_energy = milk_yield * 750
+        production_protein = milk_yield * 85
+    elif production_stage == "임신":
+        factor = {1: 0.1, 2: 0.2, 3: 0.4}.get(pregnancy_stage, 0.1)
+        production_energy = 5000 * factor
+        production_protein = 200 * factor
+    elif production_stage == "성장":
+        production_energy = 3000
+        production_protein = 150
+
+    total_energy = maintenance_energy + production_energy
+    total_protein = maintenance_protein + production_protein
+    dry_matter_intake = weight * 0.025
+    protein_concentration = (total_protein / 1000) / dry_matter_intake * 100
+    return {
+        'maintenance': {'energy_kcal': maintenance_energy, 'protein_g': maintenance_protein,
+                        'dry_matter_kg': weight * 0.02},
+        'production': {'energy_kcal': production_energy, 'protein_g': production_protein},
+        'total': {'energy_kcal': total_energy, 'energy_mcal': total_energy / 1000, 'protein_g': total_protein,
+                  'protein_percent': protein_concentration, 'dry_matter_kg': dry_matter_intake},
+        'concentrations': {'energy_mcal_kg': total_energy / (dry_matter_intake * 1000),
+                           'protein_percent': protein_concentration}
+    }
+
+
+def synthetic_herd(n_animals, seed=0):
+    rng = np.random.default_rng(seed)
+    stage = rng.choice(PRODUCTION_STAGES, n_animals)
+    return pd.DataFrame({
+        'weight': rng.uniform(200, 800, n_animals),
+        'age_months': rng.integers(6, 120, n_animals),
+        'production_stage': stage,
+        'milk_yield': np.where(stage == '유우', rng.uniform(10, 45, n_animals), 0.0),
+        'pregnancy_stage': np.where(stage == '임신', rng.integers(1, 4, n_animals), 0)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--herd', type=int, nargs='+', default=[1000, 5000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'두수':>8} {'열 단위(ms)':>12} {'개체별 반복(ms)':>16} {'속도 향상':>10} {'최대 오차':>10}")
+    for n in args.herd:
+        herd = synthetic_herd(n)
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = calculate_herd_requirements(herd)
+            times.append(time.perf_counter() - start)
+        vectorized = float(np.median(times))
+
+        start = time.perf_counter()
+        records = [scalar_requirements(*row) for row in herd[['weight', 'age_months', 'production_stage',
+                                                                'milk_yield', 'pregnancy_stage']].itertuples(index=False)]
+        looped = time.perf_counter() - start
+
+        error = max(float(np.max(np.abs(result[name].to_numpy() - [r[group][field] for r in records])))
+                    for name, (group, field) in REQUIREMENT_FIELDS.items())
+        print(f"{n:>8} {vectorized * 1000:>12.2f} {looped * 1000:>16.1f} {looped / vectorized:>10.1f} {error:>10.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+전체 영양소 프로필 제약 배합 벤치마크
+합성 사료 라이브러리(Feed 모델 영양소 컬럼)에 제약 60개를 걸고 행렬 로드/모델 생성/풀이 시간 측정
+
+실행: python benchmarks/bench_nutrient_constraints.py [--feeds 1000] [--constraints 60]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_nutrient_constraints import (
+    FEED_NUTRIENT_COLUMNS, NutrientLibrary, build_constraint_lp, optimize_nutrient_profile
+)
+from cnucnm_formulation_engine import solve_lp
+
+
+def synthetic_rows(n_feeds, seed=0):
+    """(사료명, 가격, 최대 첨가율, 영양소...) 합성 행 (일부 값은 NULL)"""
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(mean=0.0, sigma=0.8, size=(n_feeds, len(FEED_NUTRIENT_COLUMNS)))
+    missing = rng.random(values.shape) < 0.05
+    prices = rng.uniform(200, 1200, n_feeds)
+    max_rates = rng.choice([10.0, 20.0, 40.0, 100.0], n_feeds)
+    rows = []
+    for i in range(n_feeds):
+        nutrients = [None if missing[i, k] else float(values[i, k]) for k in range(len(FEED_NUTRIENT_COLUMNS))]
+        rows.append((f"feed_{i}", float(prices[i]), float(max_rates[i]), *nutrients))
+    return rows
+
+
+def synthetic_constraints(library, n_constraints, seed=0):
+    """임의 배합 주변에서 만족 가능한 최소/최대/비율 제약 생성"""
+    rng = np.random.default_rng(seed)
+    mix = rng.dirichlet(np.ones(len(library)))
+    mix = np.minimum(mix, library.upper)
+    mix /= mix.sum()
+    supplied = library.by_nutrient @ mix
+
+    specs = []
+    columns = library.columns
+    for k in range(n_constraints):
+        kind = k % 3
+        if kind == 2:
+            a, b = rng.choice(len(columns), 2, replace=False)
+            ratio = supplied[a] / supplied[b]
+            specs.append({'ratio': [columns[a], columns[b]], 'min': ratio * 0.8, 'max': ratio * 1.2})
+        else:
+            j = rng.integers(len(columns))
+            spec = {'nutrient': columns[j], 'min': supplied[j] * 0.9}
+            if kind == 1:
+                spec['max'] = supplied[j] * 1.1
+            specs.append(spec)
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--feeds', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--constraints', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'사료 수':>8} {'제약 수':>8} {'행렬 로드(ms)':>14} {'모델 생성(ms)':>14} {'풀이(ms)':>10} {'상태':>10} {'사용 사료':>10}")
+    for n in args.feeds:
+        rows = synthetic_rows(n)
+        start = time.perf_counter()
+        library = NutrientLibrary.from_rows(rows)
+        load = time.perf_counter() - start
+
+        specs = synthetic_constraints(library, args.constraints)
+        build_times, solve_times = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            lp = build_constraint_lp(library, specs)
+            build_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            solve_lp(lp)
+            solve_times.append(time.perf_counter() - start)
+
+        result = optimize_nutrient_profile(library, specs)
+        used = len(result.get('formulation', {}))
+        print(f"{n:>8} {len(specs):>8} {load * 1000:>14.1f} {np.median(build_times) * 1000:>14.2f} "
+              f"{np.median(solve_times) * 1000:>10.1f} {result['status']:>10} {used:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+영양 요구량 증분 재계산 파이프라인 벤치마크
+임시 DB에 합성 우군과 체중 기록을 만든 뒤 전체 초기 처리, 일부 개체의 새 기록만 반영하는 증분 처리,
+개체마다 계산 후 연결/저장/커밋하는 기존 방식(save_requirements)을 비교한다.
+
+실행: python benchmarks/bench_requirements_pipeline.py [--herd 5000] [--new 1]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_nasem_requirements import calculate_total_requirements
+from cnucnm_migrations import migrate
+from cnucnm_requirements_pipeline import run_pipeline
+
+
+def write_database(path, n_animals, records_per_animal=4, seed=0):
+    """animals / weight_records 합성 DB"""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE animals (id INTEGER PRIMARY KEY AUTOINCREMENT, animal_id TEXT UNIQUE, breed TEXT,
+                              birth_date DATE, current_weight REAL);
+        CREATE TABLE weight_records (id INTEGER PRIMARY KEY AUTOINCREMENT, animal_id INTEGER, weight REAL NOT NULL,
+                                     measurement_date DATE NOT NULL, notes TEXT);
+    ''')
+    conn.executemany('INSERT INTO animals (animal_id, breed, birth_date, current_weight) VALUES (?, ?, ?, ?)',
+                     [(f'ANM{i:06d}', '홀스타인', f'20{20 + i % 4}-0{1 + i % 9}-15', 0.0)
+                      for i in range(1, n_animals + 1)])
+    weights = rng.uniform(200, 700, n_animals)
+    conn.executemany('INSERT INTO weight_records (animal_id, weight, measurement_date) VALUES (?, ?, ?)',
+                     [(i + 1, float(weights[i] + 30 * month), f'2026-0{month + 1}-01')
+                      for month in range(records_per_animal) for i in range(n_animals)])
+    migrate(conn)
+    conn.close()
+
+
+def add_weights(path, animal_ids, date):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany('INSERT INTO weight_records (animal_id, weight, measurement_date) VALUES (?, ?, ?)',
+                         [(int(i), 650.0, date) for i in animal_ids])
+    conn.close()
+
+
+def per_call_save(path, n_animals):
+    """비교용: 개체마다 최근 체중 조회 → 한 마리 계산 → 연결/INSERT/커밋 (기존 save_requirements 방식)"""
+    for animal_id in range(1, n_animals + 1):
+        conn = sqlite3.connect(path)
+        weight, date = conn.execute('SELECT weight, MAX(measurement_date) FROM weight_records WHERE animal_id = ?',
+                                    (animal_id,)).fetchone()
+        conn.close()
+        requirements = calculate_total_requirements(weight, 24, '유지')
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO nutrition_requirements
+            (animal_id, animal_name, breed, weight, age_months, production_stage,
+             milk_yield, pregnancy_stage, calculation_date, requirements_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (animal_id, f'ANM{animal_id:06d}', '홀스타인', weight, 24, '유지', 0, 0,
+              datetime.now().isoformat(), json.dumps(requirements)))
+        conn.commit()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--herd', type=int, default=5000)
+    parser.add_argument('--new', type=float, default=1.0, help='증분 처리에서 새 기록이 들어온 개체 비율(%%)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'pipeline.db')
+        write_database(path, args.herd)
+
+        start = time.perf_counter()
+        summary = run_pipeline(path)
+        initial = time.perf_counter() - start
+
+        changed = rng.choice(np.arange(1, args.herd + 1), max(1, int(args.herd * args.new / 100)), replace=False)
+        add_weights(path, changed, '2026-06-01')
+        start = time.perf_counter()
+        incremental_summary = run_pipeline(path)
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        idle_summary = run_pipeline(path)
+        idle = time.perf_counter() - start
+
+        baseline_path = os.path.join(directory, 'baseline.db')
+        write_database(baseline_path, args.herd)
+        start = time.perf_counter()
+        per_call_save(baseline_path, args.herd)
+        per_call = time.perf_counter() - start
+
+        print(f"두수 {args.herd:,} (체중 기록 {args.herd * 4:,}건)")
+        print(f"  초기 처리 (전체)         {initial * 1000:>10.1f} ms, {summary['animals']:,}두")
+        print(f"  증분 처리 ({args.new:g}% 새 기록)  {incremental * 1000:>10.1f} ms, {incremental_summary['animals']:,}두")
+        print(f"  새 기록 없음             {idle * 1000:>10.1f} ms, {idle_summary['animals']:,}두")
+        print(f"  개체별 연결/저장/커밋    {per_call * 1000:>10.1f} ms ({per_call / initial:.1f}배)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+영양 시나리오 일괄 계산 벤치마크
+체중 × 생산 단계 × 착유량 × 임신 단계 × 사료 에너지 격자(기본 약 10^6개)를 현재 프로세스와 프로세스 풀로 계산하고,
+구간 일부를 지운 뒤 다시 실행해 남은 구간만 계산하는지(재개) 확인한다. 성장 시뮬레이션 격자도 함께 측정한다.
+
+실행: python benchmarks/bench_scenario_sweep.py [--weights 200] [--workers 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_scenario_sweep import run_sweep, read_sweep, grid_size
+
+
+def timed_sweep(grid, output_dir, **options):
+    start = time.perf_counter()
+    summary = run_sweep(grid, output_dir, **options)
+    return time.perf_counter() - start, summary
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--weights', type=int, default=200, help='체중 축 값 수')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--growth-days', type=int, default=365)
+    args = parser.parse_args()
+
+    grid = {
+        'weight': np.linspace(200, 800, args.weights),
+        'production_stage': ['유지', '유우', '임신', '성장'],
+        'milk_yield': np.arange(0, 50, 2.5),
+        'pregnancy_stage': [0, 1, 2, 3],
+        'ration_energy_mcal_kg': np.linspace(2.0, 3.0, 16),
+    }
+    growth_grid = {'weight': np.linspace(200, 600, 50), 'ration_energy_mcal_kg': np.linspace(2.0, 3.0, 20),
+                   'ration_protein_percent': [10, 12, 14, 16, 18], 'intake_ratio': [0.018, 0.022, 0.025, 0.028]}
+
+    with tempfile.TemporaryDirectory() as directory:
+        serial_dir, pool_dir = os.path.join(directory, 'serial'), os.path.join(directory, 'pool')
+        serial, summary = timed_sweep(grid, serial_dir, chunk_size=args.chunk_size, max_workers=1)
+        pooled, _ = timed_sweep(grid, pool_dir, chunk_size=args.chunk_size, max_workers=args.workers)
+        print(f"요구량 격자 {grid_size(grid):,}개 (구간 {summary['chunks']}개, "
+              f"Parquet {directory_size(pool_dir) / 1e6:.1f} MB)")
+        print(f"  현재 프로세스        {serial:>8.2f} s")
+        print(f"  프로세스 풀 ({args.workers})    {pooled:>8.2f} s ({serial / pooled:.1f}배)")
+
+        # 중단 재현: 구간 절반을 지우고 다시 실행
+        parts = sorted(name for name in os.listdir(pool_dir) if name.startswith('part-'))
+        for name in parts[::2]:
+            os.remove(os.path.join(pool_dir, name))
+        resumed, summary = timed_sweep(grid, pool_dir, chunk_size=args.chunk_size, max_workers=args.workers)
+        print(f"  재개 (구간 {summary['computed']}개 계산, {summary['resumed']}개 재사용) {resumed:>6.2f} s")
+
+        start = time.perf_counter()
+        frame = read_sweep(pool_dir, columns=['scenario', 'total_energy_mcal'])
+        read_time = time.perf_counter() - start
+        complete = len(frame) == grid_size(grid) and bool((frame['scenario'].to_numpy() == np.arange(len(frame))).all())
+        print(f"  결과 읽기 {read_time:.2f} s, 행 {len(frame):,}개, 누락/중복 없음={complete}")
+
+        growth_dir = os.path.join(directory, 'growth')
+        serial, _ = timed_sweep(growth_grid, growth_dir + '-serial', chunk_size=5000, max_workers=1,
+                                growth_days=args.growth_days)
+        pooled, summary = timed_sweep(growth_grid, growth_dir, chunk_size=5000, max_workers=args.workers,
+                                      growth_days=args.growth_days)
+        print(f"성장 격자 {grid_size(growth_grid):,}개 × {args.growth_days}일 (구간 {summary['chunks']}개)")
+        print(f"  현재 프로세스        {serial:>8.2f} s")
+        print(f"  프로세스 풀 ({args.workers})    {pooled:>8.2f} s ({serial / pooled:.1f}배)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+스키마 마이그레이션(조회 인덱스) 벤치마크
+합성 성장 기록(기본 1천만 행)에 대해 자주 쓰는 조회를 인덱스 마이그레이션 전/후로 실행해 비교한다.
+월 조회는 strftime('%Y-%m', 날짜) = ? 방식과 날짜 범위 방식을 모두 측정한다.
+
+실행: python benchmarks/bench_schema_migrations.py [--rows 10000000] [--days 730] [--db 경로]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_database import month_range
+from cnucnm_migrations import migrate, LATEST_VERSION
+
+YEAR, MONTH = 2025, 3
+MONTH_KEY = f'{YEAR:04d}-{MONTH:02d}'
+MONTH_START, MONTH_END = month_range(YEAR, MONTH)
+
+# (이름, SQL, 인자)
+QUERIES = [
+    ('월간 성장 (strftime)', '''
+        SELECT animal_id, AVG(daily_gain), SUM(feed_cost), COUNT(*) FROM growth_records
+        WHERE strftime('%Y-%m', measurement_date) = ? GROUP BY animal_id''', (MONTH_KEY,)),
+    ('월간 성장 (날짜 범위)', '''
+        SELECT animal_id, AVG(daily_gain), SUM(feed_cost), COUNT(*) FROM growth_records
+        WHERE measurement_date >= ? AND measurement_date < ? GROUP BY animal_id''', (MONTH_START, MONTH_END)),
+    ('월간 비용 (strftime)', '''
+        SELECT category, SUM(amount) FROM cost_records
+        WHERE strftime('%Y-%m', record_date) = ? GROUP BY category''', (MONTH_KEY,)),
+    ('월간 비용 (날짜 범위)', '''
+        SELECT category, SUM(amount) FROM cost_records
+        WHERE record_date >= ? AND record_date < ? GROUP BY category''', (MONTH_START, MONTH_END)),
+    ('개체 성장 이력', '''
+        SELECT measurement_date, weight FROM growth_records
+        WHERE animal_id = ? ORDER BY measurement_date''', ('ANM000123',)),
+    ('개체 체중 이력', '''
+        SELECT measurement_date, weight FROM weight_records
+        WHERE animal_id = ? ORDER BY measurement_date''', (123,)),
+    ('최근 7일 건강 기록', '''
+        SELECT animal_id, temperature, appetite_score FROM health_records
+        WHERE check_date >= date(?, '-7 days')''', ('2025-12-31',)),
+]
+
+
+def write_database(path, rows, days, seed=0):
+    """성장 기록 rows 행 (개체 rows/days 두 × days 일), 체중/비용/건강 기록은 그 1/10"""
+    rng = np.random.default_rng(seed)
+    n_animals = max(rows // days, 1)
+    dates = [(date(2024, 1, 1) + timedelta(days=d)).isoformat() for d in range(days)]
+    conn = sqlite3.connect(path)
+    migrate(conn, target=2)   # 테이블만 (인덱스 마이그레이션 전)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    with conn:
+        for d, day in enumerate(dates):
+            weights = 250 + 0.9 * d + rng.normal(0, 5, n_animals)
+            gains = rng.normal(0.9, 0.2, n_animals)
+            conn.executemany('''
+                INSERT INTO growth_records (animal_id, measurement_date, weight, daily_gain, feed_intake, feed_cost)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', ((f'ANM{i:06d}', day, float(weights[i]), float(gains[i]), 8.5, 2125.0) for i in range(n_animals)))
+            # 열흘마다 체중 측정/비용/건강 기록
+            if d % 10 == 0:
+                conn.executemany('INSERT INTO weight_records (animal_id, weight, measurement_date) VALUES (?, ?, ?)',
+                                 ((i + 1, float(weights[i]), day) for i in range(n_animals)))
+                conn.executemany('''
+                    INSERT INTO cost_records (record_date, category, amount, animal_id) VALUES (?, ?, ?, ?)
+                ''', ((day, ('사료비', '의료비', '인건비')[i % 3], 5000.0, f'ANM{i:06d}') for i in range(n_animals)))
+                conn.executemany('''
+                    INSERT INTO health_records (animal_id, check_date, temperature, appetite_score)
+                    VALUES (?, ?, ?, ?)
+                ''', ((f'ANM{i:06d}', day, 38.5, 4) for i in range(n_animals)))
+    conn.close()
+    return n_animals
+
+
+def time_queries(conn, repeat):
+    results = {}
+    for name, sql, params in QUERIES:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db', help='합성 DB 경로 (기본: 임시 폴더, 실행 후 삭제)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        n_animals = write_database(path, args.rows, args.days)
+        print(f"성장 기록 {n_animals * args.days:,}행 ({n_animals:,}두 × {args.days}일) 생성 "
+              f"{time.perf_counter() - start:.0f} s, {os.path.getsize(path) / 1e9:.2f} GB")
+
+        conn = sqlite3.connect(path)
+        before = time_queries(conn, args.repeat)
+        start = time.perf_counter()
+        migrate(conn)
+        print(f"마이그레이션 {LATEST_VERSION} (인덱스 생성) {time.perf_counter() - start:.0f} s")
+        after = time_queries(conn, args.repeat)
+        plans = {name: ' / '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+                 for name, sql, params in QUERIES}
+        conn.close()
+
+    print(f"{'조회':<22}{'인덱스 전 (ms)':>16}{'인덱스 후 (ms)':>16}{'배':>8}")
+    for name, *_ in QUERIES:
+        print(f"{name:<22}{before[name] * 1000:>16.1f}{after[name] * 1000:>16.1f}"
+              f"{before[name] / max(after[name], 1e-9):>8.0f}")
+    print("\n인덱스 후 실행 계획")
+    for name, plan in plans.items():
+        print(f"  {name}: {plan}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+측정 시계열 저장소 벤치마크
+합성 성장 기록(기본 1천만 행)을 SQLite 에 넣고 시계열 저장소로 동기화/압축한 뒤,
+여러 개체의 다년 추이 차트 데이터를 SQLite(인덱스 조회 + pandas)와 저장소(열 범위 조회 → 배열)에서 읽어 비교한다.
+
+실행: python benchmarks/bench_timeseries.py [--rows 10000000] [--days 730] [--animals-per-chart 20]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cnucnm_migrations import migrate
+import cnucnm_timeseries as timeseries
+
+
+def write_database(path, rows, days, seed=0):
+    rng = np.random.default_rng(seed)
+    n_animals = max(rows // days, 1)
+    dates = [(date(2024, 1, 1) + timedelta(days=d)).isoformat() for d in range(days)]
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    # 대량 입력 동안 월간 집계 트리거/조회 인덱스는 빼고 입력 후 다시 만든다
+    triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('trigger', 'index') "
+                            "AND tbl_name = 'growth_records' AND sql IS NOT NULL").fetchall()
+    for name, sql in triggers:
+        conn.execute(f"DROP {'TRIGGER' if sql.startswith('CREATE TRIGGER') else 'INDEX'} {name}")
+    with conn:
+        for d, day in enumerate(dates):
+            weights = 250 + 0.9 * d + rng.normal(0, 5, n_animals)
+            gains = rng.normal(0.9, 0.2, n_animals)
+            conn.executemany('''
+                INSERT INTO growth_records (animal_id, measurement_date, weight, daily_gain, feed_intake, feed_cost)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', ((f'ANM{i:06d}', day, float(weights[i]), float(gains[i]), 8.5, 2125.0) for i in range(n_animals)))
+    for _, sql in triggers:
+        if not sql.startswith('CREATE TRIGGER'):
+            conn.execute(sql)
+    conn.close()
+    return n_animals
+
+
+def sqlite_chart(conn, animal_ids, start, end):
+    """비교용: 개체마다 인덱스 조회 → pandas (create_growth_trend_chart 방식)"""
+    frames = {}
+    for animal_id in animal_ids:
+        frames[animal_id] = pd.read_sql_query('''
+            SELECT measurement_date, weight, daily_gain FROM growth_records
+            WHERE animal_id = ? AND measurement_date >= ? AND measurement_date <= ?
+            ORDER BY measurement_date
+        ''', conn, params=(animal_id, start, end), parse_dates=['measurement_date'])
+    return frames
+
+
+def store_chart(root, animal_ids, start, end, days=None):
+    table = timeseries.scan(root, 'growth', animal_ids, start, end, columns=['weight', 'daily_gain'])
+    if days:
+        table = timeseries.downsample(table, 'growth', days)
+    return timeseries.series_arrays(table, 'growth', 'weight')
+
+
+def best_of(repeat, function, *args):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--animals-per-chart', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        root = os.path.join(tmp, 'timeseries')
+        start = time.perf_counter()
+        n_animals = write_database(db_path, args.rows, args.days)
+        print(f"SQLite 성장 기록 {n_animals * args.days:,}행 ({n_animals:,}두 × {args.days}일) "
+              f"{time.perf_counter() - start:.0f} s")
+
+        conn = sqlite3.connect(db_path)
+        start = time.perf_counter()
+        added = timeseries.sync_from_database(conn, root, ['growth'])
+        synced = time.perf_counter() - start
+        start = time.perf_counter()
+        compacted = timeseries.compact(root, ['growth'])
+        size = sum(f.stat().st_size for f in Path(root).rglob('*.npy'))
+        print(f"저장소 동기화 {added['growth']:,}행 {synced:.0f} s, 월 {compacted}개 압축 "
+              f"{time.perf_counter() - start:.0f} s, memmap {size / 1e6:.0f} MB "
+              f"(SQLite {os.path.getsize(db_path) / 1e6:.0f} MB)")
+
+        rng = np.random.default_rng(1)
+        animal_ids = [f'ANM{i:06d}' for i in rng.choice(n_animals, args.animals_per_chart, replace=False)]
+        first, last = '2024-01-01', (date(2024, 1, 1) + timedelta(days=args.days - 1)).isoformat()
+        sqlite_time, frames = best_of(args.repeat, sqlite_chart, conn, animal_ids, first, last)
+        store_time, arrays = best_of(args.repeat, store_chart, root, animal_ids, first, last)
+        weekly_time, weekly = best_of(args.repeat, store_chart, root, animal_ids, first, last, 7)
+        one_time, _ = best_of(args.repeat, store_chart, root, animal_ids[:1], first, last)
+        conn.close()
+
+        points = sum(len(frame) for frame in frames.values())
+        match = all(np.allclose(frames[a]['weight'].to_numpy(np.float32), arrays[a][1]) for a in animal_ids)
+        print(f"추이 차트 {args.animals_per_chart}두 × {args.days}일 ({points:,}점, 값 일치 {match})")
+        print(f"  SQLite 인덱스 조회 + pandas   {sqlite_time * 1000:>8.1f} ms")
+        print(f"  저장소 범위 조회 → 배열        {store_time * 1000:>8.1f} ms ({sqlite_time / store_time:.1f}배)")
+        print(f"  저장소 + 주 평균 ({sum(len(v[0]) for v in weekly.values()):,}점)  {weekly_time * 1000:>8.1f} ms")
+        print(f"  저장소 1두                     {one_time * 1000:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
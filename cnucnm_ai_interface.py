@@ -14,6 +14,10 @@ import plotly.graph_objects as go
 from pathlib import Path
 import hashlib
 
+from cnucnm_feeds_optimizer import optimize_feed_mix
+from cnucnm_migrations import migrate
+from cnucnm_growth_simulation import predict_productivity as simulate_productivity, FEED_COST_PER_DAY
+
 # 데이터베이스 초기화
 def init_database():
     """데이터베이스 초기화"""
@@ -23,55 +27,8 @@ def init_database():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # 사용자 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            username TEXT UNIQUE NOT NULL,
-            hashed_password TEXT NOT NULL,
-            first_name TEXT,
-            last_name TEXT,
-            role TEXT DEFAULT 'farmer',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 동물 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS animals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id TEXT UNIQUE NOT NULL,
-            species TEXT NOT NULL,
-            breed TEXT,
-            gender TEXT,
-            birth_date DATE,
-            initial_weight REAL,
-            current_weight REAL,
-            status TEXT DEFAULT 'active',
-            owner_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (owner_id) REFERENCES users (id)
-        )
-    ''')
-    
-    # 사료 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feeds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            feed_name TEXT NOT NULL,
-            feed_type TEXT,
-            protein REAL,
-            fat REAL,
-            fiber REAL,
-            ash REAL,
-            calcium REAL,
-            phosphorus REAL,
-            price_per_kg REAL,
-            supplier TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    # 사용자/동물/사료 테이블
+    migrate(conn)
     
     # 샘플 데이터 생성
     if cursor.execute("SELECT COUNT(*) FROM feeds").fetchone()[0] == 0:
@@ -96,46 +53,30 @@ def init_database():
 
 # AI 모델 1: 사료 배합 최적화
 def optimize_feed_formulation(animal_weight, target_protein, target_fat, max_cost):
-    """사료 배합 최적화 AI 모델"""
+    """사료 배합 최적화 AI 모델 (선형계획법, 결과 캐시)"""
     
-    # 사료 데이터 로드
-    conn = sqlite3.connect("cnucnm_data/cnucnm.db")
-    feeds_df = pd.read_sql_query("SELECT * FROM feeds", conn)
-    conn.close()
-    
-    # 선형 계획법을 이용한 최적화 (간단한 버전)
-    n_feeds = len(feeds_df)
-    
-    # 목적 함수: 비용 최소화
-    costs = feeds_df['price_per_kg'].values
-    
-    # 제약 조건: 영양소 요구량
-    protein_constraint = feeds_df['protein'].values
-    fat_constraint = feeds_df['fat'].values
+    # feeds 테이블 버전이 같으면 동일 목표값에 대해 캐시된 결과 사용
+    library, mix = optimize_feed_mix(target_protein, target_fat, max_cost)
     
-    # 간단한 최적화 (실제로는 PuLP나 scipy.optimize 사용)
-    # 여기서는 휴리스틱 방법 사용
-    weights = np.random.dirichlet(np.ones(n_feeds))
+    if mix.status != 'Optimal':
+        return pd.DataFrame(), "❌ 최적화 실패: 제약조건을 만족하는 해를 찾을 수 없습니다."
     
-    # 결과 계산
-    total_protein = np.sum(weights * protein_constraint)
-    total_fat = np.sum(weights * fat_constraint)
-    total_cost = np.sum(weights * costs)
+    weights = np.array(mix.ratios)
     
     # 결과 데이터프레임 생성
     result_df = pd.DataFrame({
-        '사료명': feeds_df['feed_name'],
+        '사료명': library.names,
         '배합비율(%)': weights * 100,
-        '단백질(%)': feeds_df['protein'],
-        '지방(%)': feeds_df['fat']
+        '단백질(%)': [record['protein'] for record in library.records],
+        '지방(%)': [record['fat'] for record in library.records]
     })
     
     # 요약 정보
     summary = f"""
     **최적 배합 결과:**
-    - 총 단백질: {total_protein:.1f}%
-    - 총 지방: {total_fat:.1f}%
-    - 총 비용: {total_cost:.0f}원/kg
+    - 총 단백질: {mix.totals['protein']:.1f}%
+    - 총 지방: {mix.totals['fat']:.1f}%
+    - 총 비용: {mix.cost:.0f}원/kg
     - 목표 단백질: {target_protein}%
     - 목표 지방: {target_fat}%
     """
@@ -200,33 +141,17 @@ def analyze_nutrition(*feed_ratios):
 def predict_productivity(animal_weight, feed_quality, management_level):
     """생산성 예측 AI 모델"""
     
-    # 간단한 예측 모델 (실제로는 머신러닝 모델 사용)
-    base_growth = 0.8  # kg/day
-    
-    # 요인별 조정
-    weight_factor = 1.0 if animal_weight > 300 else 0.9
-    quality_factor = feed_quality / 100
-    management_factor = management_level / 100
-    
-    # 예측 성장률
-    predicted_growth = base_growth * weight_factor * quality_factor * management_factor
-    
-    # 수익성 계산
-    feed_cost_per_day = 15  # 원/일
-    meat_price_per_kg = 8000  # 원/kg
-    daily_revenue = predicted_growth * meat_price_per_kg
-    daily_profit = daily_revenue - feed_cost_per_day
-    
-    # 차트 데이터
-    days = list(range(1, 31))
-    weights = [animal_weight + predicted_growth * day for day in days]
-    profits = [daily_profit * day for day in days]
+    # 일 단위 성장 시뮬레이션 (365일)
+    projection = simulate_productivity(animal_weight, feed_quality, management_level)
+    days, weights, profits = projection['days'], projection['weights'], projection['profits']
+    predicted_growth = projection['daily_gain'][:30].mean()
+    daily_profit = profits[29] / 30
     
     # Plotly 차트 생성
-    fig_weight = px.line(x=days, y=weights, title="체중 증가 예측 (30일)")
+    fig_weight = px.line(x=days, y=weights, title="체중 증가 예측 (365일)")
     fig_weight.update_layout(xaxis_title="일수", yaxis_title="체중 (kg)")
     
-    fig_profit = px.line(x=days, y=profits, title="누적 수익 예측 (30일)")
+    fig_profit = px.line(x=days, y=profits, title="누적 수익 예측 (365일)")
     fig_profit.update_layout(xaxis_title="일수", yaxis_title="누적 수익 (원)")
     
     prediction_result = f"""
@@ -239,12 +164,13 @@ def predict_productivity(animal_weight, feed_quality, management_level):
     
     **예측 결과:**
     - 일일 성장률: {predicted_growth:.2f} kg/일
-    - 30일 후 체중: {weights[-1]:.1f} kg
+    - 30일 후 체중: {weights[29]:.1f} kg
+    - 365일 후 체중: {weights[-1]:.1f} kg
     - 일일 수익: {daily_profit:,.0f}원
-    - 30일 누적 수익: {profits[-1]:,.0f}원
+    - 30일 누적 수익: {profits[29]:,.0f}원
     
     **ROI:**
-    - 투자 대비 수익률: {(profits[-1] / (feed_cost_per_day * 30) * 100):.1f}%
+    - 투자 대비 수익률: {(profits[29] / (FEED_COST_PER_DAY * 30) * 100):.1f}%
     """
     
     return prediction_result, fig_weight, fig_profit
@@ -5,7 +5,6 @@ CNUCNM 동물 관리 시스템
 """
 
 import streamlit as st
-import sqlite3
 import pandas as pd
 from datetime import datetime, date
 import uuid
@@ -13,65 +12,20 @@ from pathlib import Path
 import plotly.express as px
 import plotly.graph_objects as go
 
+from cnucnm_database import connect, pool_metrics
+from cnucnm_migrations import migrate
+
 # 데이터베이스 초기화
 def init_animal_database():
     """동물 관리 데이터베이스 초기화"""
     db_path = Path("cnucnm_data/cnucnm.db")
     db_path.parent.mkdir(exist_ok=True)
     
-    conn = sqlite3.connect(db_path)
+    conn = connect()
     cursor = conn.cursor()
     
-    # 동물 테이블 생성
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS animals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id TEXT UNIQUE NOT NULL,
-            name TEXT,
-            species TEXT NOT NULL,
-            breed TEXT,
-            gender TEXT,
-            birth_date DATE,
-            initial_weight REAL,
-            current_weight REAL,
-            status TEXT DEFAULT 'active',
-            owner_id INTEGER,
-            farm_location TEXT,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (owner_id) REFERENCES users (id)
-        )
-    ''')
-    
-    # 체중 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weight_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id INTEGER,
-            weight REAL NOT NULL,
-            measurement_date DATE NOT NULL,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (animal_id) REFERENCES animals (id)
-        )
-    ''')
-    
-    # 건강 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS health_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id INTEGER,
-            health_status TEXT NOT NULL,
-            symptoms TEXT,
-            treatment TEXT,
-            veterinarian TEXT,
-            record_date DATE NOT NULL,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (animal_id) REFERENCES animals (id)
-        )
-    ''')
+    # 동물/체중/건강 기록 테이블과 조회 인덱스
+    migrate(conn)
     
     # 샘플 동물 데이터 생성
     if cursor.execute("SELECT COUNT(*) FROM animals").fetchone()[0] == 0:
@@ -121,7 +75,7 @@ def register_animal(animal_id, name, species, breed, gender, birth_date,
                    initial_weight, owner_id, farm_location, notes):
     """동물 등록"""
     try:
-        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+        conn = connect()
         cursor = conn.cursor()
         
         # 중복 확인
@@ -155,7 +109,7 @@ def register_animal(animal_id, name, species, breed, gender, birth_date,
 def get_animals():
     """동물 목록 조회"""
     try:
-        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+        conn = connect()
         query = """
             SELECT a.id, a.animal_id, a.name, a.species, a.breed, a.gender,
                    a.birth_date, a.initial_weight, a.current_weight, a.status,
@@ -176,7 +130,7 @@ def get_animals():
 def search_animals(search_term, search_by):
     """동물 검색"""
     try:
-        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+        conn = connect()
         
         if search_by == "동물ID":
             query = """
@@ -222,7 +176,7 @@ def search_animals(search_term, search_by):
 def add_weight_record(animal_id, weight, measurement_date, notes):
     """체중 기록 추가"""
     try:
-        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+        conn = connect()
         cursor = conn.cursor()
         
         # 체중 기록 추가
@@ -247,7 +201,7 @@ def add_weight_record(animal_id, weight, measurement_date, notes):
 def get_weight_records(animal_id):
     """체중 기록 조회"""
     try:
-        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+        conn = connect()
         query = """
             SELECT measurement_date, weight, notes
             FROM weight_records
@@ -265,7 +219,7 @@ def get_weight_records(animal_id):
 def get_animal_statistics():
     """동물 통계 정보"""
     try:
-        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+        conn = connect()
         cursor = conn.cursor()
         
         # 전체 동물 수
@@ -634,6 +588,11 @@ def show_settings():
     else:
         st.error("❌ 데이터베이스 파일을 찾을 수 없습니다.")
     
+    st.subheader("연결 풀")
+    metrics = pool_metrics()
+    if metrics:
+        st.dataframe(pd.DataFrame(metrics), use_container_width=True)
+    
     st.subheader("시스템 정보")
     st.info(f"🐍 Python 버전: {pd.__version__}")
     st.info(f"📁 작업 디렉토리: {Path.cwd()}")
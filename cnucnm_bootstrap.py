@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 데이터베이스 부트스트랩
+스키마 마이그레이션(cnucnm_migrations)과 페이지별 기본 데이터(seed)를 한 번만 적용한다.
+적용한 기본 데이터 버전은 seed_versions 에 기록하고, 기본 데이터 내용을 바꿀 때는 버전을 올린다.
+
+Streamlit 페이지는 st.cache_resource 로 감싼 초기화 함수에서 bootstrap() 을 호출해
+프로세스당 한 번만 실행하고, 이후 재실행(위젯 조작)에서는 DDL/기본 데이터 조회를 하지 않는다.
+"""
+
+from collections import namedtuple
+
+from cnucnm_database import DB_PATH, connect
+from cnucnm_migrations import migrate
+
+# apply: 함수(conn), 커밋은 bootstrap 이 한다
+Seed = namedtuple('Seed', ['name', 'version', 'apply'])
+
+
+def applied_seeds(conn):
+    """{기본 데이터 이름: 적용한 버전}"""
+    return dict(conn.execute('SELECT name, version FROM seed_versions'))
+
+
+def apply_seeds(conn, seeds):
+    """기록된 버전보다 새로운 기본 데이터만 적용 (기본 데이터마다 한 트랜잭션)
+
+    반환값: 이번에 적용한 기본 데이터 이름 목록
+    """
+    applied = applied_seeds(conn)
+    pending = [seed for seed in seeds if applied.get(seed.name, 0) < seed.version]
+    done = []
+    for seed in pending:
+        # 다른 프로세스가 먼저 적용했을 수 있으므로 쓰기 잠금을 잡은 뒤 다시 확인
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT version FROM seed_versions WHERE name = ?', (seed.name,)).fetchone()
+            if row is None or row[0] < seed.version:
+                seed.apply(conn)
+                conn.execute('''
+                    INSERT INTO seed_versions (name, version, applied_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (name) DO UPDATE SET version = excluded.version, applied_at = excluded.applied_at
+                ''', (seed.name, seed.version))
+                done.append(seed.name)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return done
+
+
+def bootstrap(seeds=(), db_path=DB_PATH):
+    """마이그레이션과 기본 데이터 적용
+
+    반환값: {'migrations': 적용한 버전 목록, 'seeds': 적용한 기본 데이터 이름 목록}
+    """
+    conn = connect(db_path)
+    try:
+        migrations = migrate(conn)
+        return {'migrations': migrations, 'seeds': apply_seeds(conn, seeds)}
+    finally:
+        conn.close()
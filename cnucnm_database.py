@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+CNUCNM SQLite 연결 풀 / 데이터 접근 계층
+Streamlit/Gradio 모듈이 쿼리마다 새로 연결하지 않도록 DB 경로별 연결을 재사용한다.
+연결은 WAL, synchronous=NORMAL, mmap 설정으로 만들고, 연결마다 준비된 문장(prepared statement) 캐시를 유지한다.
+
+사용법:
+    conn = connect()            # 풀에서 연결 가져오기
+    ...
+    conn.close()                # 풀로 반환 (커밋하지 않은 변경은 롤백)
+
+    with connection() as conn:  # 정상 종료 시 커밋, 예외 시 롤백 후 반환
+        ...
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DB_PATH = 'cnucnm_data/cnucnm.db'
+
+# 연결 설정
+JOURNAL_MODE = 'WAL'
+SYNCHRONOUS = 'NORMAL'
+MMAP_SIZE = 256 * 1024 * 1024     # bytes
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256        # 연결별 준비된 문장 캐시 크기
+
+# 풀에 남겨 두는 유휴 연결 수 (동시에 더 많이 필요하면 새로 만들고 반환 시 닫는다)
+MAX_IDLE_CONNECTIONS = 8
+
+
+class PooledConnection(sqlite3.Connection):
+    """close() 하면 닫지 않고 풀로 돌아가는 연결 (pandas 등에서는 일반 sqlite3 연결로 쓰인다)"""
+
+    _pool = None
+
+    def close(self):
+        if self._pool is None:
+            super().close()
+        else:
+            self._pool.release(self)
+
+    def discard(self):
+        """풀에서 빼고 실제로 닫기"""
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """DB 파일 하나에 대한 스레드 안전 연결 풀"""
+
+    def __init__(self, db_path=DB_PATH, max_idle=MAX_IDLE_CONNECTIONS):
+        self.db_path = str(db_path)
+        self.max_idle = max_idle
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._created = 0
+        self._reused = 0
+        self._released = 0
+        self._rolled_back = 0
+        self._discarded = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._connect_time = 0.0
+
+    def _create(self):
+        start = time.perf_counter()
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=PooledConnection,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute(f'PRAGMA journal_mode = {JOURNAL_MODE}')
+        conn.execute(f'PRAGMA synchronous = {SYNCHRONOUS}')
+        conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+        conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+        conn._pool = self
+        with self._lock:
+            self._created += 1
+            self._connect_time += time.perf_counter() - start
+        return conn
+
+    def acquire(self):
+        """유휴 연결을 꺼내거나 새로 연결"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"연결 풀이 닫혔습니다: {self.db_path}")
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                self._reused += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        if conn is None:
+            try:
+                conn = self._create()
+            except Exception:
+                with self._lock:
+                    self._in_use -= 1
+                raise
+        return conn
+
+    def release(self, conn):
+        """연결 반환 (진행 중인 트랜잭션은 롤백, 유휴 연결이 가득 찼으면 닫기)"""
+        rolled_back = conn.in_transaction
+        if rolled_back:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+            self._released += 1
+            self._rolled_back += rolled_back
+            keep = not self._closed and len(self._idle) < self.max_idle
+            if keep:
+                self._idle.append(conn)
+            else:
+                self._discarded += 1
+        if not keep:
+            conn.discard()
+
+    @contextmanager
+    def connection(self):
+        """정상 종료 시 커밋, 예외 시 롤백하고 풀로 반환하는 연결"""
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def metrics(self):
+        with self._lock:
+            acquired = self._created + self._reused
+            return {
+                'db_path': self.db_path,
+                'created': self._created,
+                'reused': self._reused,
+                'reuse_ratio': self._reused / acquired if acquired else 0.0,
+                'released': self._released,
+                'rolled_back': self._rolled_back,
+                'discarded': self._discarded,
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'idle': len(self._idle),
+                'connect_time_ms': self._connect_time * 1000,
+            }
+
+    def close(self):
+        """유휴 연결 모두 닫기 (사용 중인 연결은 반환될 때 닫힌다)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.discard()
+
+
+# DB 파일(절대 경로)별 풀
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def connect(db_path=DB_PATH):
+    """풀에서 연결 가져오기 (close() 하면 풀로 반환)"""
+    return get_pool(db_path).acquire()
+
+
+def connection(db_path=DB_PATH):
+    """with 문용 연결 (정상 종료 시 커밋, 예외 시 롤백)"""
+    return get_pool(db_path).connection()
+
+
+def pool_metrics(db_path=None):
+    """풀 통계 (db_path 를 주지 않으면 모든 풀)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    if db_path is not None:
+        key = os.path.abspath(db_path)
+        pools = [pool for pool in pools if os.path.abspath(pool.db_path) == key]
+    return [pool.metrics() for pool in pools]
+
+
+def month_range(year, month):
+    """월 조회 범위 ('YYYY-MM-01', 다음 달 'YYYY-MM-01')
+
+    strftime('%Y-%m', 날짜열) = ? 는 행마다 함수를 계산해 인덱스를 쓰지 못하므로
+    날짜열 >= ? AND 날짜열 < ? 로 조회한다.
+    """
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f'{year:04d}-{month:02d}-01', f'{next_year:04d}-{next_month:02d}-01'
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+CNUCNM Excel 통합문서 수식 가져오기
+.xlsx/.xlsm(20191206_CNU_CNM_v2.17.xlsm 등)의 시트 XML을 셀 단위로 스트리밍 파싱해
+셀 수식을 수식 그래프(FormulaGraph) 노드로 변환한다. 노드 이름은 '시트!A1' 형식이다.
+파싱 결과는 바이너리 캐시 파일에 저장해 다음 실행부터 XML 파싱을 건너뛴다.
+"""
+
+import logging
+import os
+import pickle
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import PurePosixPath
+
+from cnucnm_formula_engine import FormulaGraph, FormulaNode
+
+logger = logging.getLogger(__name__)
+
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# 캐시 형식 버전 (변환 규칙이 바뀌면 올림)
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.cnucnm-graph'
+
+# 함수 인자로 펼칠 범위의 최대 셀 수 (A:A 같은 큰 범위는 지원하지 않음)
+MAX_RANGE_CELLS = 10000
+
+# Excel 함수 → 수식 엔진 함수 (FORMULA_FUNCTIONS)
+EXCEL_FUNCTIONS = {name: f'_{name}' for name in (
+    'SUM', 'AVERAGE', 'MIN', 'MAX', 'ABS', 'EXP', 'LN', 'LOG10', 'LOG', 'SQRT', 'POWER', 'ROUND',
+    'IF', 'AND', 'OR', 'NOT'
+)}
+
+# Excel 연산자 → Python 연산자 (%, & 는 지원하지 않음)
+EXCEL_OPERATORS = {'+': '+', '-': '-', '*': '*', '/': '/', '^': '**', '(': '(', ')': ')', ',': ',',
+                   '=': '==', '<>': '!=', '<': '<', '>': '>', '<=': '<=', '>=': '>='}
+
+_EXCEL_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<error>\#[A-Z0-9/]+[!?]|\#N/A)
+  | (?P<ref>(?:(?:'(?:[^']|'')+'|[^\W\d][\w.]*)!)?\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)(?![\w(])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<function>(?:_xlfn\.)?[A-Za-z][\w.]*)(?=\()
+  | (?P<boolean>TRUE|FALSE)(?![\w(])
+  | (?P<operator><>|<=|>=|[-+*/^&=<>%,()])
+  | (?P<name>[^\W\d][\w.]*)
+  | (?P<other>.)
+""", re.X)
+
+# 이항 연산자 우선순위 (Excel: 비교 < +,- < *,/ < ^, 모두 왼쪽 결합, 부호 -는 ^보다 먼저)
+_BINARY_PRECEDENCE = {'==': 1, '!=': 1, '<': 1, '>': 1, '<=': 1, '>=': 1, '+': 2, '-': 2, '*': 3, '/': 3, '**': 4}
+
+_CELL_PATTERN = re.compile(r'^(\$?)([A-Z]{1,3})(\$?)(\d+)$')
+
+
+class UnsupportedFormula(ValueError):
+    """수식 엔진으로 옮길 수 없는 Excel 수식 (문자열, 정의된 이름, 지원하지 않는 함수 등)"""
+
+
+def column_number(letters):
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - 64
+    return number
+
+
+def column_letters(number):
+    letters = ''
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def split_cell(ref):
+    """'$B$12' → (열 번호, 행 번호)"""
+    match = _CELL_PATTERN.match(ref)
+    return column_number(match.group(2)), int(match.group(4))
+
+
+def _split_sheet(ref, sheet):
+    """참조에서 (시트 이름, 셀/범위) 분리 (시트가 없으면 현재 시트)"""
+    if '!' not in ref:
+        return sheet, ref
+    prefix, _, cells = ref.rpartition('!')
+    if prefix.startswith("'"):
+        prefix = prefix[1:-1].replace("''", "'")
+    return prefix, cells
+
+
+def cell_name(sheet, ref):
+    """그래프 노드 이름 ('시트!B12', $ 제거)"""
+    return f"{sheet}!{ref.replace('$', '')}"
+
+
+def translate_formula(formula, row_offset, column_offset):
+    """공유 수식을 다른 셀로 옮길 때 상대 참조 이동 ($ 고정 참조는 그대로)"""
+    def shift(cell):
+        column_fixed, letters, row_fixed, row = _CELL_PATTERN.match(cell).groups()
+        column = column_number(letters) + (0 if column_fixed else column_offset)
+        row = int(row) + (0 if row_fixed else row_offset)
+        return f"{column_fixed}{column_letters(column)}{row_fixed}{row}"
+
+    parts = []
+    for match in _EXCEL_TOKEN.finditer(formula):
+        text = match.group()
+        if match.lastgroup == 'ref':
+            prefix, bang, cells = text.rpartition('!')
+            text = prefix + bang + ':'.join(shift(cell) for cell in cells.split(':'))
+        parts.append(text)
+    return ''.join(parts)
+
+
+def expand_range(sheet, cells):
+    """'A1:B3' → 셀 노드 이름 목록 (행 우선)"""
+    if ':' not in cells:
+        return [cell_name(sheet, cells)]
+    first, _, last = cells.partition(':')
+    (c1, r1), (c2, r2) = split_cell(first), split_cell(last or first)
+    c1, c2 = sorted((c1, c2))
+    r1, r2 = sorted((r1, r2))
+    if (c2 - c1 + 1) * (r2 - r1 + 1) > MAX_RANGE_CELLS:
+        raise UnsupportedFormula(f"범위가 너무 큽니다: {cells}")
+    return [f"{sheet}!{column_letters(c)}{r}" for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)]
+
+
+def formula_tokens(formula, sheet):
+    """Excel 수식('=' 제외)을 수식 엔진 토큰으로 변환 (지원하지 않으면 UnsupportedFormula)"""
+    tokens = []
+    calls = []  # 여는 괄호마다 함수 호출 여부
+    pending_call = False
+    for match in _EXCEL_TOKEN.finditer(formula):
+        kind, text = match.lastgroup, match.group()
+        if kind == 'space':
+            continue
+        if kind == 'ref':
+            ref_sheet, cells = _split_sheet(text, sheet)
+            names = expand_range(ref_sheet, cells)
+            if len(names) > 1 and not (calls and calls[-1]):
+                raise UnsupportedFormula(f"함수 인자가 아닌 범위 참조입니다: {text}")
+            for i, name in enumerate(names):
+                if i:
+                    tokens.append(('op', ','))
+                tokens.append(('name', name))
+        elif kind == 'number':
+            tokens.append(('num', repr(float(text))))
+        elif kind == 'boolean':
+            tokens.append(('num', '1' if text == 'TRUE' else '0'))
+        elif kind == 'function':
+            function = EXCEL_FUNCTIONS.get(text.upper().replace('_XLFN.', ''))
+            if function is None:
+                raise UnsupportedFormula(f"지원하지 않는 함수입니다: {text}")
+            tokens.append(('func', function))
+            pending_call = True
+            continue
+        elif kind == 'operator':
+            if text not in EXCEL_OPERATORS:
+                raise UnsupportedFormula(f"지원하지 않는 연산자입니다: {text}")
+            if text == '(':
+                calls.append(pending_call)
+            elif text == ')':
+                if not calls:
+                    raise UnsupportedFormula("괄호가 맞지 않습니다")
+                calls.pop()
+            elif text == ',' and not (calls and calls[-1]):
+                raise UnsupportedFormula("함수 밖의 쉼표입니다")
+            tokens.append(('op', EXCEL_OPERATORS[text]))
+        elif kind == 'string':
+            raise UnsupportedFormula("문자열 값은 지원하지 않습니다")
+        elif kind == 'error':
+            raise UnsupportedFormula(f"오류 값을 참조합니다: {text}")
+        elif kind == 'name':
+            raise UnsupportedFormula(f"정의된 이름은 지원하지 않습니다: {text}")
+        else:
+            raise UnsupportedFormula(f"해석할 수 없는 문자입니다: {text}")
+        pending_call = False
+
+    if calls:
+        raise UnsupportedFormula("괄호가 맞지 않습니다")
+    tokens = excel_precedence(tokens)
+    # 변환 결과 문법 확인
+    try:
+        compile(' '.join('v' if kind == 'name' else value for kind, value in tokens), '<excel>', 'eval')
+    except SyntaxError:
+        raise UnsupportedFormula("수식 문법을 해석할 수 없습니다") from None
+    return tokens
+
+
+def excel_precedence(tokens):
+    """Excel 연산자 우선순위대로 괄호를 넣은 토큰 목록
+
+    Python과 달리 Excel은 부호(-A1^2 = (-A1)^2)가 ^보다 먼저이고, ^(2^3^2 = 64)와 비교는 왼쪽 결합이다.
+    """
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+
+    def take(expected=None):
+        nonlocal position
+        token = peek()
+        if token[0] is None or (expected is not None and token != ('op', expected)):
+            raise UnsupportedFormula("수식 문법을 해석할 수 없습니다")
+        position += 1
+        return token
+
+    def operand():
+        kind, value = peek()
+        if (kind, value) in (('op', '-'), ('op', '+')):
+            take()
+            return [('op', '('), (kind, value)] + operand() + [('op', ')')]
+        if kind in ('num', 'name'):
+            return [take()]
+        if kind == 'func':
+            parts = [take(), take('(')]
+            if peek() != ('op', ')'):
+                parts += expression()
+                while peek() == ('op', ','):
+                    parts += [take()] + expression()
+            return parts + [take(')')]
+        if (kind, value) == ('op', '('):
+            return [take()] + expression() + [take(')')]
+        raise UnsupportedFormula("수식 문법을 해석할 수 없습니다")
+
+    def expression(min_precedence=1):
+        left = operand()
+        while True:
+            kind, value = peek()
+            precedence = _BINARY_PRECEDENCE.get(value) if kind == 'op' else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            operator = take()
+            left = [('op', '(')] + left + [operator] + expression(precedence + 1) + [('op', ')')]
+
+    result = expression()
+    if position != len(tokens):
+        raise UnsupportedFormula("수식 문법을 해석할 수 없습니다")
+    return result
+
+
+def workbook_sheets(archive):
+    """통합문서의 (시트 이름, 시트 XML 경로) 목록 (시트 순서)"""
+    relationships = {}
+    with archive.open('xl/_rels/workbook.xml.rels') as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == f'{PKG_REL_NS}Relationship':
+                target = element.get('Target')
+                path = target.lstrip('/') if target.startswith('/') else str(PurePosixPath('xl') / target)
+                relationships[element.get('Id')] = path
+
+    sheets = []
+    with archive.open('xl/workbook.xml') as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == f'{NS}sheet':
+                sheets.append((element.get('name'), relationships[element.get(f'{REL_NS}id')]))
+    return sheets
+
+
+def shared_strings(archive):
+    """공유 문자열 목록 (서식 조각은 이어 붙임)"""
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == f'{NS}si':
+                strings.append(''.join(text.text or '' for text in element.iter(f'{NS}t')))
+                element.clear()
+    return strings
+
+
+def iter_cells(path, sheets=None):
+    """셀 단위 스트리밍 (시트 이름, 셀 주소, 수식 또는 None, 값)
+
+    값은 숫자(float), 문자열 또는 None. 공유 수식은 각 셀 기준으로 옮긴 수식을 돌려준다.
+    """
+    with zipfile.ZipFile(path) as archive:
+        strings = shared_strings(archive)
+        for sheet, sheet_path in workbook_sheets(archive):
+            if sheets is not None and sheet not in sheets:
+                continue
+            masters = {}  # 공유 수식 번호 → (수식, 열, 행)
+            with archive.open(sheet_path) as f:
+                for _, element in ET.iterparse(f):
+                    if element.tag == f'{NS}c':
+                        yield (sheet, *_read_cell(element, strings, masters))
+                        element.clear()
+                    elif element.tag == f'{NS}row':
+                        element.clear()
+
+
+def _read_cell(element, strings, masters):
+    ref = element.get('r')
+    cell_type = element.get('t')
+    formula_element = element.find(f'{NS}f')
+    value_element = element.find(f'{NS}v')
+    raw = value_element.text if value_element is not None else None
+
+    formula = None
+    if formula_element is not None:
+        formula = formula_element.text
+        if formula_element.get('t') == 'shared':
+            index = formula_element.get('si')
+            if formula:
+                masters[index] = (formula, *split_cell(ref))
+            elif index in masters:
+                master, column, row = masters[index]
+                target_column, target_row = split_cell(ref)
+                formula = translate_formula(master, target_row - row, target_column - column)
+
+    if cell_type == 's' and raw is not None:
+        value = strings[int(raw)]
+    elif cell_type == 'inlineStr':
+        value = ''.join(text.text or '' for text in element.iter(f'{NS}t'))
+    elif cell_type in ('str', 'e'):
+        value = raw
+    elif cell_type == 'b':
+        value = float(raw == '1') if raw is not None else None
+    else:
+        value = float(raw) if raw is not None else None
+    return ref, formula, value
+
+
+def import_workbook(path, sheets=None):
+    """통합문서 수식/상수를 수식 그래프로 변환
+
+    - 수식 셀 → 계산 수식 노드 ('시트!A1 = 원래 Excel 수식')
+    - 숫자 상수 셀 → 입력값 기본값, 참조되는 빈 셀 → 0
+    - 변환할 수 없는 수식 셀 → Excel에 저장된 값을 기본값으로 하는 입력값 (report['unsupported'])
+    반환값: (그래프, 보고서)
+    """
+    graph = FormulaGraph()
+    text_cells = set()
+    report = {'sheets': [], 'formulas': 0, 'constants': 0, 'text_cells': 0, 'unsupported': []}
+    for sheet, ref, formula, value in iter_cells(path, sheets):
+        if sheet not in report['sheets']:
+            report['sheets'].append(sheet)
+        name = cell_name(sheet, ref)
+        if formula is not None:
+            try:
+                tokens = formula_tokens(formula, sheet)
+            except UnsupportedFormula as e:
+                report['unsupported'].append((name, formula, str(e)))
+                graph.add(FormulaNode(name, location=sheet))
+                if isinstance(value, float):
+                    graph.set_default(name, value)
+                elif value is not None:
+                    text_cells.add(name)
+                continue
+            graph.add(FormulaNode(name, f"{name} = {formula}", location=sheet, tokens=tokens))
+            report['formulas'] += 1
+        elif isinstance(value, float):
+            graph.set_default(name, value)
+            report['constants'] += 1
+        elif value is not None:
+            text_cells.add(name)
+            report['text_cells'] += 1
+
+    # 참조되지만 값이 없는 셀은 Excel처럼 0 (문자열 셀은 NaN으로 남김)
+    for name in graph.input_names():
+        if name not in graph.defaults and name not in text_cells:
+            graph.set_default(name, 0.0)
+    return graph, report
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return (os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+
+
+def load_workbook_graph(path, cache_path=None, sheets=None):
+    """캐시를 사용하는 통합문서 가져오기 (원본 크기/수정 시각이 같으면 캐시에서 로드)
+
+    반환값: (그래프, 보고서), 보고서의 'cached'는 캐시 사용 여부
+    """
+    cache_path = cache_path or str(path) + CACHE_SUFFIX
+    signature = (*_source_signature(path), tuple(sheets) if sheets is not None else None)
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['version'] == CACHE_VERSION and cached['signature'] == signature:
+            graph = FormulaGraph()
+            graph.nodes, graph.defaults = cached['nodes'], cached['defaults']
+            return graph, dict(cached['report'], cached=True)
+    except Exception:
+        # 손상/이전 형식 캐시(클래스 변경 등 pickle이 내는 모든 예외)는 무시하고 다시 가져온다
+        pass
+
+    graph, report = import_workbook(path, sheets)
+    temporary = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'signature': signature, 'nodes': graph.nodes,
+                         'defaults': graph.defaults, 'report': report}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_path)
+    except OSError as e:
+        # 캐시를 쓰지 못해도 가져온 그래프는 그대로 반환
+        logger.warning(f"통합문서 캐시를 저장하지 못했습니다 ({cache_path}): {e}")
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return graph, dict(report, cached=False)
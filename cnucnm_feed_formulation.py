@@ -4,9 +4,19 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
-import sqlite3
 import json
-from pulp import *
+
+from cnucnm_database import connect
+from cnucnm_bootstrap import Seed, bootstrap
+from cnucnm_formulation_engine import (
+    IngredientMatrix, FormulationModel, DEFAULT_TIME_LIMIT
+)
+from cnucnm_formulation_cache import FormulationCache, open_shared_tier
+from cnucnm_formulation_pareto import pareto_frontier
+from cnucnm_formulation_robust import (
+    optimize_formulation_robust, NutrientStatisticsCache, load_ingredient_analyses, DEFAULT_PROBABILITY
+)
+from cnucnm_formulation_reoptimizer import build_price_reoptimizer
 
 # 페이지 설정
 st.set_page_config(
@@ -41,49 +51,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def init_database():
-    """데이터베이스 초기화"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
-    cursor = conn.cursor()
-    
-    # 사료 배합 최적화 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feed_formulations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            formulation_name TEXT,
-            animal_id INTEGER,
-            animal_name TEXT,
-            target_energy REAL,
-            target_protein REAL,
-            target_dry_matter REAL,
-            total_cost REAL,
-            formulation_date TIMESTAMP,
-            formulation_data TEXT,
-            FOREIGN KEY (animal_id) REFERENCES animals (id)
-        )
-    ''')
-    
-    # 사료 원료 테이블 (기본 데이터)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feed_ingredients (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ingredient_name TEXT,
-            category TEXT,
-            dry_matter REAL,
-            crude_protein REAL,
-            energy_mcal REAL,
-            ndf REAL,
-            adf REAL,
-            ca REAL,
-            p REAL,
-            price_per_kg REAL,
-            max_inclusion REAL,
-            min_inclusion REAL,
-            description TEXT
-        )
-    ''')
-    
-    # 기본 사료 원료 데이터
+def seed_feed_ingredients(conn):
+    """기본 사료 원료 데이터 (원료 표를 이 목록으로 교체)"""
     ingredients_data = [
         ('옥수수', '곡류', 88.0, 8.5, 3.4, 9.0, 2.5, 0.02, 0.25, 350, 60.0, 5.0, '주요 에너지원'),
         ('대두박', '단백질원료', 90.0, 44.0, 2.8, 7.0, 5.0, 0.25, 0.65, 1200, 25.0, 10.0, '주요 단백질원'),
@@ -100,136 +69,122 @@ def init_database():
         ('미네랄프리믹스', '미네랄', 100.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 3000, 1.0, 0.5, '미네랄 보충제')
     ]
     
-    cursor.execute('DELETE FROM feed_ingredients')
-    cursor.executemany('''
+    conn.execute('DELETE FROM feed_ingredients')
+    conn.executemany('''
         INSERT INTO feed_ingredients 
         (ingredient_name, category, dry_matter, crude_protein, energy_mcal, ndf, adf, ca, p, price_per_kg, max_inclusion, min_inclusion, description)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', ingredients_data)
-    
-    conn.commit()
-    conn.close()
+
+SEEDS = [
+    Seed('feed_ingredients', 1, seed_feed_ingredients),
+]
+
+@st.cache_resource
+def init_database():
+    """데이터베이스 초기화 (프로세스당 한 번: 마이그레이션과 기본 데이터 적용)"""
+    return bootstrap(SEEDS)
 
 def get_ingredients():
     """사료 원료 데이터 조회"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     df = pd.read_sql_query('SELECT * FROM feed_ingredients ORDER BY category, ingredient_name', conn)
     conn.close()
     return df
 
+@st.cache_resource
+def get_formulation_cache(shared_tier='sqlite'):
+    """세션 간 공유되는 배합 결과 캐시 (공유 계층: 'sqlite', 'redis' 또는 None)"""
+    return FormulationCache(shared=open_shared_tier(shared_tier, 'cnucnm_data/cnucnm.db'),
+                            db_path='cnucnm_data/cnucnm.db')
+
+@st.cache_resource
+def get_nutrient_statistics():
+    """세션 간 공유되는 원료 분석 통계 캐시"""
+    return NutrientStatisticsCache()
+
+def refresh_nutrient_statistics():
+    """분석 이력을 반영한 통계 (분석이 추가된 원료만 다시 계산)"""
+    statistics = get_nutrient_statistics()
+    conn = connect()
+    statistics.refresh(load_ingredient_analyses(conn))
+    conn.close()
+    return statistics
+
+def add_ingredient_analysis(ingredient_id, analysis_date, energy_mcal, crude_protein, laboratory):
+    """원료 성분 분석 결과 저장"""
+    conn = connect()
+    conn.execute('''
+        INSERT INTO ingredient_analyses (ingredient_id, analysis_date, energy_mcal, crude_protein, laboratory)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (int(ingredient_id), analysis_date, energy_mcal, crude_protein, laboratory or None))
+    conn.commit()
+    conn.close()
+
 def optimize_feed_formulation(ingredients_df, target_energy, target_protein, target_dry_matter, 
-                            max_ingredients=10, cost_weight=1.0, quality_weight=1.0):
-    """사료 배합 최적화 (선형계획법)"""
+                            max_ingredients=None, cost_weight=1.0, quality_weight=1.0, solver=None, cache=None,
+                            min_batch_ratio=0.0, time_limit=DEFAULT_TIME_LIMIT):
+    """사료 배합 최적화 (solver: 'highs' 또는 'pulp', cache: FormulationCache)
     
-    # 문제 정의
-    prob = LpProblem("Feed_Formulation_Optimization", LpMinimize)
+    max_ingredients가 원료 수보다 작거나 min_batch_ratio(원료별 최소 투입 비율)가 있으면
+    정수계획으로 풀고, time_limit(초)에 도달하면 현재 최선해를 반환한다.
+    """
     
-    # 의사결정 변수 (각 원료의 비율)
-    ingredient_vars = LpVariable.dicts("Ingredient",
-                                     ingredients_df['ingredient_name'],
-                                     lowBound=0,
-                                     upBound=1)
+    # 원료 × 영양소 행렬로 변환 후 한 번에 모델 생성
+    matrix = IngredientMatrix.from_dataframe(ingredients_df)
+    model = FormulationModel(
+        matrix, solver=solver,
+        max_ingredients=max_ingredients if max_ingredients is not None and max_ingredients < len(matrix) else None,
+        min_batch_ratio=min_batch_ratio, time_limit=time_limit
+    )
     
-    # 목적함수: 비용 최소화 + 품질 편차 최소화
-    cost_objective = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['price_per_kg'].iloc[0] 
-                           for name in ingredients_df['ingredient_name']])
+    if cache is not None:
+        return cache.optimize(model, target_energy, target_protein, target_dry_matter)
     
-    # 제약조건
-    # 1. 총 비율 = 100%
-    prob += lpSum([ingredient_vars[name] for name in ingredients_df['ingredient_name']]) == 1.0
-    
-    # 2. 에너지 요구량 충족
-    energy_constraint = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['energy_mcal'].iloc[0] 
-                              for name in ingredients_df['ingredient_name']])
-    prob += energy_constraint >= target_energy * 0.95  # 95% 이상 충족
-    prob += energy_constraint <= target_energy * 1.05  # 105% 이하
-    
-    # 3. 단백질 요구량 충족
-    protein_constraint = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['crude_protein'].iloc[0] 
-                               for name in ingredients_df['ingredient_name']])
-    prob += protein_constraint >= target_protein * 0.95  # 95% 이상 충족
-    prob += protein_constraint <= target_protein * 1.05  # 105% 이하
-    
-    # 4. 건물 함량
-    dm_constraint = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['dry_matter'].iloc[0] 
-                          for name in ingredients_df['ingredient_name']])
-    prob += dm_constraint >= target_dry_matter * 0.95
+    return model.optimize(target_energy, target_protein, target_dry_matter)
+
+def optimize_feed_formulation_pareto(ingredients_df, target_energy, target_protein, target_dry_matter,
+                                     cost_weight=1.0, quality_weight=1.0, n_points=25, solver=None):
+    """비용-영양 편차 파레토 곡선 (이웃 점의 기저에서 재개하며 한 번에 계산)"""
+    matrix = IngredientMatrix.from_dataframe(ingredients_df)
     
-    # 5. 각 원료의 최대/최소 함량 제한
-    for _, row in ingredients_df.iterrows():
-        name = row['ingredient_name']
-        prob += ingredient_vars[name] <= row['max_inclusion'] / 100.0
-        prob += ingredient_vars[name] >= row['min_inclusion'] / 100.0
+    return pareto_frontier(matrix, target_energy, target_protein, target_dry_matter, n_points=n_points,
+                           cost_weight=cost_weight, quality_weight=quality_weight, solver=solver)
+
+def optimize_feed_formulation_robust(ingredients_df, statistics, target_energy, target_protein, target_dry_matter,
+                                     probability=0.95, solver=None):
+    """분석 이력 통계(NutrientStatisticsCache) 기반 확률 제약 배합
     
-    # 6. NDF 함량 제한 (25-35%)
-    ndf_constraint = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['ndf'].iloc[0] 
-                           for name in ingredients_df['ingredient_name']])
-    prob += ndf_constraint >= 25.0
-    prob += ndf_constraint <= 35.0
+    에너지·단백질 최소 기준을 probability 이상의 확률로 동시에 만족하는 최소 비용 배합
+    """
+    matrix = IngredientMatrix.from_dataframe(ingredients_df)
     
-    # 7. Ca:P 비율 (1.5:1 ~ 2.5:1)
-    ca_constraint = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['ca'].iloc[0] 
-                          for name in ingredients_df['ingredient_name']])
-    p_constraint = lpSum([ingredient_vars[name] * ingredients_df[ingredients_df['ingredient_name'] == name]['p'].iloc[0] 
-                         for name in ingredients_df['ingredient_name']])
-    prob += ca_constraint >= 1.5 * p_constraint
-    prob += ca_constraint <= 2.5 * p_constraint
+    return optimize_formulation_robust(matrix, statistics, target_energy, target_protein, target_dry_matter,
+                                       probability=probability, solver=solver)
+
+def update_ingredient_price(ingredients_df, ingredient_id, new_price):
+    """원료 가격 변경 후 저장된 배합을 새 가격으로 재최적화
     
-    # 목적함수 설정
-    prob += cost_objective
+    변경 전 원료 행렬로 배합별 최적 기저를 만든 뒤 가격만 바꿔 재개하므로 대부분 계산을 생략/재개한다.
+    반환값: {배합 기록 ID: 결과 딕셔너리 ('reoptimization': unchanged/warm_start/cold_start)}
+    """
+    matrix = IngredientMatrix.from_dataframe(ingredients_df)
+    reoptimizer = build_price_reoptimizer(matrix, get_formulation_history())
     
-    # 최적화 실행
-    prob.solve()
+    prices = matrix.prices.copy()
+    prices[np.flatnonzero(ingredients_df['id'].to_numpy() == ingredient_id)[0]] = new_price
+    results = reoptimizer.update_prices(prices)
     
-    if LpStatus[prob.status] == 'Optimal':
-        # 결과 추출
-        formulation = {}
-        total_cost = 0
-        
-        for name in ingredients_df['ingredient_name']:
-            ratio = ingredient_vars[name].varValue
-            if ratio > 0.001:  # 0.1% 이상인 원료만 포함
-                formulation[name] = ratio * 100  # 퍼센트로 변환
-                price = ingredients_df[ingredients_df['ingredient_name'] == name]['price_per_kg'].iloc[0]
-                total_cost += ratio * price
-        
-        # 영양소 함량 계산
-        nutrients = {
-            'energy_mcal': sum([formulation.get(name, 0) / 100 * ingredients_df[ingredients_df['ingredient_name'] == name]['energy_mcal'].iloc[0] 
-                               for name in ingredients_df['ingredient_name']]),
-            'crude_protein': sum([formulation.get(name, 0) / 100 * ingredients_df[ingredients_df['ingredient_name'] == name]['crude_protein'].iloc[0] 
-                                 for name in ingredients_df['ingredient_name']]),
-            'dry_matter': sum([formulation.get(name, 0) / 100 * ingredients_df[ingredients_df['ingredient_name'] == name]['dry_matter'].iloc[0] 
-                              for name in ingredients_df['ingredient_name']]),
-            'ndf': sum([formulation.get(name, 0) / 100 * ingredients_df[ingredients_df['ingredient_name'] == name]['ndf'].iloc[0] 
-                       for name in ingredients_df['ingredient_name']]),
-            'ca': sum([formulation.get(name, 0) / 100 * ingredients_df[ingredients_df['ingredient_name'] == name]['ca'].iloc[0] 
-                      for name in ingredients_df['ingredient_name']]),
-            'p': sum([formulation.get(name, 0) / 100 * ingredients_df[ingredients_df['ingredient_name'] == name]['p'].iloc[0] 
-                     for name in ingredients_df['ingredient_name']])
-        }
-        
-        return {
-            'status': 'success',
-            'formulation': formulation,
-            'total_cost': total_cost,
-            'nutrients': nutrients,
-            'target_met': {
-                'energy': nutrients['energy_mcal'] >= target_energy * 0.95 and nutrients['energy_mcal'] <= target_energy * 1.05,
-                'protein': nutrients['crude_protein'] >= target_protein * 0.95 and nutrients['crude_protein'] <= target_protein * 1.05,
-                'dry_matter': nutrients['dry_matter'] >= target_dry_matter * 0.95
-            }
-        }
-    else:
-        return {
-            'status': 'infeasible',
-            'message': '주어진 제약조건으로 최적해를 찾을 수 없습니다.'
-        }
+    conn = connect()
+    conn.execute('UPDATE feed_ingredients SET price_per_kg = ? WHERE id = ?', (new_price, ingredient_id))
+    conn.commit()
+    conn.close()
+    return results
 
 def save_formulation(formulation_name, animal_id, animal_name, target_energy, target_protein, 
                      target_dry_matter, total_cost, formulation_data):
     """사료 배합 결과 저장"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -247,7 +202,7 @@ def save_formulation(formulation_name, animal_id, animal_name, target_energy, ta
 
 def get_formulation_history():
     """사료 배합 기록 조회"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     df = pd.read_sql_query('''
         SELECT * FROM feed_formulations 
         ORDER BY formulation_date DESC 
@@ -281,12 +236,20 @@ def main():
             target_dry_matter = st.number_input("목표 건물 함량 (%)", min_value=85.0, max_value=95.0, value=90.0, step=0.5)
             
             st.markdown("**⚙️ 최적화 설정**")
-            max_ingredients = st.slider("최대 원료 수", min_value=5, max_value=15, value=10)
+            # 최소 함량이 지정된 원료는 항상 들어가므로 원료 수 제한은 그 수 이상에서만 (기본: 제한 없음)
+            ingredients_df = get_ingredients()
+            required_count = max(int((ingredients_df['min_inclusion'].fillna(0) > 0).sum()), 1)
+            if required_count < len(ingredients_df):
+                max_ingredients = st.slider("최대 원료 수", min_value=required_count,
+                                            max_value=len(ingredients_df), value=len(ingredients_df))
+            else:
+                max_ingredients = None
+                st.caption(f"모든 원료({len(ingredients_df)}종)에 최소 함량이 지정되어 원료 수 제한을 적용하지 않습니다.")
+            min_batch_percent = st.slider("원료별 최소 투입 비율 (%)", min_value=0.0, max_value=10.0, value=0.0, step=0.5)
             cost_weight = st.slider("비용 가중치", min_value=0.1, max_value=2.0, value=1.0, step=0.1)
             
         with col2:
             st.markdown("**📈 현재 원료 가격**")
-            ingredients_df = get_ingredients()
             
             # 원료별 가격 표시
             price_df = ingredients_df[['ingredient_name', 'category', 'price_per_kg']].copy()
@@ -298,11 +261,19 @@ def main():
             with st.spinner("사료 배합을 최적화하고 있습니다..."):
                 result = optimize_feed_formulation(
                     ingredients_df, target_energy, target_protein, target_dry_matter, 
-                    max_ingredients, cost_weight
+                    max_ingredients, cost_weight, cache=get_formulation_cache(),
+                    min_batch_ratio=min_batch_percent / 100.0
                 )
                 
                 if result['status'] == 'success':
                     st.success("✅ 사료 배합 최적화가 완료되었습니다!")
+                    if result.get('mip_status') == 'time_limit':
+                        st.warning(f"⏱️ 제한 시간({DEFAULT_TIME_LIMIT:.0f}초) 안에 최적성을 확인하지 못해 현재 최선의 배합을 표시합니다.")
+                    
+                    cache_stats = get_formulation_cache().stats()
+                    hits = cache_stats['hits'] + cache_stats['shared_hits'] - cache_stats['stale_hits']
+                    st.caption(f"배합 캐시: 적중 {hits}회 / "
+                               f"미적중 {cache_stats['misses'] + cache_stats['stale_hits']}회 / 제거 {cache_stats['evictions']}회")
                     
                     # 결과 저장
                     save_formulation(
@@ -378,6 +349,68 @@ def main():
                         
                 else:
                     st.error(f"❌ 최적화 실패: {result['message']}")
+        
+        # 비용-품질 절충 곡선
+        if st.button("📈 비용-영양 편차 절충 곡선"):
+            with st.spinner("절충 배합을 계산하고 있습니다..."):
+                frontier = optimize_feed_formulation_pareto(
+                    ingredients_df, target_energy, target_protein, target_dry_matter, cost_weight
+                )
+            
+            if frontier['status'] == 'success':
+                frontier_df = pd.DataFrame([
+                    {
+                        '총 비용(원/kg)': point['total_cost'],
+                        '영양 편차(%)': point['deviation'],
+                        '에너지 (Mcal/kg DM)': point['nutrients']['energy_mcal'],
+                        '단백질 (%)': point['nutrients']['crude_protein'],
+                        '원료 수': len(point['formulation'])
+                    }
+                    for point in frontier['points']
+                ])
+                
+                fig = px.line(frontier_df, x='영양 편차(%)', y='총 비용(원/kg)', markers=True,
+                              hover_data=['에너지 (Mcal/kg DM)', '단백질 (%)', '원료 수'],
+                              title="비용 - 영양 편차 파레토 곡선")
+                if frontier['selected'] is not None:
+                    selected = frontier_df.iloc[frontier['selected']]
+                    fig.add_trace(go.Scatter(x=[selected['영양 편차(%)']], y=[selected['총 비용(원/kg)']],
+                                             mode='markers', marker=dict(size=14, color='red'), name='비용 가중치 기준'))
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(frontier_df, use_container_width=True)
+            else:
+                st.error(f"❌ 최적화 실패: {frontier['message']}")
+        
+        # 분석 이력 기반 확률 제약 배합
+        probability = st.slider("목표 만족 확률 (%)", min_value=50.0, max_value=99.0,
+                                value=DEFAULT_PROBABILITY * 100, step=1.0)
+        if st.button("🛡️ 성분 변동을 고려한 배합 (확률 제약)"):
+            with st.spinner("원료 성분 변동을 반영한 배합을 계산하고 있습니다..."):
+                robust = optimize_feed_formulation_robust(
+                    ingredients_df, refresh_nutrient_statistics(), target_energy, target_protein,
+                    target_dry_matter, probability=probability / 100.0
+                )
+            
+            if robust['status'] == 'success':
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    st.metric("총 비용", f"{robust['total_cost']:.0f} 원/kg")
+                    
+                with col2:
+                    st.metric("에너지 만족 확률", f"{robust['probabilities']['energy_mcal'] * 100:.1f} %")
+                    
+                with col3:
+                    st.metric("단백질 만족 확률", f"{robust['probabilities']['crude_protein'] * 100:.1f} %")
+                
+                st.caption(f"두 기준 동시 만족 확률 {robust['joint_probability'] * 100:.1f}% "
+                           f"(절단 평면 {robust['cuts']}개)")
+                st.dataframe(pd.DataFrame([
+                    {'원료명': name, '비율(%)': ratio}
+                    for name, ratio in robust['formulation'].items()
+                ]), use_container_width=True)
+            else:
+                st.error(f"❌ 최적화 실패: {robust['message']}")
     
     with tab2:
         st.subheader("📊 원료 관리")
@@ -415,6 +448,81 @@ def main():
                          hover_data=['ingredient_name'],
                          title="단백질 함량 vs 가격 (크기: 에너지 함량)")
         st.plotly_chart(fig3, use_container_width=True)
+        
+        # 원료 성분 분석 이력 (확률 제약 배합의 평균/분산)
+        st.subheader("🧪 원료 성분 분석 결과")
+        
+        with st.form("ingredient_analysis"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                analysis_ingredient = st.selectbox("분석 원료", ingredients_df['ingredient_name'].tolist())
+                analysis_date = st.date_input("분석일", value=datetime.now().date())
+                laboratory = st.text_input("분석 기관")
+            
+            with col2:
+                analysis_energy = st.number_input("에너지 (Mcal/kg DM)", min_value=0.0, value=0.0, step=0.01)
+                analysis_protein = st.number_input("단백질 (%)", min_value=0.0, value=0.0, step=0.1)
+            
+            if st.form_submit_button("분석 결과 추가"):
+                analysis_id = ingredients_df.loc[ingredients_df['ingredient_name'] == analysis_ingredient, 'id'].iloc[0]
+                add_ingredient_analysis(analysis_id, analysis_date, analysis_energy, analysis_protein, laboratory)
+                st.success(f"✅ {analysis_ingredient} 분석 결과를 추가했습니다.")
+        
+        statistics = refresh_nutrient_statistics()
+        analysis_df = pd.DataFrame([
+            {
+                '원료명': name,
+                '분석 건수': stats.count,
+                '평균 에너지': stats.mean[0],
+                '평균 단백질': stats.mean[1],
+                '에너지 표준편차': np.sqrt(stats.cov[0, 0]),
+                '단백질 표준편차': np.sqrt(stats.cov[1, 1])
+            }
+            for name, stats in ((name, statistics.get(name)) for name in ingredients_df['ingredient_name'])
+            if stats is not None
+        ])
+        if analysis_df.empty:
+            st.info("분석 결과가 없는 원료는 원료 표의 값을 변동 없이 사용합니다.")
+        else:
+            st.dataframe(analysis_df, use_container_width=True)
+        
+        # 가격 변경 → 저장된 배합 재최적화
+        st.subheader("💱 원료 가격 변경")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            ingredient_name = st.selectbox("원료", ingredients_df['ingredient_name'].tolist())
+            selected = ingredients_df[ingredients_df['ingredient_name'] == ingredient_name].iloc[0]
+        
+        with col2:
+            new_price = st.number_input("새 가격 (원/kg)", min_value=0.0, value=float(selected['price_per_kg']),
+                                        step=10.0, key=f"price_{selected['id']}")
+        
+        if st.button("가격 반영 및 저장된 배합 재최적화"):
+            if new_price == selected['price_per_kg']:
+                st.info("가격이 바뀌지 않았습니다.")
+            else:
+                with st.spinner("저장된 배합을 새 가격으로 재최적화하고 있습니다..."):
+                    results = update_ingredient_price(ingredients_df, selected['id'], new_price)
+                st.success(f"✅ {ingredient_name} 가격을 {new_price:,.0f}원/kg으로 변경했습니다.")
+                
+                history_df = get_formulation_history().set_index('id')
+                actions = {'unchanged': '변화 없음', 'warm_start': '기존 기저에서 재개', 'cold_start': '다시 풀이'}
+                reoptimized_df = pd.DataFrame([
+                    {
+                        '배합명': history_df.loc[key, 'formulation_name'],
+                        '이전 비용(원/kg)': history_df.loc[key, 'total_cost'],
+                        '새 비용(원/kg)': result['total_cost'] if result['status'] == 'success' else None,
+                        '재최적화': actions.get(result['reoptimization'], result['reoptimization'])
+                    }
+                    for key, result in results.items()
+                ])
+                if reoptimized_df.empty:
+                    st.info("재최적화할 배합 기록이 없습니다.")
+                else:
+                    st.dataframe(reoptimized_df, use_container_width=True)
     
     with tab3:
         st.subheader("📚 배합 기록")
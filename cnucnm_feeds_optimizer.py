@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+CNUCNM feeds 테이블 기반 사료 배합 최적화
+AI 인터페이스와 Flask AI API에서 사용하는 결정적 선형계획 엔진 및 결과 캐시
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from cnucnm_formulation_engine import LinearProgram, solve_lp
+
+DB_PATH = 'cnucnm_data/cnucnm.db'
+
+# feeds 테이블 영양소 컬럼 (행렬의 열 순서)
+FEED_NUTRIENTS = ['protein', 'fat', 'fiber', 'calcium', 'phosphorus']
+
+# 캐시 키 정규화 자릿수 (목표값은 소수 둘째 자리, 비용은 원 단위; 풀이는 요청값 그대로)
+TARGET_DECIMALS = 2
+
+# 결과 캐시 최대 항목 수
+MIX_CACHE_SIZE = 1024
+
+# 캐시된 배합으로 다른 요청값의 제약을 확인할 때 허용 오차
+CONSTRAINT_TOLERANCE = 1e-9
+
+FeedLibrary = namedtuple('FeedLibrary', ['records', 'names', 'nutrients', 'prices'])
+FeedMix = namedtuple('FeedMix', ['status', 'ratios', 'totals', 'cost'])
+FeedMixRequest = namedtuple('FeedMixRequest', ['target_protein', 'target_fat', 'min_fiber', 'max_cost',
+                                               'min_calcium', 'min_phosphorus', 'ca_p_ratio'])
+
+# 버전 조회 전용 연결 (DB 경로별 하나, 요청마다 새로 연결하지 않음)
+_version_connections = {}
+_version_lock = threading.Lock()
+
+# 결과 캐시 {(DB 경로, 버전, 정규화된 요청): (풀이에 쓴 요청, FeedMix)}
+_mix_cache = OrderedDict()
+_mix_lock = threading.Lock()
+_mix_stats = {'hits': 0, 'misses': 0, 'stale_hits': 0}
+
+
+def get_table_version(conn, table):
+    """테이블 버전 조회 (table_versions 와 트리거는 마이그레이션 6에서 생성, 읽기만 한다)"""
+    row = conn.execute('SELECT version FROM table_versions WHERE table_name = ?', (table,)).fetchone()
+    return row[0] if row else 0
+
+
+@lru_cache(maxsize=8)
+def load_feed_library(db_path, version):
+    """feeds 테이블을 행렬로 로드 (버전별로 한 번만 읽음)"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute('SELECT * FROM feeds ORDER BY id').fetchall()
+    conn.close()
+
+    records = tuple(dict(row) for row in rows)
+    nutrients = np.array([[row[col] or 0.0 for col in FEED_NUTRIENTS] for row in records], dtype=np.float64)
+    prices = np.array([row['price_per_kg'] or 0.0 for row in records], dtype=np.float64)
+    return FeedLibrary(records, tuple(row['feed_name'] for row in records),
+                       nutrients.reshape(len(records), len(FEED_NUTRIENTS)), prices)
+
+
+def _solve_feed_mix(library, request):
+    """비용 최소화 배합 (요청값 그대로 풀이)"""
+    target_protein, target_fat, min_fiber, max_cost, min_calcium, min_phosphorus, ca_p_ratio = request
+    n_feeds = len(library.names)
+    if n_feeds == 0:
+        return FeedMix('Infeasible', (), {}, 0.0)
+
+    protein = library.nutrients[:, FEED_NUTRIENTS.index('protein')]
+    fat = library.nutrients[:, FEED_NUTRIENTS.index('fat')]
+    fiber = library.nutrients[:, FEED_NUTRIENTS.index('fiber')]
+    calcium = library.nutrients[:, FEED_NUTRIENTS.index('calcium')]
+    phosphorus = library.nutrients[:, FEED_NUTRIENTS.index('phosphorus')]
+
+    # 단백질/지방/섬유질/칼슘/인 최소, 비용 상한, 비율 합 = 1
+    A_ub = [-protein, -fat, -fiber, -calcium, -phosphorus, library.prices]
+    b_ub = [-target_protein, -target_fat, -min_fiber, -min_calcium, -min_phosphorus, max_cost]
+    if ca_p_ratio is not None:
+        # low·P <= Ca <= high·P
+        A_ub += [ca_p_ratio[0] * phosphorus - calcium, calcium - ca_p_ratio[1] * phosphorus]
+        b_ub += [0.0, 0.0]
+    lp = LinearProgram(
+        c=library.prices,
+        A_ub=np.vstack(A_ub),
+        b_ub=np.array(b_ub),
+        A_eq=np.ones((1, n_feeds)),
+        b_eq=np.array([1.0]),
+        lower=np.zeros(n_feeds),
+        upper=np.ones(n_feeds)
+    )
+    status, ratios = solve_lp(lp)
+    if ratios is None:
+        return FeedMix(status, (), {}, 0.0)
+
+    supplied = ratios @ library.nutrients
+    totals = {name: float(supplied[i]) for i, name in enumerate(FEED_NUTRIENTS)}
+    return FeedMix(status, tuple(float(r) for r in ratios), totals, float(library.prices @ ratios))
+
+
+def _request_key(request):
+    """캐시 키용 정규화 요청 (목표값 소수 둘째 자리, 비용 원 단위)"""
+    return (
+        round(request.target_protein, TARGET_DECIMALS),
+        round(request.target_fat, TARGET_DECIMALS),
+        round(request.min_fiber, TARGET_DECIMALS),
+        round(request.max_cost),
+        round(request.min_calcium, TARGET_DECIMALS),
+        round(request.min_phosphorus, TARGET_DECIMALS),
+        None if request.ca_p_ratio is None else tuple(round(r, TARGET_DECIMALS) for r in request.ca_p_ratio)
+    )
+
+
+def mix_satisfies(mix, request, tolerance=CONSTRAINT_TOLERANCE):
+    """캐시된 최적 배합이 요청값의 제약(영양소 최소, 비용 상한, Ca:P 비율)을 모두 만족하는지"""
+    if mix.status != 'Optimal':
+        return False
+    totals = mix.totals
+    if (totals['protein'] < request.target_protein - tolerance
+            or totals['fat'] < request.target_fat - tolerance
+            or totals['fiber'] < request.min_fiber - tolerance
+            or totals['calcium'] < request.min_calcium - tolerance
+            or totals['phosphorus'] < request.min_phosphorus - tolerance
+            or mix.cost > request.max_cost + tolerance):
+        return False
+    if request.ca_p_ratio is not None:
+        low, high = request.ca_p_ratio
+        if not (low * totals['phosphorus'] - tolerance <= totals['calcium']
+                <= high * totals['phosphorus'] + tolerance):
+            return False
+    return True
+
+
+def current_table_version(table, db_path=DB_PATH):
+    """DB 경로별 상시 연결로 테이블 버전 조회 (캐시 무효화 판단용)"""
+    with _version_lock:
+        conn = _version_connections.get(db_path)
+        if conn is None:
+            conn = _version_connections[db_path] = sqlite3.connect(db_path, check_same_thread=False)
+        return get_table_version(conn, table)
+
+
+def optimize_feed_mix(target_protein, target_fat, max_cost, min_fiber=0.0, db_path=DB_PATH,
+                      min_calcium=0.0, min_phosphorus=0.0, ca_p_ratio=None):
+    """feeds 테이블 기반 사료 배합 최적화
+
+    ca_p_ratio: (최소, 최대) Ca:P 비율 (None 이면 제한 없음)
+    캐시 키만 정규화한 요청값을 쓰고 풀이는 요청값 그대로 한다. 같은 키의 다른 요청값으로 푼 배합은
+    이번 요청의 제약을 모두 만족할 때만 재사용하고, 아니면 다시 풀어 항목을 바꾼다.
+    반환값: (FeedLibrary, FeedMix) — 캐시된 객체이므로 호출자는 수정하지 않는다.
+    """
+    version = current_table_version('feeds', db_path)
+    library = load_feed_library(db_path, version)
+    request = FeedMixRequest(
+        float(target_protein), float(target_fat), float(min_fiber), float(max_cost),
+        float(min_calcium), float(min_phosphorus),
+        None if ca_p_ratio is None else tuple(float(r) for r in ca_p_ratio)
+    )
+    key = (db_path, version, _request_key(request))
+
+    with _mix_lock:
+        entry = _mix_cache.get(key)
+        if entry is not None:
+            _mix_cache.move_to_end(key)
+    if entry is not None:
+        solved_request, mix = entry
+        if solved_request == request or mix_satisfies(mix, request):
+            with _mix_lock:
+                _mix_stats['hits'] += 1
+            return library, mix
+
+    mix = _solve_feed_mix(library, request)
+    with _mix_lock:
+        _mix_stats['stale_hits' if entry is not None else 'misses'] += 1
+        _mix_cache[key] = (request, mix)
+        _mix_cache.move_to_end(key)
+        if len(_mix_cache) > MIX_CACHE_SIZE:
+            _mix_cache.popitem(last=False)
+    return library, mix
+
+
+def feed_mix_cache_info():
+    """결과 캐시 통계 (hits, misses, stale_hits: 같은 키지만 제약을 만족하지 않아 다시 푼 횟수, maxsize, currsize)"""
+    with _mix_lock:
+        return dict(_mix_stats, maxsize=MIX_CACHE_SIZE, currsize=len(_mix_cache))
@@ -15,6 +15,8 @@ from firebase_admin import credentials, db
 import json
 import os
 
+from cnucnm_nasem_requirements import calculate_total_requirements
+
 # 페이지 설정
 st.set_page_config(
     page_title="CNUCNM Firebase 통합 시스템",
@@ -117,61 +119,6 @@ def save_data(ref, path, data):
         st.error(f"데이터 저장 오류: {e}")
         return False
 
-def calculate_nutrition_requirements(weight, age_months, production_stage, milk_yield=0, pregnancy_stage=0):
-    """영양 요구량 계산 (NASEM 2021 기준)"""
-    # 기초 대사율 (kcal/day)
-    basal_metabolic_rate = 70 * (weight ** 0.75)
-    
-    # 활동 요구량 (기초 대사율의 15%)
-    activity_requirement = basal_metabolic_rate * 0.15
-    
-    # 총 유지 요구량
-    maintenance_energy = basal_metabolic_rate + activity_requirement
-    
-    # 단백질 유지 요구량 (g/day)
-    maintenance_protein = 3.8 * (weight ** 0.75)
-    
-    # 생산 요구량
-    production_energy = 0
-    production_protein = 0
-    
-    if production_stage == "유우":
-        production_energy = milk_yield * 750  # kcal/kg milk
-        production_protein = milk_yield * 85   # g/kg milk
-    elif production_stage == "임신":
-        pregnancy_factors = {1: 0.1, 2: 0.2, 3: 0.4}
-        factor = pregnancy_factors.get(pregnancy_stage, 0.1)
-        production_energy = 5000 * factor
-        production_protein = 200 * factor
-    elif production_stage == "성장":
-        production_energy = 3000  # kcal/kg 체중 증가
-        production_protein = 150   # g/kg 체중 증가
-    
-    # 총 요구량
-    total_energy = maintenance_energy + production_energy
-    total_protein = maintenance_protein + production_protein
-    
-    # 건물 섭취량 (체중의 2.5%)
-    dry_matter_intake = weight * 0.025
-    
-    return {
-        'maintenance': {
-            'energy_kcal': maintenance_energy,
-            'protein_g': maintenance_protein,
-            'dry_matter_kg': weight * 0.02
-        },
-        'production': {
-            'energy_kcal': production_energy,
-            'protein_g': production_protein
-        },
-        'total': {
-            'energy_kcal': total_energy,
-            'energy_mcal': total_energy / 1000,
-            'protein_g': total_protein,
-            'dry_matter_kg': dry_matter_intake
-        }
-    }
-
 def optimize_feed_formulation(target_energy, target_protein, target_dry_matter, ingredients_data):
     """사료 배합 최적화 (간단한 선형 프로그래밍)"""
     try:
@@ -349,7 +296,7 @@ def main():
             calc_pregnancy_stage = st.selectbox("임신 단계", [1, 2, 3], format_func=lambda x: f"{x}단계") if calc_production_stage == "임신" else 0
         
         if st.button("영양 요구량 계산", type="primary"):
-            requirements = calculate_nutrition_requirements(
+            requirements = calculate_total_requirements(
                 calc_weight, calc_age_months, calc_production_stage, calc_milk_yield, calc_pregnancy_stage
             )
             
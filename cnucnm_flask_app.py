@@ -4,12 +4,15 @@ CNUCNM Flask 백엔드 API
 엔터프라이즈급 동물 관리 시스템
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import pandas as pd
 from datetime import datetime, date
 import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import hashlib
 import jwt
@@ -17,6 +20,12 @@ from functools import wraps
 import numpy as np
 from scipy.optimize import minimize
 
+from cnucnm_formulation_engine import IngredientMatrix, optimize_formulation_batch, SOLVER_BACKENDS
+from cnucnm_migrations import migrate
+from cnucnm_feeds_optimizer import optimize_feed_mix
+from cnucnm_nasem_requirements import calculate_total_requirements
+from cnucnm_growth_simulation import predict_productivity as simulate_productivity, SIMULATION_DAYS
+
 app = Flask(__name__)
 CORS(app)
 
@@ -24,6 +33,18 @@ CORS(app)
 app.config['SECRET_KEY'] = 'cnucnm-secret-key-2024'
 app.config['DATABASE'] = 'cnucnm_data/cnucnm.db'
 
+# 일괄 배합 최적화용 프로세스 풀 (요청마다 만들지 않고 프로세스당 하나, CPU 수만큼)
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+def get_batch_executor():
+    """공유 일괄 최적화 실행기 (처음 요청 때 생성)"""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _batch_executor
+
 # 데이터베이스 초기화
 def init_database():
     """데이터베이스 초기화"""
@@ -33,72 +54,8 @@ def init_database():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # 사용자 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            username TEXT UNIQUE NOT NULL,
-            hashed_password TEXT NOT NULL,
-            first_name TEXT,
-            last_name TEXT,
-            role TEXT DEFAULT 'farmer',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 동물 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS animals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id TEXT UNIQUE NOT NULL,
-            name TEXT,
-            species TEXT NOT NULL,
-            breed TEXT,
-            gender TEXT,
-            birth_date DATE,
-            initial_weight REAL,
-            current_weight REAL,
-            status TEXT DEFAULT 'active',
-            owner_id INTEGER,
-            farm_location TEXT,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (owner_id) REFERENCES users (id)
-        )
-    ''')
-    
-    # 사료 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feeds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            feed_name TEXT NOT NULL,
-            feed_type TEXT,
-            protein REAL,
-            fat REAL,
-            fiber REAL,
-            ash REAL,
-            calcium REAL,
-            phosphorus REAL,
-            price_per_kg REAL,
-            supplier TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 체중 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weight_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id INTEGER,
-            weight REAL NOT NULL,
-            measurement_date DATE NOT NULL,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (animal_id) REFERENCES animals (id)
-        )
-    ''')
+    # 사용자/동물/사료/체중 기록 테이블
+    migrate(conn)
     
     # 샘플 데이터 생성
     if cursor.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
@@ -356,32 +313,35 @@ def create_feed(current_user):
 @app.route('/api/ai/optimize-feed', methods=['POST'])
 @token_required
 def optimize_feed(current_user):
-    data = request.get_json()
-    
-    # 사료 배합 최적화 로직 (간단한 버전)
-    conn = get_db_connection()
-    feeds = conn.execute('SELECT * FROM feeds').fetchall()
-    conn.close()
-    
-    # 최적화 계산 (실제로는 더 복잡한 알고리즘 사용)
-    n_feeds = len(feeds)
-    weights = np.random.dirichlet(np.ones(n_feeds))  # 임시 최적화
+    data = request.get_json() or {}
+    
+    # 사료 배합 최적화 (선형계획법, feeds 테이블 버전 + 목표값 기준 캐시)
+    library, mix = optimize_feed_mix(
+        data.get('target_protein', 16.0),
+        data.get('target_fat', 3.0),
+        data.get('max_cost', 1000),
+        data.get('min_fiber', 0.0),
+        db_path=app.config['DATABASE'],
+        min_calcium=data.get('min_calcium', 0.0),
+        min_phosphorus=data.get('min_phosphorus', 0.0),
+        ca_p_ratio=data.get('ca_p_ratio')
+    )
+    
+    if mix.status != 'Optimal':
+        return jsonify({'message': '주어진 제약조건으로 최적해를 찾을 수 없습니다.'}), 400
     
     result = {
-        'feeds': [],
-        'total_protein': 0,
-        'total_fat': 0,
-        'total_cost': 0
+        'feeds': [
+            {**record, 'ratio': ratio * 100}
+            for record, ratio in zip(library.records, mix.ratios)
+        ],
+        'total_protein': mix.totals['protein'],
+        'total_fat': mix.totals['fat'],
+        'total_calcium': mix.totals['calcium'],
+        'total_phosphorus': mix.totals['phosphorus'],
+        'total_cost': mix.cost
     }
     
-    for i, feed in enumerate(feeds):
-        feed_dict = dict(feed)
-        feed_dict['ratio'] = weights[i] * 100
-        result['feeds'].append(feed_dict)
-        result['total_protein'] += feed['protein'] * weights[i]
-        result['total_fat'] += feed['fat'] * weights[i]
-        result['total_cost'] += feed['price_per_kg'] * weights[i]
-    
     return jsonify(result)
 
 @app.route('/api/ai/analyze-nutrition', methods=['POST'])
@@ -421,33 +381,32 @@ def analyze_nutrition(current_user):
 @app.route('/api/ai/predict-productivity', methods=['POST'])
 @token_required
 def predict_productivity(current_user):
-    data = request.get_json()
+    data = request.get_json() or {}
+    
+    try:
+        animal_weight = float(data.get('animal_weight', 400))
+        horizon = int(data.get('days', 30))
+    except (TypeError, ValueError):
+        return jsonify({'message': '체중은 숫자, 예측 기간(days)은 정수여야 합니다'}), 400
+    if not np.isfinite(animal_weight) or animal_weight <= 0:
+        return jsonify({'message': '체중은 0보다 커야 합니다'}), 400
+    horizon = min(max(horizon, 1), SIMULATION_DAYS)
     
-    animal_weight = data.get('animal_weight', 400)
     feed_quality = data.get('feed_quality', 80)
     management_level = data.get('management_level', 85)
     breed_type = data.get('breed_type', '한우')
     age_months = data.get('age_months', 18)
     
-    # 생산성 예측 (간단한 모델)
-    base_growth = 0.8
-    weight_factor = 1.0 if animal_weight > 300 else 0.9
-    quality_factor = feed_quality / 100
-    management_factor = management_level / 100
-    breed_factor = 1.2 if breed_type == "한우" else 1.0
-    age_factor = 1.0 if 12 <= age_months <= 24 else 0.8
-    
-    predicted_growth = base_growth * weight_factor * quality_factor * management_factor * breed_factor * age_factor
-    
-    # 30일 예측
-    days = list(range(1, 31))
-    weights = [animal_weight + predicted_growth * day for day in days]
+    # 일 단위 성장 시뮬레이션
+    projection = simulate_productivity(animal_weight, feed_quality, management_level, breed_type, age_months,
+                                       days=horizon)
+    weights = projection['weights']
     
     prediction = {
-        'predicted_growth': round(predicted_growth, 2),
-        'final_weight': round(weights[-1], 1),
-        'weight_progression': weights,
-        'days': days
+        'predicted_growth': round(projection['average_daily_gain'], 2),
+        'final_weight': round(float(weights[-1]), 1),
+        'weight_progression': weights.round(1).tolist(),
+        'days': projection['days'].tolist()
     }
     
     return jsonify(prediction)
@@ -523,42 +482,29 @@ def calculate_nutrition_requirements(current_user):
         milk_yield = data.get('milk_yield', 0)
         pregnancy_stage = data.get('pregnancy_stage', 0)
         
-        # 간단한 영양 요구량 계산
-        maintenance_energy = 70 * (weight ** 0.75) * 1.15 / 1000  # Mcal/day
-        maintenance_protein = 3.8 * (weight ** 0.75)  # g/day
-        
-        production_energy = 0
-        production_protein = 0
-        
-        if production_stage == "유우":
-            production_energy = milk_yield * 0.75  # Mcal/day
-            production_protein = milk_yield * 85  # g/day
-        elif production_stage == "임신":
-            factor = {1: 0.1, 2: 0.2, 3: 0.4}.get(pregnancy_stage, 0.1)
-            production_energy = 5 * factor  # Mcal/day
-            production_protein = 200 * factor  # g/day
-        
-        total_energy = maintenance_energy + production_energy
-        total_protein = maintenance_protein + production_protein
-        dry_matter_intake = weight * 0.025  # kg/day
+        requirements = calculate_total_requirements(
+            weight, age_months, production_stage, milk_yield, pregnancy_stage
+        )
+        maintenance, production = requirements['maintenance'], requirements['production']
+        total, concentrations = requirements['total'], requirements['concentrations']
         
         return jsonify({
             'maintenance': {
-                'energy_mcal': round(maintenance_energy, 2),
-                'protein_g': round(maintenance_protein, 1)
+                'energy_mcal': round(maintenance['energy_kcal'] / 1000, 2),
+                'protein_g': round(maintenance['protein_g'], 1)
             },
             'production': {
-                'energy_mcal': round(production_energy, 2),
-                'protein_g': round(production_protein, 1)
+                'energy_mcal': round(production['energy_kcal'] / 1000, 2),
+                'protein_g': round(production['protein_g'], 1)
             },
             'total': {
-                'energy_mcal': round(total_energy, 2),
-                'protein_g': round(total_protein, 1),
-                'dry_matter_kg': round(dry_matter_intake, 2)
+                'energy_mcal': round(total['energy_mcal'], 2),
+                'protein_g': round(total['protein_g'], 1),
+                'dry_matter_kg': round(total['dry_matter_kg'], 2)
             },
             'concentrations': {
-                'energy_mcal_kg': round(total_energy / dry_matter_intake, 2),
-                'protein_percent': round((total_protein / 1000) / dry_matter_intake * 100, 1)
+                'energy_mcal_kg': round(concentrations['energy_mcal_kg'], 2),
+                'protein_percent': round(concentrations['protein_percent'], 1)
             }
         })
         
@@ -617,6 +563,38 @@ def optimize_feed_formulation(current_user):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/formulation/optimize-batch', methods=['POST'])
+@token_required
+def optimize_feed_formulation_batch(current_user):
+    """사료 배합 일괄 최적화 API (동물/그룹별 결과를 NDJSON으로 스트리밍)"""
+    data = request.get_json() or {}
+    requirements = data.get('requirements', [])
+    
+    if not requirements:
+        return jsonify({'message': 'requirements 필드가 필요합니다'}), 400
+    
+    for req in requirements:
+        if 'target_energy' not in req or 'target_protein' not in req:
+            return jsonify({'message': 'target_energy, target_protein 필드가 필요합니다'}), 400
+    
+    # 공유 원료 라이브러리는 요청당 한 번만 로드
+    conn = get_db_connection()
+    ingredients_df = pd.read_sql_query('SELECT * FROM feed_ingredients', conn)
+    conn.close()
+    
+    matrix = IngredientMatrix.from_dataframe(ingredients_df)
+    solver = data.get('solver')
+    
+    if solver is not None and solver not in SOLVER_BACKENDS:
+        return jsonify({'message': f'지원하지 않는 솔버입니다: {solver}'}), 400
+    
+    def generate():
+        # 요청의 max_workers 는 받지 않는다 (프로세스 수는 서버가 정함)
+        for result in optimize_formulation_batch(matrix, requirements, solver=solver, executor=get_batch_executor()):
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/formulation/ingredients', methods=['GET'])
 @token_required
 def get_ingredients(current_user):
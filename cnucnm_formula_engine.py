@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 수식 그래프 엔진
+CNUCNM_Database.json / .sql의 수식(MP = MPfeed + MPbact ...)을 한 번 파싱해
+의존성 그래프(DAG)로 만들고, 위상 정렬한 평탄한 계산 계획으로 컴파일한다.
+계산 계획은 입력값을 받아 전체 수식을 한 번의 순회로 계산한다.
+두수별 입력값 배열을 주면 같은 계획이 우군 전체를 numpy 벡터 연산으로 계산한다.
+컴파일된 계획은 수식 원본 해시를 키로 하는 캐시 파일에 저장해 다음 시작 시 메모리 매핑으로 읽는다.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import marshal
+import mmap
+import os
+import re
+import struct
+from collections import deque
+from functools import reduce
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATABASE_JSON = 'CNUCNM_Database.json'
+DATABASE_SQL = 'CNUCNM_Database.sql'
+
+# 입력값(잎 노드)을 나타내는 수식 우변
+INPUT_EXPRESSION = '입력값'
+
+# 계획 캐시 파일 형식 (매직, 형식 버전; 형식이 바뀌면 버전을 올림)
+PLAN_CACHE_MAGIC = b'CNUCNMPL'
+PLAN_CACHE_VERSION = 1
+PLAN_CACHE_SUFFIX = '.plan'
+
+# 우군 단위 계산 시 한 번에 계산할 슬롯 배열 메모리 상한 (두수 구간 크기 결정)
+HERD_CHUNK_BYTES = 128 * 1024 * 1024
+
+# 연산자 토큰 (공백으로 둘러싸인 x, ×는 곱셈)
+_OPERATOR_PATTERN = re.compile(r'(\s[x×]\s|[+\-*/()^])')
+_NUMBER_PATTERN = re.compile(r'^\d+(?:\.\d+)?$')
+_OPERATORS = {'+': '+', '-': '-', '*': '*', '/': '/', '(': '(', ')': ')', '^': '**', 'x': '*', '×': '*'}
+
+
+
+def _excel_if(condition, true_value, false_value=0.0):
+    if np.ndim(condition) == 0:
+        return true_value if condition else false_value
+    return np.where(condition, true_value, false_value)
+
+
+def _excel_round(value, digits=0):
+    scale = 10.0 ** digits
+    return np.sign(value) * np.floor(np.abs(value) * scale + 0.5) / scale
+
+
+# 수식 함수 ('func' 토큰, 스칼라와 우군 배열 모두 지원)
+FORMULA_FUNCTIONS = {
+    '_SUM': lambda *args: sum(args),
+    '_AVERAGE': lambda *args: sum(args) / len(args),
+    '_MIN': lambda *args: reduce(np.minimum, args),
+    '_MAX': lambda *args: reduce(np.maximum, args),
+    '_ABS': np.abs,
+    '_EXP': np.exp,
+    '_LN': np.log,
+    '_LOG10': np.log10,
+    '_LOG': lambda value, base=10.0: np.log(value) / np.log(base),
+    '_SQRT': np.sqrt,
+    '_POWER': lambda value, exponent: np.power(np.float64(value), exponent),
+    '_ROUND': _excel_round,
+    '_IF': _excel_if,
+    '_AND': lambda *args: reduce(np.logical_and, args),
+    '_OR': lambda *args: reduce(np.logical_or, args),
+    '_NOT': np.logical_not,
+}
+
+# formulas INSERT 문의 값 튜플
+# (formula_name, full_name, expression, description, level, category_id, location_id[, is_input_value])
+_SQL_ROW_PATTERN = re.compile(
+    r"\('((?:[^']|'')*)', '((?:[^']|'')*)', '((?:[^']|'')*)', '((?:[^']|'')*)', "
+    r"(\d+), (\d+), (\d+)(?:, (TRUE|FALSE))?\)"
+)
+
+
+def tokenize(expression):
+    """수식 우변을 (종류, 값) 토큰 목록으로 분해 ('op', 'num', 'name')
+
+    이름에는 공백과 한글이 들어갈 수 있다 (예: '기본 섭취량 x 조정 계수들').
+    """
+    tokens = []
+    for part in _OPERATOR_PATTERN.split(expression):
+        text = part.strip()
+        if not text:
+            continue
+        if text in _OPERATORS:
+            tokens.append(('op', _OPERATORS[text]))
+        elif _NUMBER_PATTERN.match(text):
+            tokens.append(('num', text))
+        else:
+            tokens.append(('name', ' '.join(text.split())))
+    return tokens
+
+
+def split_formula(expression):
+    """'이름 = 우변' 형식 수식을 (이름, 우변)으로 분리"""
+    name, _, body = expression.partition('=')
+    return ' '.join(name.split()), body.strip()
+
+
+class FormulaNode:
+    """수식 그래프의 노드 (입력값 또는 계산 수식)
+
+    tokens를 주면 우변 파싱 대신 사용한다 (Excel 가져오기 등, 'func' 토큰은 FORMULA_FUNCTIONS 이름).
+    """
+
+    def __init__(self, name, expression=None, level=0, category=None, location=None, description=None,
+                 tokens=None):
+        self.name = name
+        self.expression = expression
+        self.level = level
+        self.category = category
+        self.location = location
+        self.description = description
+
+        body = split_formula(expression)[1] if expression else INPUT_EXPRESSION
+        self.is_input = body == INPUT_EXPRESSION and tokens is None
+        if tokens is not None:
+            self.tokens = list(tokens)
+        else:
+            self.tokens = [] if self.is_input else tokenize(body)
+        self.dependencies = []
+        for kind, value in self.tokens:
+            if kind == 'name' and value not in self.dependencies:
+                self.dependencies.append(value)
+
+
+class FormulaGraph:
+    """수식 의존성 그래프
+
+    수식에 참조되지만 정의되지 않은 이름은 입력값으로 취급한다.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.defaults = {}
+
+    def add(self, node):
+        self.nodes[node.name] = node
+        return node
+
+    def set_default(self, name, value):
+        """입력값 기본값 등록"""
+        self.defaults[name] = value
+
+    @classmethod
+    def from_json(cls, path=DATABASE_JSON):
+        """CNUCNM_Database.json (formulas, input_values)에서 그래프 생성"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        graph = cls()
+        for formula in data.get('formulas', []):
+            graph.add(FormulaNode(formula['name'], formula['expression'], formula.get('level', 0),
+                                  formula.get('category'), formula.get('location'), formula.get('description')))
+        for value in data.get('input_values', []):
+            if value['name'] not in graph.nodes:
+                graph.add(FormulaNode(value['name'], description=value.get('description')))
+            graph.set_default(value['name'], value.get('default_value'))
+        return graph
+
+    @classmethod
+    def from_sql(cls, path=DATABASE_SQL):
+        """CNUCNM_Database.sql의 formulas INSERT 문에서 그래프 생성"""
+        with open(path, encoding='utf-8') as f:
+            script = f.read()
+        category_names = _sql_names(script, 'formula_categories')
+        location_names = _sql_names(script, 'formula_locations')
+
+        graph = cls()
+        for statement in re.findall(r'INSERT INTO formulas \(.*?\) VALUES(.*?);', script, re.S):
+            for row in _SQL_ROW_PATTERN.findall(statement):
+                name, _, expression, description, level, category_id, location_id, _ = \
+                    [value.replace("''", "'") for value in row]
+                graph.add(FormulaNode(name, expression, int(level),
+                                      category_names.get(int(category_id)), location_names.get(int(location_id)),
+                                      description))
+        return graph
+
+    def merge(self, other):
+        """다른 그래프의 노드/기본값 병합 (같은 이름은 other 우선)"""
+        self.nodes.update(other.nodes)
+        self.defaults.update(other.defaults)
+        return self
+
+    def input_names(self):
+        """입력값 이름 (명시적 입력 노드 + 정의되지 않은 참조 이름)"""
+        names = [name for name, node in self.nodes.items() if node.is_input]
+        seen = set(names)
+        for node in self.nodes.values():
+            for dependency in node.dependencies:
+                if dependency not in self.nodes and dependency not in seen:
+                    names.append(dependency)
+                    seen.add(dependency)
+        return names
+
+    def topological_order(self):
+        """계산 수식의 위상 정렬 순서 (Kahn 알고리즘, 순환 참조는 ValueError)"""
+        formulas = {name: node for name, node in self.nodes.items() if not node.is_input}
+        indegree = {name: 0 for name in formulas}
+        dependents = {name: [] for name in formulas}
+        for name, node in formulas.items():
+            for dependency in node.dependencies:
+                if dependency in formulas:
+                    indegree[name] += 1
+                    dependents[dependency].append(name)
+
+        queue = deque(name for name, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for dependent in dependents[name]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(order) < len(formulas):
+            cyclic = sorted(name for name, degree in indegree.items() if degree > 0)
+            raise ValueError(f"순환 참조가 있는 수식입니다: {', '.join(cyclic[:20])}")
+        return order
+
+    def compile(self):
+        """평탄한 계산 계획으로 컴파일"""
+        return FormulaPlan(self)
+
+    def fingerprint(self):
+        """수식(이름, 토큰)과 기본값 내용의 SHA-256 (계획 캐시 키)"""
+        digest = hashlib.sha256(f'cnucnm-plan-{PLAN_CACHE_VERSION}'.encode())
+        for name, node in self.nodes.items():
+            digest.update(repr((name, node.is_input, node.tokens)).encode('utf-8'))
+        digest.update(repr(sorted((name, repr(value)) for name, value in self.defaults.items())).encode('utf-8'))
+        return digest.hexdigest()
+
+
+def _sql_names(script, table):
+    """카테고리/위치 INSERT 문에서 {id: 이름} (AUTO_INCREMENT 순서)"""
+    match = re.search(rf'INSERT INTO {table} \(.*?\) VALUES(.*?);', script, re.S)
+    if not match:
+        return {}
+    names = re.findall(r"\('((?:[^']|'')*)'", match.group(1))
+    return {i + 1: name for i, name in enumerate(names)}
+
+
+class FormulaPlan:
+    """컴파일된 계산 계획
+
+    모든 이름에 슬롯 번호를 붙이고(입력값 → 계산 수식의 위상 순서),
+    수식을 'v[슬롯] = 식' 형태의 직선 코드 한 덩어리로 생성해 컴파일한다.
+    """
+
+    def __init__(self, graph):
+        self.inputs = graph.input_names()
+        self.order = graph.topological_order()
+        self.names = self.inputs + self.order
+        self.slots = {name: i for i, name in enumerate(self.names)}
+        self.defaults = {name: value for name, value in graph.defaults.items() if name in self.slots}
+        self.missing = [name for name in self.inputs if name not in self.defaults]
+
+        # 수식별 계산 식 (슬롯 기준)
+        self.statements = [(self.slots[name], self._expression(graph.nodes[name])) for name in self.order]
+        source = '\n'.join(f'    v[{slot}] = {expr}' for slot, expr in self.statements) or '    pass'
+        namespace = dict(FORMULA_FUNCTIONS)
+        try:
+            code = compile(f'def _evaluate(v):\n{source}\n', '<cnucnm-formula-plan>', 'exec')
+        except SyntaxError as e:
+            # 함수 본문 1행부터 수식 순서와 같음
+            node = graph.nodes[self.order[e.lineno - 2]]
+            raise ValueError(f"수식을 해석할 수 없습니다: {node.expression}") from None
+        exec(code, namespace)
+        self._evaluate = namespace['_evaluate']
+        self._code = code
+        self._node_code = None
+        self._node_code_data = None
+        self.source_hash = None
+
+        # 증분 계산용 슬롯 의존 관계 (수식 슬롯 → 참조 슬롯, 슬롯 → 이 슬롯을 참조하는 수식 슬롯)
+        self._dependency_slots = {}
+        self._dependents = [[] for _ in self.names]
+        for name in self.order:
+            slot = self.slots[name]
+            references = sorted({self.slots[d] for d in graph.nodes[name].dependencies})
+            self._dependency_slots[slot] = references
+            for reference in references:
+                self._dependents[reference].append(slot)
+        self._dependency_arrays = None
+        self._node_functions = None
+
+    @property
+    def dependency_slots(self):
+        """{수식 슬롯: 참조 슬롯 목록} (캐시에서 로드한 계획은 처음 사용할 때 구성)"""
+        if self._dependency_slots is None:
+            self._build_dependencies()
+        return self._dependency_slots
+
+    @property
+    def dependents(self):
+        """슬롯별 이 슬롯을 참조하는 수식 슬롯 목록"""
+        if self._dependents is None:
+            self._build_dependencies()
+        return self._dependents
+
+    def _build_dependencies(self):
+        offsets, references = self._dependency_arrays
+        bounds, flat = offsets.tolist(), references.tolist()
+        n_inputs = len(self.inputs)
+        dependency_slots, dependents = {}, [[] for _ in self.names]
+        for i in range(len(self.order)):
+            slot = n_inputs + i
+            slot_references = flat[bounds[i]:bounds[i + 1]]
+            dependency_slots[slot] = slot_references
+            for reference in slot_references:
+                dependents[reference].append(slot)
+        self._dependency_slots, self._dependents = dependency_slots, dependents
+
+    def _expression(self, node):
+        return ' '.join(f'v[{self.slots[value]}]' if kind == 'name' else value for kind, value in node.tokens)
+
+    @property
+    def node_functions(self):
+        """수식별 계산 함수 {슬롯: f(v) -> 값} (증분 계산 시 처음 한 번만 컴파일)"""
+        if self._node_functions is None:
+            namespace = dict(FORMULA_FUNCTIONS)
+            exec(self.node_code, namespace)
+            self._node_functions = namespace['_functions']
+        return self._node_functions
+
+    @property
+    def node_code(self):
+        """수식별 계산 함수 모듈의 코드 객체 (캐시 파일에 함께 저장)"""
+        if self._node_code is None and self._node_code_data is not None:
+            try:
+                self._node_code = marshal.loads(self._node_code_data)
+            except Exception:
+                self._node_code_data = None   # 손상된 캐시 구역이면 수식에서 다시 컴파일
+        if self._node_code is None:
+            source = ',\n'.join(f'    {slot}: lambda v: {expr}' for slot, expr in self.statements)
+            self._node_code = compile(f'_functions = {{\n{source}\n}}\n', '<cnucnm-formula-nodes>', 'exec')
+        return self._node_code
+
+    def __len__(self):
+        return len(self.order)
+
+    def initial_values(self, input_values=None):
+        """슬롯 값 목록 (입력값: 기본값 → input_values 순으로 적용, 없으면 NaN)"""
+        values = [float('nan')] * len(self.names)
+        for source in (self.defaults, input_values or {}):
+            for name, value in source.items():
+                slot = self.slots.get(name)
+                if slot is not None and value is not None:
+                    values[slot] = value
+        return values
+
+    def run(self, values):
+        """슬롯 값 목록에 전체 수식을 계산해 채움 (0으로 나누면 inf/NaN)"""
+        initial = list(values)
+        try:
+            with np.errstate(all='ignore'):
+                self._evaluate(values)
+        except ZeroDivisionError:
+            # 0 나눗셈이 있으면 numpy 실수로 다시 계산 (Excel #DIV/0! 대신 inf/NaN)
+            values[:] = [np.float64(value) for value in initial]
+            with np.errstate(all='ignore'):
+                self._evaluate(values)
+            values[:] = [float(value) for value in values]
+        return values
+
+    def evaluate(self, input_values=None):
+        """전체 수식 계산 (반환값: {이름: 값})"""
+        values = self.run(self.initial_values(input_values))
+        return dict(zip(self.names, values))
+
+    def evaluate_herd(self, herd_inputs, outputs=None, chunk_size=None):
+        """우군 전체 계산 (수식마다 두수 길이 배열에 대한 numpy 연산 한 번)
+
+        herd_inputs: {입력값 이름: 두수별 배열 또는 스칼라}, 주지 않은 입력값은 기본값.
+        outputs: 반환할 이름 목록 (기본값: 전체)
+        반환값: {이름: 두수 길이 float64 배열}, 0으로 나누면 inf/NaN
+        """
+        columns, size = {}, None
+        for name, value in herd_inputs.items():
+            slot = self.slots.get(name)
+            if slot is None:
+                raise KeyError(f"알 수 없는 입력값입니다: {name}")
+            if slot in self.dependency_slots:
+                raise ValueError(f"계산 수식은 입력값으로 바꿀 수 없습니다: {name}")
+            array = np.asarray(value, dtype=np.float64)
+            if array.ndim > 1:
+                raise ValueError(f"입력값 배열은 1차원이어야 합니다: {name}")
+            if array.ndim == 1:
+                if size is not None and len(array) != size:
+                    raise ValueError(f"입력값 배열 길이가 다릅니다: {name} ({len(array)} != {size})")
+                size = len(array)
+            columns[slot] = array
+        size = 1 if size is None else size
+
+        outputs = list(self.names if outputs is None else outputs)
+        unknown = [name for name in outputs if name not in self.slots]
+        if unknown:
+            raise KeyError(f"알 수 없는 수식입니다: {', '.join(unknown[:20])}")
+        output_slots = [self.slots[name] for name in outputs]
+
+        # 중간 값이 모두 슬롯 배열로 남으므로 메모리 상한에 맞춰 두수 구간별로 계산
+        if chunk_size is None:
+            chunk_size = max(1, HERD_CHUNK_BYTES // (8 * len(self.names)))
+        base = [np.float64(value) for value in self.initial_values()]
+        results = np.empty((len(outputs), size), dtype=np.float64)
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            values = list(base)
+            for slot, array in columns.items():
+                values[slot] = array[start:stop] if array.ndim else array[()]
+            with np.errstate(all='ignore'):
+                self._evaluate(values)
+            for k, slot in enumerate(output_slots):
+                results[k, start:stop] = values[slot]
+        return dict(zip(outputs, results))
+
+    def session(self, input_values=None):
+        """입력값 변경 시 영향받는 수식만 다시 계산하는 세션 생성"""
+        return FormulaSession(self, input_values)
+
+    def save(self, path, source_hash):
+        """계획 캐시 파일 저장 (임시 파일에 쓴 뒤 교체)
+
+        형식: 매직 + (버전, 헤더 길이) + JSON 헤더 + 8바이트 정렬 구역
+        (code/node_code: marshal 코드 객체, names/expressions: NUL 구분 UTF-8,
+         dependency_offsets/dependency_slots: int32 CSR, defaults: float64, has_default: uint8)
+        """
+        offsets = np.zeros(len(self.order) + 1, dtype=np.int32)
+        references = []
+        for i, name in enumerate(self.order):
+            slot_references = self.dependency_slots[self.slots[name]]
+            references.extend(slot_references)
+            offsets[i + 1] = offsets[i] + len(slot_references)
+
+        defaults = np.full(len(self.inputs), np.nan)
+        has_default = np.zeros(len(self.inputs), dtype=np.uint8)
+        for i, name in enumerate(self.inputs):
+            try:
+                defaults[i] = float(self.defaults[name])
+                has_default[i] = 1
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        sections = {
+            'code': marshal.dumps(self._code),
+            'node_code': marshal.dumps(self.node_code),
+            'names': '\0'.join(self.names).encode('utf-8'),
+            'expressions': '\0'.join(expr for _, expr in self.statements).encode('utf-8'),
+            'dependency_offsets': offsets.tobytes(),
+            'dependency_slots': np.asarray(references, dtype=np.int32).tobytes(),
+            'defaults': defaults.tobytes(),
+            'has_default': has_default.tobytes(),
+        }
+        header = {
+            'source_hash': source_hash,
+            'python': importlib.util.MAGIC_NUMBER.hex(),
+            'inputs': len(self.inputs),
+            'formulas': len(self.order),
+            'sections': {}
+        }
+        # 헤더 길이가 구역 위치에 영향을 주므로 위치가 안정될 때까지 반복
+        header_length = 0
+        while True:
+            position = _align(len(PLAN_CACHE_MAGIC) + 8 + header_length)
+            for name, data in sections.items():
+                header['sections'][name] = [position, len(data)]
+                position = _align(position + len(data))
+            encoded = json.dumps(header).encode('utf-8')
+            if len(encoded) == header_length:
+                break
+            header_length = len(encoded)
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(PLAN_CACHE_MAGIC + struct.pack('<II', PLAN_CACHE_VERSION, header_length) + encoded)
+                for name, data in sections.items():
+                    f.seek(header['sections'][name][0])
+                    f.write(data)
+                f.truncate(position)
+            os.replace(temporary, path)
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path, source_hash=None):
+        """계획 캐시 파일을 메모리 매핑으로 로드 (형식/Python 버전/원본 해시가 다르면 None)
+
+        의존 관계 배열과 수식별 함수 코드는 매핑된 파일을 그대로 참조하다가 처음 사용할 때 푼다.
+        """
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            return cls._from_buffer(buffer, source_hash)
+        except Exception:
+            # 잘린/손상된 캐시 파일 (헤더, 배열, marshal 코드 등) → 다시 컴파일
+            return None
+
+    @classmethod
+    def _from_buffer(cls, buffer, source_hash):
+        prefix = len(PLAN_CACHE_MAGIC) + 8
+        if buffer[:len(PLAN_CACHE_MAGIC)] != PLAN_CACHE_MAGIC:
+            return None
+        version, header_length = struct.unpack_from('<II', buffer, len(PLAN_CACHE_MAGIC))
+        if version != PLAN_CACHE_VERSION:
+            return None
+        header = json.loads(bytes(buffer[prefix:prefix + header_length]))
+        if header['python'] != importlib.util.MAGIC_NUMBER.hex():
+            return None
+        if source_hash is not None and header['source_hash'] != source_hash:
+            return None
+
+        view = memoryview(buffer)
+
+        def section(name):
+            start, length = header['sections'][name]
+            return view[start:start + length]
+
+        def array(name, dtype):
+            start, length = header['sections'][name]
+            return np.frombuffer(buffer, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=start)
+
+        plan = cls.__new__(cls)
+        plan._buffer = buffer
+        plan.source_hash = header['source_hash']
+        n_inputs = header['inputs']
+        names = section('names')
+        plan.names = str(names, 'utf-8').split('\0') if len(names) else []
+        plan.inputs = plan.names[:n_inputs]
+        plan.order = plan.names[n_inputs:]
+        plan.slots = {name: i for i, name in enumerate(plan.names)}
+
+        defaults, has_default = array('defaults', np.float64), array('has_default', np.uint8)
+        plan.defaults = {plan.inputs[i]: float(defaults[i]) for i in np.flatnonzero(has_default)}
+        plan.missing = [plan.inputs[i] for i in np.flatnonzero(has_default == 0)]
+
+        expressions = str(section('expressions'), 'utf-8').split('\0') if plan.order else []
+        plan.statements = list(zip(range(n_inputs, len(plan.names)), expressions))
+
+        plan._code = marshal.loads(section('code'))
+        namespace = dict(FORMULA_FUNCTIONS)
+        exec(plan._code, namespace)
+        plan._evaluate = namespace['_evaluate']
+
+        # 증분 계산용 함수/의존 관계는 처음 사용할 때 구성
+        plan._node_code, plan._node_code_data, plan._node_functions = None, section('node_code'), None
+        plan._dependency_slots = plan._dependents = None
+        plan._dependency_arrays = (array('dependency_offsets', np.int32), array('dependency_slots', np.int32))
+        return plan
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)  # NaN끼리는 같은 값으로 본다
+
+
+class FormulaSession:
+    """증분 재계산 세션 (Excel 스마트 재계산 방식)
+
+    set_inputs()는 바뀐 입력값의 하위 수식에 dirty 표시만 하고,
+    recalculate()는 dirty 수식을 위상 순서대로 계산하되 참조 값이 실제로 바뀐 수식만 계산한다.
+    """
+
+    # dirty 수식이 전체의 이 비율을 넘으면 전체 계산 함수를 실행
+    FULL_RECALC_RATIO = 0.5
+
+    def __init__(self, plan, input_values=None):
+        self.plan = plan
+        self.values = plan.run(plan.initial_values(input_values))
+        self._dirty = set()
+        self._changed_inputs = set()
+        self.last_evaluated = len(plan)
+        self.total_evaluated = len(plan)
+
+    def set_inputs(self, input_values):
+        """입력값 변경 후 하위 수식 dirty 표시 (반환값: dirty 수식 수)"""
+        changed = []
+        for name, value in input_values.items():
+            slot = self.plan.slots.get(name)
+            if slot is None:
+                raise KeyError(f"알 수 없는 입력값입니다: {name}")
+            if slot in self.plan.dependency_slots:
+                raise ValueError(f"계산 수식은 입력값으로 바꿀 수 없습니다: {name}")
+            if not _same(self.values[slot], value):
+                self.values[slot] = value
+                changed.append(slot)
+
+        stack = [dependent for slot in changed for dependent in self.plan.dependents[slot]]
+        while stack:
+            slot = stack.pop()
+            if slot not in self._dirty:
+                self._dirty.add(slot)
+                stack.extend(self.plan.dependents[slot])
+        self._changed_inputs.update(changed)
+        return len(self._dirty)
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    def recalculate(self):
+        """dirty 수식 재계산 (반환값: 실제로 계산한 수식 수)"""
+        if not self._dirty:
+            self.last_evaluated = 0
+            return 0
+
+        if len(self._dirty) > self.FULL_RECALC_RATIO * len(self.plan):
+            self.plan.run(self.values)
+            evaluated = len(self.plan)
+        else:
+            functions = self.plan.node_functions
+            changed = set(self._changed_inputs)
+            evaluated = 0
+            for slot in sorted(self._dirty):
+                if not any(reference in changed for reference in self.plan.dependency_slots[slot]):
+                    continue
+                try:
+                    value = functions[slot](self.values)
+                except ZeroDivisionError:
+                    with np.errstate(all='ignore'):
+                        value = float(functions[slot]([np.float64(v) for v in self.values]))
+                evaluated += 1
+                if not _same(value, self.values[slot]):
+                    self.values[slot] = value
+                    changed.add(slot)
+
+        self._dirty.clear()
+        self._changed_inputs.clear()
+        self.last_evaluated = evaluated
+        self.total_evaluated += evaluated
+        return evaluated
+
+    def update(self, input_values):
+        """입력값 변경 + 재계산 (반환값: 실제로 계산한 수식 수)"""
+        self.set_inputs(input_values)
+        return self.recalculate()
+
+    def __getitem__(self, name):
+        if self._dirty:
+            self.recalculate()
+        return self.values[self.plan.slots[name]]
+
+    def results(self):
+        """전체 값 {이름: 값}"""
+        if self._dirty:
+            self.recalculate()
+        return dict(zip(self.plan.names, self.values))
+
+
+def _align(position, alignment=8):
+    return (position + alignment - 1) // alignment * alignment
+
+
+def load_formula_graph(json_path=DATABASE_JSON, sql_path=DATABASE_SQL):
+    """JSON과 SQL 수식 정의를 합친 그래프 (SQL에만 있는 수식 포함)"""
+    graph = FormulaGraph.from_sql(sql_path)
+    return graph.merge(FormulaGraph.from_json(json_path))
+
+
+def source_hash(*paths):
+    """수식 원본 파일 내용의 SHA-256 (계획 캐시 키)"""
+    digest = hashlib.sha256(f'cnucnm-plan-{PLAN_CACHE_VERSION}'.encode())
+    for path in paths:
+        digest.update(b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _save_plan(plan, cache_path, key):
+    """계획 캐시 저장 (읽기 전용 디렉토리/디스크 부족 등으로 실패해도 컴파일한 계획은 그대로 사용)"""
+    try:
+        plan.save(cache_path, key)
+    except OSError as e:
+        logger.warning(f"계획 캐시를 저장하지 못했습니다 ({cache_path}): {e}")
+    plan.source_hash = key
+
+
+def compile_cached(graph, cache_path):
+    """그래프 내용 해시로 계획 캐시를 사용하는 컴파일 (파싱이 끝난 그래프용)"""
+    key = graph.fingerprint()
+    plan = FormulaPlan.load(cache_path, key)
+    if plan is None:
+        plan = graph.compile()
+        _save_plan(plan, cache_path, key)
+    return plan
+
+
+def load_formula_plan(json_path=DATABASE_JSON, sql_path=DATABASE_SQL, cache_path=None):
+    """수식 DB 계산 계획 (원본 파일 해시가 같으면 파싱 없이 캐시 파일에서 로드)"""
+    cache_path = cache_path or str(json_path) + PLAN_CACHE_SUFFIX
+    key = source_hash(json_path, sql_path)
+    plan = FormulaPlan.load(cache_path, key)
+    if plan is None:
+        plan = load_formula_graph(json_path, sql_path).compile()
+        _save_plan(plan, cache_path, key)
+    return plan
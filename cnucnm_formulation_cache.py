@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 사료 배합 결과 캐시
+프로세스 내 LRU + 선택적 공유 계층(SQLite/Redis) 2단계 캐시
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cnucnm_feeds_optimizer import DB_PATH, current_table_version
+
+logger = logging.getLogger(__name__)
+
+# 목표값 양자화 단위 (캐시 키만 이 단위로 반올림, 풀이는 요청한 목표 그대로)
+TARGET_QUANTUM = 0.01
+
+# 캐시 항목 형식 ({'targets': 풀이에 쓴 목표, 'result': 결과}), 바뀌면 올림
+CACHE_FORMAT = 2
+
+# 변경 시 캐시를 무효화하는 원료 테이블
+WATCHED_TABLES = ('feed_ingredients', 'feeds')
+
+# 공유 계층 키 접두사 / Redis 만료 시간(초)
+KEY_PREFIX = 'cnucnm:formulation:'
+REDIS_TTL = 7 * 24 * 3600
+
+
+def quantize_targets(targets, quantum=TARGET_QUANTUM):
+    """목표값을 양자화 단위로 반올림 (부동소수 잡음 제거)"""
+    decimals = max(0, int(round(-np.log10(quantum))))
+    return tuple(round(round(float(t) / quantum) * quantum, decimals) for t in targets)
+
+
+def library_fingerprint(matrix):
+    """원료 라이브러리 내용 해시 (원료명, 영양소, 가격, 배합 범위)"""
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(matrix.names).encode())
+    digest.update('\x1f'.join(matrix.columns).encode())
+    for array in (matrix.nutrients, matrix.prices, matrix.lower, matrix.upper):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def requirement_key(library_hash, targets, settings):
+    """라이브러리 해시 + 양자화 목표 + 제약조건 설정으로 캐시 키 생성"""
+    payload = json.dumps({'format': CACHE_FORMAT, 'library': library_hash, 'targets': list(targets),
+                          'settings': settings},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def targets_met(result, targets, tolerance):
+    """캐시된 배합이 요청한 목표(에너지/단백질 범위, 건물 하한)를 만족하는지 (나머지 제약은 목표와 무관)"""
+    target_energy, target_protein, target_dry_matter = targets
+    nutrients = result['nutrients']
+    return {
+        'energy': target_energy * (1 - tolerance) <= nutrients['energy_mcal'] <= target_energy * (1 + tolerance),
+        'protein': target_protein * (1 - tolerance) <= nutrients['crude_protein'] <= target_protein * (1 + tolerance),
+        'dry_matter': nutrients['dry_matter'] >= target_dry_matter * (1 - tolerance)
+    }
+
+
+class SQLiteCacheTier:
+    """SQLite 공유 계층 (같은 DB를 쓰는 프로세스 간 공유, 재시작 후에도 유지)"""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS formulation_cache (
+                cache_key TEXT PRIMARY KEY,
+                library_hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT result FROM formulation_cache WHERE cache_key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, library_hash, result):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO formulation_cache (cache_key, library_hash, result) VALUES (?, ?, ?)',
+                               (key, library_hash, json.dumps(result, ensure_ascii=False)))
+            self._conn.commit()
+
+    def purge(self, keep_library_hash=None):
+        """현재 라이브러리가 아닌 항목 삭제, 삭제 건수 반환"""
+        with self._lock:
+            if keep_library_hash is None:
+                cursor = self._conn.execute('DELETE FROM formulation_cache')
+            else:
+                cursor = self._conn.execute('DELETE FROM formulation_cache WHERE library_hash != ?', (keep_library_hash,))
+            self._conn.commit()
+        return cursor.rowcount
+
+
+class RedisCacheTier:
+    """Redis 공유 계층 (shared.common.database의 Redis 클라이언트 사용)"""
+
+    name = 'redis'
+
+    def __init__(self, client=None, ttl=REDIS_TTL):
+        if client is None:
+            from shared.common.database import get_redis_client
+            client = get_redis_client()
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(KEY_PREFIX + key)
+        return json.loads(value) if value else None
+
+    def set(self, key, library_hash, result):
+        self.client.set(KEY_PREFIX + key, json.dumps(result, ensure_ascii=False), ex=self.ttl)
+
+    def purge(self, keep_library_hash=None):
+        # 키에 라이브러리 해시가 포함되므로 이전 항목은 조회되지 않고 TTL로 만료된다
+        return 0
+
+
+def open_shared_tier(kind, db_path=DB_PATH):
+    """공유 계층 생성 ('sqlite', 'redis', None), Redis 연결 실패 시 None"""
+    if kind is None:
+        return None
+    if kind == 'sqlite':
+        return SQLiteCacheTier(db_path)
+    if kind == 'redis':
+        try:
+            return RedisCacheTier()
+        except Exception as e:
+            logger.warning(f"Redis 캐시 계층을 사용할 수 없어 프로세스 내 캐시만 사용합니다: {e}")
+            return None
+    raise ValueError(f"지원하지 않는 캐시 계층입니다: {kind} (사용 가능: sqlite, redis)")
+
+
+class FormulationCache:
+    """배합 결과 2단계 캐시
+
+    키: 원료 라이브러리 내용 해시 + 양자화된 목표값 + 제약조건 설정.
+    풀이는 요청한 목표 그대로 하고, 같은 키의 다른 목표로 푼 배합은 요청 목표를 만족할 때만 돌려준다.
+    WATCHED_TABLES의 버전(트리거로 증가)이 바뀌면 프로세스 내 캐시를 비우고
+    공유 계층에서 이전 라이브러리 항목을 삭제한다.
+    """
+
+    def __init__(self, maxsize=256, shared=None, db_path=DB_PATH, quantum=TARGET_QUANTUM):
+        self.maxsize = maxsize
+        self.shared = shared
+        self.db_path = db_path
+        self.quantum = quantum
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = None
+        self._counters = {'hits': 0, 'shared_hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0,
+                          'invalidations': 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def check_versions(self, library_hash=None):
+        """원료 테이블 버전 확인, 바뀌었으면 무효화 (무효화 여부 반환)"""
+        versions = tuple(current_table_version(table, self.db_path) for table in WATCHED_TABLES)
+        if versions == self._versions:
+            return False
+        first_check = self._versions is None
+        self._versions = versions
+        if first_check:
+            return False
+        self.invalidate(keep_library_hash=library_hash)
+        return True
+
+    def invalidate(self, keep_library_hash=None):
+        """프로세스 내 캐시 전체 삭제 + 공유 계층의 이전 라이브러리 항목 삭제"""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._counters['invalidations'] += 1
+        if self.shared is not None:
+            dropped += self.shared.purge(keep_library_hash)
+        return dropped
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return result
+        if self.shared is not None:
+            result = self.shared.get(key)
+            if result is not None:
+                self._count('shared_hits')
+                self._store(key, result)
+                return result
+        self._count('misses')
+        return None
+
+    def _store(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def put(self, key, library_hash, result):
+        self._store(key, result)
+        if self.shared is not None:
+            self.shared.set(key, library_hash, result)
+
+    def optimize(self, model, target_energy, target_protein, target_dry_matter):
+        """캐시를 거친 배합 최적화 (FormulationModel.optimize와 같은 결과 딕셔너리)
+
+        반환값은 캐시와 공유되므로 호출자는 수정하지 않는다.
+        """
+        library_hash = library_fingerprint(model.matrix)
+        self.check_versions(library_hash)
+
+        targets = [float(target_energy), float(target_protein), float(target_dry_matter)]
+        key = requirement_key(library_hash, quantize_targets(targets, self.quantum), model.settings())
+        entry = self.get(key)
+        if entry is not None:
+            if entry['targets'] == targets:
+                return entry['result']
+            result = entry['result']
+            if result['status'] == 'success':
+                met = targets_met(result, targets, model.tolerance)
+                if all(met.values()):
+                    return dict(result, target_met=met)
+            # 요청 목표를 만족하지 않아 다시 풂
+            self._count('stale_hits')
+
+        result = model.optimize(*targets)
+        # 시간 제한으로 끝난 정수계획 결과는 최종 해가 아니므로 저장하지 않는다
+        if result['status'] != 'time_limit' and result.get('mip_status') != 'time_limit':
+            self.put(key, library_hash, {'targets': targets, 'result': result})
+        return result
+
+    def stats(self):
+        """캐시 통계 (hits, shared_hits, stale_hits, misses, evictions, invalidations, size, maxsize)"""
+        with self._lock:
+            return dict(self._counters, size=len(self._entries), maxsize=self.maxsize,
+                        shared=self.shared.name if self.shared is not None else None)
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 사료 배합 최적화 엔진
+원료 × 영양소 행렬을 이용한 선형계획 모델 생성 및 풀이
+"""
+
+import abc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pulp
+from scipy import sparse
+from scipy.optimize import linprog, milp, Bounds, LinearConstraint
+
+# 배합 계산에 사용하는 영양소 컬럼 (행렬의 열 순서)
+NUTRIENT_COLUMNS = ['energy_mcal', 'crude_protein', 'dry_matter', 'ndf', 'ca', 'p']
+
+# 원료 비율 하한 (이 값 이하는 배합에서 제외)
+MIN_REPORTED_RATIO = 0.001
+
+# 기본 솔버 백엔드 (프로세스 내 HiGHS)
+DEFAULT_SOLVER = 'highs'
+
+# 정수계획(원료 수 제한) 풀이 예산: 시간 제한(초), 상대 최적성 간격
+DEFAULT_TIME_LIMIT = 5.0
+DEFAULT_MIP_GAP = 0.001
+
+
+class IngredientMatrix:
+    """원료 라이브러리의 행렬 표현 (원료 × 영양소)"""
+
+    def __init__(self, names, nutrients, prices, min_inclusion, max_inclusion, columns=NUTRIENT_COLUMNS):
+        self.names = list(names)
+        self.columns = list(columns)
+        self.column_index = {name: i for i, name in enumerate(self.columns)}
+
+        # 영양소 행렬 (n_ingredients × n_nutrients, float64 연속 배열)
+        self.nutrients = np.ascontiguousarray(nutrients, dtype=np.float64).reshape(len(self.names), len(self.columns))
+        self.prices = np.asarray(prices, dtype=np.float64)
+
+        # 원료별 배합 비율 범위 (% → 비율)
+        self.lower = np.clip(np.asarray(min_inclusion, dtype=np.float64) / 100.0, 0.0, 1.0)
+        self.upper = np.clip(np.asarray(max_inclusion, dtype=np.float64) / 100.0, 0.0, 1.0)
+
+    @classmethod
+    def from_dataframe(cls, ingredients_df, columns=NUTRIENT_COLUMNS):
+        """feed_ingredients 데이터프레임에서 행렬 생성"""
+        return cls(
+            names=ingredients_df['ingredient_name'].tolist(),
+            nutrients=ingredients_df[list(columns)].to_numpy(dtype=np.float64),
+            prices=ingredients_df['price_per_kg'].to_numpy(dtype=np.float64),
+            min_inclusion=ingredients_df['min_inclusion'].to_numpy(dtype=np.float64),
+            max_inclusion=ingredients_df['max_inclusion'].to_numpy(dtype=np.float64),
+            columns=columns
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, name):
+        """영양소 열 벡터 반환"""
+        return self.nutrients[:, self.column_index[name]]
+
+
+class LinearProgram:
+    """행렬 형태 선형계획 문제
+
+    min c·x  s.t.  A_ub·x <= b_ub,  A_eq·x == b_eq,  lower <= x <= upper
+    """
+
+    def __init__(self, c, A_ub, b_ub, A_eq, b_eq, lower, upper):
+        self.c = c
+        self.A_ub = A_ub
+        self.b_ub = b_ub
+        self.A_eq = A_eq
+        self.b_eq = b_eq
+        self.lower = lower
+        self.upper = upper
+
+    @property
+    def n_variables(self):
+        return self.c.shape[0]
+
+
+class MixedIntegerProgram(LinearProgram):
+    """정수 변수를 포함한 선형계획 문제 (integrality: 1이면 정수 변수)
+
+    제약 행렬은 scipy.sparse 행렬일 수 있다.
+    """
+
+    def __init__(self, c, A_ub, b_ub, A_eq, b_eq, lower, upper, integrality):
+        super().__init__(c, A_ub, b_ub, A_eq, b_eq, lower, upper)
+        self.integrality = integrality
+
+
+def _matrix_rows(A):
+    """제약 행렬의 행별 (열 인덱스, 계수) (밀집/희소 행렬 공통)"""
+    if sparse.issparse(A):
+        A = A.tocsr()
+        for r in range(A.shape[0]):
+            start, end = A.indptr[r], A.indptr[r + 1]
+            yield A.indices[start:end], A.data[start:end]
+    else:
+        for row in A:
+            nz = np.flatnonzero(row)
+            yield nz, row[nz]
+
+
+class FormulationModel:
+    """원료 라이브러리에 대한 배합 모델 (제약 행렬은 한 번만 생성, 목표값만 교체)"""
+
+    def __init__(self, matrix, tolerance=0.05, ndf_range=(25.0, 35.0), ca_p_ratio=(1.5, 2.5), solver=None,
+                 max_ingredients=None, min_batch_ratio=0.0, time_limit=DEFAULT_TIME_LIMIT, mip_gap=DEFAULT_MIP_GAP):
+        self.matrix = matrix
+        self.solver = get_solver(solver)
+        self.tolerance = tolerance
+        self.ndf_range = ndf_range
+        self.ca_p_ratio = ca_p_ratio
+
+        # 원료 수 제한 / 최소 투입 비율(0 또는 이 값 이상)이 있으면 정수계획으로 풀이
+        self.max_ingredients = max_ingredients
+        self.min_batch_ratio = min_batch_ratio
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+
+        energy = matrix.column('energy_mcal')
+        protein = matrix.column('crude_protein')
+        dry_matter = matrix.column('dry_matter')
+        ndf = matrix.column('ndf')
+        ca = matrix.column('ca')
+        p = matrix.column('p')
+
+        # 부등식 제약조건 (A_ub·x <= b_ub)
+        self.A_ub = np.vstack([
+            -energy, energy,                      # 에너지 95~105%
+            -protein, protein,                    # 단백질 95~105%
+            -dry_matter,                          # 건물 95% 이상
+            -ndf, ndf,                            # NDF 25~35%
+            ca_p_ratio[0] * p - ca,               # Ca >= 1.5 P
+            ca - ca_p_ratio[1] * p                # Ca <= 2.5 P
+        ])
+
+        # 등식 제약조건: 총 비율 = 100%
+        self.A_eq = np.ones((1, len(matrix)))
+        self.b_eq = np.array([1.0])
+
+        self.lower = matrix.lower.copy()
+        self.upper = np.maximum(matrix.upper, matrix.lower)
+
+    @property
+    def is_mixed_integer(self):
+        return self.max_ingredients is not None or self.min_batch_ratio > 0
+
+    def settings(self):
+        """결과에 영향을 주는 제약조건 설정 (캐시 키 구성용)"""
+        settings = {
+            'tolerance': self.tolerance,
+            'ndf_range': list(self.ndf_range),
+            'ca_p_ratio': list(self.ca_p_ratio),
+            'solver': self.solver.name
+        }
+        if self.is_mixed_integer:
+            settings.update(max_ingredients=self.max_ingredients, min_batch_ratio=self.min_batch_ratio,
+                            time_limit=self.time_limit, mip_gap=self.mip_gap)
+        return settings
+
+    def rhs(self, target_energy, target_protein, target_dry_matter):
+        """목표 영양소에 대한 부등식 우변 벡터"""
+        low, high = 1 - self.tolerance, 1 + self.tolerance
+        return np.array([
+            -target_energy * low, target_energy * high,
+            -target_protein * low, target_protein * high,
+            -target_dry_matter * low,
+            -self.ndf_range[0], self.ndf_range[1],
+            0.0,
+            0.0
+        ])
+
+    def lp(self, target_energy, target_protein, target_dry_matter):
+        """목표 영양소를 적용한 선형계획 문제 (제약 행렬은 공유)"""
+        return LinearProgram(self.matrix.prices, self.A_ub,
+                             self.rhs(target_energy, target_protein, target_dry_matter),
+                             self.A_eq, self.b_eq, self.lower, self.upper)
+
+    def mip(self, target_energy, target_protein, target_dry_matter):
+        """원료 포함 여부(이진 변수 y)를 추가한 정수계획 문제
+
+        변수 [x, y]: x_i <= upper_i·y_i, x_i >= min_batch_ratio·y_i, Σy <= max_ingredients
+        """
+        n = len(self.matrix)
+        identity = sparse.identity(n, format='csr')
+        # 최대 함량이 최소 투입 비율보다 작은 미량 원료(프리믹스 등)는 최소 투입 제한 제외
+        batch = np.where(self.upper >= self.min_batch_ratio, self.min_batch_ratio, 0.0)
+
+        blocks = [
+            [sparse.csr_matrix(self.A_ub), None],
+            [identity, sparse.diags(-self.upper)],
+            [-identity, sparse.diags(batch)]
+        ]
+        b_ub = [self.rhs(target_energy, target_protein, target_dry_matter), np.zeros(n), np.zeros(n)]
+        if self.max_ingredients is not None:
+            blocks.append([None, sparse.csr_matrix(np.ones((1, n)))])
+            b_ub.append([float(self.max_ingredients)])
+
+        return MixedIntegerProgram(
+            c=np.concatenate([self.matrix.prices, np.zeros(n)]),
+            A_ub=sparse.bmat(blocks, format='csr'),
+            b_ub=np.concatenate(b_ub),
+            A_eq=sparse.hstack([sparse.csr_matrix(self.A_eq), sparse.csr_matrix((1, n))], format='csr'),
+            b_eq=self.b_eq,
+            lower=np.concatenate([self.lower, np.zeros(n)]),
+            upper=np.concatenate([self.upper, np.ones(n)]),
+            integrality=np.concatenate([np.zeros(n), np.ones(n)])
+        )
+
+    def optimize(self, target_energy, target_protein, target_dry_matter):
+        """비용 최소화 배합 계산
+
+        정수계획이면 결과에 'mip_status'('optimal' 또는 시간 제한 시 현재 최선해 'time_limit')가 추가된다.
+        """
+        if self.is_mixed_integer:
+            required = int(np.count_nonzero(self.lower > 0))
+            if self.max_ingredients is not None and required > self.max_ingredients:
+                return {
+                    'status': 'infeasible',
+                    'message': f'최소 함량이 지정된 원료({required}종)가 최대 원료 수({self.max_ingredients})보다 많습니다.'
+                }
+            status, solution = self.solver.solve_mip(self.mip(target_energy, target_protein, target_dry_matter),
+                                                     self.time_limit, self.mip_gap)
+            if solution is None and status == 'Not Solved':
+                return {
+                    'status': 'time_limit',
+                    'message': '제한 시간 안에 실행 가능한 배합을 찾지 못했습니다.'
+                }
+            ratios = None if solution is None else solution[:len(self.matrix)]
+        else:
+            status, ratios = self.solver.solve(self.lp(target_energy, target_protein, target_dry_matter))
+        if ratios is None:
+            return infeasible_result()
+
+        result = summarize_formulation(self.matrix, ratios, target_energy, target_protein,
+                                       target_dry_matter, self.tolerance)
+        if self.is_mixed_integer:
+            result['mip_status'] = 'optimal' if status == 'Optimal' else 'time_limit'
+        return result
+
+
+def build_formulation_lp(matrix, target_energy, target_protein, target_dry_matter, **options):
+    """배합 선형계획 모델 생성 (행렬 연산 한 번으로 전체 제약조건 구성)"""
+    return FormulationModel(matrix, **options).lp(target_energy, target_protein, target_dry_matter)
+
+
+class SolverBackend(abc.ABC):
+    """선형계획 솔버 백엔드 인터페이스
+
+    solve(lp)는 (상태 문자열, 해 벡터 또는 None)을 반환한다.
+    상태 문자열은 PuLP의 LpStatus 값('Optimal', 'Infeasible', ...)을 따른다.
+    solve_mip(mip, time_limit, mip_gap)은 시간 제한에 걸리면 현재 최선해와 'Feasible'을 반환한다.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def solve(self, lp):
+        """선형계획 풀이"""
+
+    @abc.abstractmethod
+    def solve_mip(self, mip, time_limit=DEFAULT_TIME_LIMIT, mip_gap=DEFAULT_MIP_GAP):
+        """정수계획 풀이 (시간 제한/최적성 간격 적용)"""
+
+
+class PulpCbcBackend(SolverBackend):
+    """PuLP + CBC 백엔드 (외부 프로세스 실행)"""
+
+    name = 'pulp'
+
+    def _build(self, lp, integrality=None):
+        prob = pulp.LpProblem("Feed_Formulation_Optimization", pulp.LpMinimize)
+        x = [pulp.LpVariable(f"x_{i}", lowBound=lp.lower[i], upBound=lp.upper[i],
+                             cat=pulp.LpInteger if integrality is not None and integrality[i] else pulp.LpContinuous)
+             for i in range(lp.n_variables)]
+
+        prob += pulp.LpAffineExpression(zip(x, lp.c))
+        for (cols, values), rhs in zip(_matrix_rows(lp.A_ub), lp.b_ub):
+            prob += pulp.LpAffineExpression([(x[j], v) for j, v in zip(cols, values)]) <= rhs
+        for (cols, values), rhs in zip(_matrix_rows(lp.A_eq), lp.b_eq):
+            prob += pulp.LpAffineExpression([(x[j], v) for j, v in zip(cols, values)]) == rhs
+        return prob, x
+
+    def solve(self, lp):
+        prob, x = self._build(lp)
+        prob.solve(pulp.PULP_CBC_CMD(msg=False))
+
+        status = pulp.LpStatus[prob.status]
+        if status != 'Optimal':
+            return status, None
+        return status, np.array([v.varValue or 0.0 for v in x])
+
+    def solve_mip(self, mip, time_limit=DEFAULT_TIME_LIMIT, mip_gap=DEFAULT_MIP_GAP):
+        prob, x = self._build(mip, mip.integrality)
+        prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=mip_gap))
+
+        if prob.sol_status == pulp.LpSolutionIntegerFeasible:
+            status = 'Feasible'
+        else:
+            status = pulp.LpStatus[prob.status]
+        if status not in ('Optimal', 'Feasible'):
+            return status, None
+        return status, np.array([v.varValue or 0.0 for v in x])
+
+
+class ScipyHighsBackend(SolverBackend):
+    """scipy.optimize.linprog(HiGHS) 백엔드 (프로세스 내 실행, 파일 입출력 없음)"""
+
+    name = 'highs'
+
+    # linprog 상태 코드 → PuLP 상태 문자열
+    STATUS = {0: 'Optimal', 1: 'Not Solved', 2: 'Infeasible', 3: 'Unbounded', 4: 'Not Solved'}
+
+    def solve(self, lp):
+        result = linprog(
+            lp.c, A_ub=lp.A_ub, b_ub=lp.b_ub, A_eq=lp.A_eq, b_eq=lp.b_eq,
+            bounds=np.column_stack([lp.lower, lp.upper]), method='highs'
+        )
+        status = self.STATUS.get(result.status, 'Not Solved')
+        if status != 'Optimal':
+            return status, None
+        return status, result.x
+
+    def solve_mip(self, mip, time_limit=DEFAULT_TIME_LIMIT, mip_gap=DEFAULT_MIP_GAP):
+        result = milp(
+            mip.c, integrality=mip.integrality, bounds=Bounds(mip.lower, mip.upper),
+            constraints=[LinearConstraint(mip.A_ub, -np.inf, mip.b_ub), LinearConstraint(mip.A_eq, mip.b_eq, mip.b_eq)],
+            options={'time_limit': time_limit, 'mip_rel_gap': mip_gap}
+        )
+        if result.status == 1 and result.x is not None:
+            return 'Feasible', result.x  # 시간 제한 도달, 현재 최선해
+        status = self.STATUS.get(result.status, 'Not Solved')
+        if status != 'Optimal':
+            return status, None
+        return status, result.x
+
+
+SOLVER_BACKENDS = {
+    PulpCbcBackend.name: PulpCbcBackend(),
+    ScipyHighsBackend.name: ScipyHighsBackend()
+}
+
+
+def get_solver(solver=None):
+    """이름 또는 인스턴스로 솔버 백엔드 반환"""
+    if solver is None:
+        solver = DEFAULT_SOLVER
+    if isinstance(solver, SolverBackend):
+        return solver
+    if solver not in SOLVER_BACKENDS:
+        raise ValueError(f"지원하지 않는 솔버입니다: {solver} (사용 가능: {', '.join(SOLVER_BACKENDS)})")
+    return SOLVER_BACKENDS[solver]
+
+
+def solve_lp(lp, solver=None):
+    """선택한 솔버 백엔드로 행렬 형태 선형계획 문제 풀이
+
+    반환값: (상태 문자열, 해 벡터 또는 None)
+    """
+    return get_solver(solver).solve(lp)
+
+
+def summarize_formulation(matrix, ratios, target_energy, target_protein, target_dry_matter, tolerance=0.05):
+    """해 벡터를 배합 결과 딕셔너리로 변환"""
+    included = ratios > MIN_REPORTED_RATIO
+    ratios = np.where(included, ratios, 0.0)
+
+    formulation = {matrix.names[i]: float(ratios[i] * 100) for i in np.flatnonzero(included)}
+    total_cost = float(matrix.prices @ ratios)
+
+    # 영양소 함량 계산 (비율 벡터 × 영양소 행렬)
+    supplied = ratios @ matrix.nutrients
+    nutrients = {name: float(supplied[i]) for i, name in enumerate(matrix.columns)}
+
+    return {
+        'status': 'success',
+        'formulation': formulation,
+        'total_cost': total_cost,
+        'nutrients': nutrients,
+        'target_met': {
+            'energy': target_energy * (1 - tolerance) <= nutrients['energy_mcal'] <= target_energy * (1 + tolerance),
+            'protein': target_protein * (1 - tolerance) <= nutrients['crude_protein'] <= target_protein * (1 + tolerance),
+            'dry_matter': nutrients['dry_matter'] >= target_dry_matter * (1 - tolerance)
+        }
+    }
+
+
+def infeasible_result():
+    """최적해가 없을 때의 결과 딕셔너리"""
+    return {
+        'status': 'infeasible',
+        'message': '주어진 제약조건으로 최적해를 찾을 수 없습니다.'
+    }
+
+
+def optimize_formulation(matrix, target_energy, target_protein, target_dry_matter, solver=None):
+    """행렬 기반 사료 배합 최적화 (비용 최소화)"""
+    return FormulationModel(matrix, solver=solver).optimize(target_energy, target_protein, target_dry_matter)
+
+
+# 프로세스 풀 워커별 공유 모델 (initializer에서 한 번만 생성)
+_worker_model = None
+
+
+def _init_batch_worker(matrix, solver):
+    global _worker_model
+    _worker_model = FormulationModel(matrix, solver=solver)
+
+
+def _solve_batch_chunk(chunk):
+    return [(index, _worker_model.optimize(*targets)) for index, targets in chunk]
+
+
+def _solve_shared_chunk(matrix, solver, chunk):
+    """공유 실행기용 작업 (원료 라이브러리를 작업마다 함께 전달)"""
+    model = FormulationModel(matrix, solver=solver)
+    return [(index, model.optimize(*targets)) for index, targets in chunk]
+
+
+def _requirement_targets(requirement):
+    return (requirement['target_energy'], requirement['target_protein'],
+            requirement.get('target_dry_matter', 90.0))
+
+
+def optimize_formulation_batch(matrix, requirements, max_workers=None, chunk_size=8, solver=None, executor=None):
+    """여러 요구량에 대한 배합 최적화 (원료 라이브러리 공유)
+
+    requirements: target_energy, target_protein, target_dry_matter(선택), key(선택)를
+    가진 딕셔너리 목록 (예: 축사/동물 그룹별 요구량)
+
+    완료되는 순서대로 {'index', 'key', ...배합 결과} 딕셔너리를 생성(yield)한다.
+    max_workers=1 이면 현재 프로세스에서 순차적으로 계산한다.
+    executor(ProcessPoolExecutor)를 주면 새 프로세스 풀을 만들지 않고 그 실행기에서 계산한다 (max_workers 무시).
+    """
+    requirements = list(requirements)
+    jobs = [(i, _requirement_targets(req)) for i, req in enumerate(requirements)]
+
+    def tagged(index, result):
+        return {'index': index, 'key': requirements[index].get('key'), **result}
+
+    if max_workers == 1 or len(jobs) <= 1:
+        model = FormulationModel(matrix, solver=solver)
+        for index, targets in jobs:
+            yield tagged(index, model.optimize(*targets))
+        return
+
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    if executor is not None:
+        futures = [executor.submit(_solve_shared_chunk, matrix, get_solver(solver), chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for index, result in future.result():
+                yield tagged(index, result)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker,
+                             initargs=(matrix, get_solver(solver))) as executor:
+        futures = [executor.submit(_solve_batch_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for index, result in future.result():
+                yield tagged(index, result)
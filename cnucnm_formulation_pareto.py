@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 사료 배합 비용-영양 편차 파레토 곡선
+에너지/단백질 편차 변수를 추가한 모델에서 편차 가중치(λ)를 바꿔가며
+비용과 목표 편차의 절충 배합들을 한 번에 계산한다.
+λ만 바뀌면 목적함수만 달라지므로 이웃 점의 최적 기저에서 단체법을 재개한다.
+"""
+
+import numpy as np
+
+from cnucnm_formulation_engine import FormulationModel, LinearProgram, summarize_formulation, infeasible_result
+from cnucnm_formulation_reoptimizer import StandardForm, basis_from_point, is_optimal, primal_simplex
+
+# 편차를 측정하는 영양소 (FormulationModel에서 ±tolerance 범위로 고정된 항목)
+DEVIATION_NUTRIENTS = ['energy_mcal', 'crude_protein']
+
+# 목표 대비 허용하는 최대 상대 편차 (곡선의 바깥 범위)
+MAX_DEVIATION = 0.10
+
+# λ 범위 (최소 비용 배합 가격 대비 배수, 로그 간격)
+TRADE_OFF_RANGE = (1e-3, 1e2)
+
+# FormulationModel.A_ub에서 편차 변수로 대체하는 에너지/단백질 행 수
+_BAND_ROWS = 4
+
+
+class ParetoModel:
+    """편차 변수를 포함한 배합 모델
+
+    변수: 원료 비율 x (n개) + 영양소별 상대 편차 u⁺, u⁻ (0 <= u <= max_deviation)
+    등식: (영양소·x) / 목표 - u⁺ + u⁻ = 1, 비율 합 = 1
+    부등식: 건물, NDF, Ca:P 제약은 기본 모델과 동일
+    목적: 가격·x + λ·Σu
+    """
+
+    def __init__(self, matrix, target_energy, target_protein, target_dry_matter,
+                 max_deviation=MAX_DEVIATION, solver=None):
+        self.base = FormulationModel(matrix, solver=solver)
+        self.matrix = matrix
+        self.targets = (target_energy, target_protein, target_dry_matter)
+        n = len(matrix)
+        k = len(DEVIATION_NUTRIENTS)
+        self.n = n
+
+        # 편차 정의 등식 (영양소 행 / 목표, u⁺ 계수 -1, u⁻ 계수 +1)
+        goal = np.array([target_energy, target_protein])
+        nutrient_rows = np.vstack([matrix.column(name) for name in DEVIATION_NUTRIENTS]) / goal[:, None]
+        deviation_block = np.hstack([-np.eye(k), np.eye(k)])
+        A_eq = np.block([
+            [nutrient_rows, deviation_block],
+            [self.base.A_eq, np.zeros((1, 2 * k))]
+        ])
+        b_eq = np.concatenate([np.ones(k), self.base.b_eq])
+
+        # 나머지 부등식은 기본 모델에서 에너지/단백질 범위 행만 제외
+        A_ub = np.hstack([self.base.A_ub[_BAND_ROWS:], np.zeros((self.base.A_ub.shape[0] - _BAND_ROWS, 2 * k))])
+        b_ub = self.base.rhs(*self.targets)[_BAND_ROWS:]
+
+        self.lp = LinearProgram(
+            np.zeros(n + 2 * k), A_ub, b_ub, A_eq, b_eq,
+            np.concatenate([self.base.lower, np.zeros(2 * k)]),
+            np.concatenate([self.base.upper, np.full(2 * k, max_deviation)])
+        )
+        self.sf = StandardForm(self.lp)
+
+    def cost_vector(self, trade_off):
+        """λ에 대한 목적함수 계수"""
+        k = len(DEVIATION_NUTRIENTS)
+        return np.concatenate([self.matrix.prices, np.full(2 * k, trade_off)])
+
+    def solve(self, c):
+        """솔버 백엔드로 처음부터 풀이 (반환값: 상태, 표준형 해 z, 기저 또는 None)"""
+        self.lp.c = c
+        status, solution = self.base.solver.solve(self.lp)
+        if solution is None:
+            return status, None, None
+        z = self.sf.full_point(solution)
+        basis = basis_from_point(self.sf, z)
+        if basis is not None:
+            warm_status, warm_z, basis = primal_simplex(self.sf, self.sf.full_cost(c), basis)
+            if warm_status == 'Optimal':
+                z = warm_z
+            else:
+                basis = None
+        return status, z, basis
+
+    def describe(self, z, trade_off):
+        """표준형 해를 배합 결과 딕셔너리로 변환 (편차 정보 포함)"""
+        ratios = np.clip(z[:self.n], 0.0, None)
+        k = len(DEVIATION_NUTRIENTS)
+        u = z[self.n:self.n + 2 * k]
+        by_nutrient = u[:k] + u[k:]
+
+        result = summarize_formulation(self.matrix, ratios, *self.targets, self.base.tolerance)
+        result['trade_off'] = float(trade_off)
+        result['deviation'] = float(by_nutrient.sum() * 100)
+        result['nutrient_deviation'] = {name: float(by_nutrient[i] * 100) for i, name in enumerate(DEVIATION_NUTRIENTS)}
+        return result
+
+
+def pareto_frontier(matrix, target_energy, target_protein, target_dry_matter, n_points=25,
+                    cost_weight=1.0, quality_weight=1.0, max_deviation=MAX_DEVIATION, solver=None):
+    """비용-영양 편차 파레토 곡선 계산
+
+    λ를 로그 간격으로 키워가며(편차를 점점 비싸게) 이전 점의 기저에서 재최적화한다.
+    cost_weight/quality_weight 비율에 해당하는 λ(최소 비용 단가 × quality_weight / cost_weight)의
+    배합을 'selected'로 표시한다.
+    가중합 방식이므로 곡선의 꼭짓점 배합만 나오며, 같은 배합은 한 번만 반환한다.
+
+    반환값: {'status', 'points': [결과 딕셔너리, 편차 내림차순], 'selected': 가중치에 해당하는 점의 인덱스,
+             'stats': {'cold_starts', 'warm_starts', 'unchanged'}}
+    cost_weight는 0보다 커야 하고 quality_weight는 0 이상이어야 한다 (아니면 ValueError).
+    """
+    if not (np.isfinite(cost_weight) and cost_weight > 0):
+        raise ValueError(f"비용 가중치는 0보다 커야 합니다: {cost_weight}")
+    if not (np.isfinite(quality_weight) and quality_weight >= 0):
+        raise ValueError(f"품질 가중치는 0 이상이어야 합니다: {quality_weight}")
+
+    model = ParetoModel(matrix, target_energy, target_protein, target_dry_matter, max_deviation, solver)
+    stats = {'cold_starts': 0, 'warm_starts': 0, 'unchanged': 0}
+
+    # λ 기준값: 최소 비용 배합의 단가 (편차 1(=100%)당 비용 단위)
+    status, z, basis = model.solve(model.cost_vector(0.0))
+    stats['cold_starts'] += 1
+    if z is None:
+        return {**infeasible_result(), 'points': [], 'selected': None, 'stats': stats}
+    scale = max(float(matrix.prices @ z[:model.n]), 1.0)
+
+    # 가중치 비율에 해당하는 λ를 격자에 포함
+    trade_offs = scale * np.logspace(np.log10(TRADE_OFF_RANGE[0]), np.log10(TRADE_OFF_RANGE[1]), n_points)
+    preferred = scale * quality_weight / cost_weight
+    trade_offs = np.unique(np.append(trade_offs, preferred))
+
+    points = []
+    point_trade_offs = []
+    for trade_off in trade_offs:
+        c = model.cost_vector(trade_off)
+        c_full = model.sf.full_cost(c)
+        if basis is not None and is_optimal(model.sf, c_full, basis):
+            stats['unchanged'] += 1
+        else:
+            warm_status = 'Not Solved'
+            if basis is not None:
+                warm_status, warm_z, warm_basis = primal_simplex(model.sf, c_full, basis)
+            if warm_status == 'Optimal':
+                z, basis = warm_z, warm_basis
+                stats['warm_starts'] += 1
+            else:
+                status, z, basis = model.solve(c)
+                stats['cold_starts'] += 1
+                if z is None:
+                    continue
+
+        point = model.describe(z, trade_off)
+        if points and np.isclose(point['total_cost'], points[-1]['total_cost']) \
+                and np.isclose(point['deviation'], points[-1]['deviation']):
+            point_trade_offs[-1].append(trade_off)
+        else:
+            points.append(point)
+            point_trade_offs.append([trade_off])
+
+    selected = next((i for i, values in enumerate(point_trade_offs) if preferred in values), None)
+    return {'status': 'success', 'points': points, 'selected': selected, 'stats': stats}
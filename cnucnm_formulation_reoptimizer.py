@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 사료 가격 변경 재최적화
+배합별 최적 기저(basis)를 보관하고, 원료 가격만 바뀌었을 때 해당 기저에서
+단체법(simplex)을 재개하여 목적함수만 다시 최적화한다.
+민감도 분석(감소비용, 비용 범위)으로 최적해가 변하지 않는 배합은 계산을 생략한다.
+"""
+
+import copy
+
+import numpy as np
+
+from cnucnm_formulation_engine import FormulationModel, summarize_formulation, infeasible_result
+
+# 수치 허용오차
+TOLERANCE = 1e-9
+
+# 솔버 해에서 기저를 복원할 때의 한계값 판정 허용오차
+BASIS_TOLERANCE = 1e-6
+
+# 재최적화 최대 피벗 횟수 (초과 시 처음부터 다시 풀이)
+MAX_PIVOTS = 500
+
+
+class StandardForm:
+    """여유변수를 추가한 표준형 (M·z = b, lower <= z <= upper)"""
+
+    def __init__(self, lp):
+        m_ub, n = lp.A_ub.shape
+        m_eq = lp.A_eq.shape[0]
+
+        self.n = n
+        self.M = np.block([
+            [lp.A_ub, np.eye(m_ub)],
+            [lp.A_eq, np.zeros((m_eq, m_ub))]
+        ])
+        self.b = np.concatenate([lp.b_ub, lp.b_eq])
+        self.lower = np.concatenate([lp.lower, np.zeros(m_ub)])
+        self.upper = np.concatenate([lp.upper, np.full(m_ub, np.inf)])
+        self.A_ub = lp.A_ub
+        self.b_ub = lp.b_ub
+
+    @property
+    def n_rows(self):
+        return self.M.shape[0]
+
+    def full_cost(self, c):
+        """원료 가격 벡터에 여유변수 비용(0)을 붙인 벡터"""
+        return np.concatenate([c, np.zeros(self.M.shape[1] - self.n)])
+
+    def full_point(self, x):
+        """원료 비율 벡터에 여유변수 값을 붙인 점"""
+        slack = np.maximum(self.b_ub - self.A_ub @ x, 0.0)
+        return np.concatenate([x, slack])
+
+
+class Basis:
+    """최적 기저 상태 (기저 변수 인덱스, 비기저 변수의 상한 여부)"""
+
+    def __init__(self, columns, at_upper):
+        self.columns = list(columns)
+        self.at_upper = at_upper
+
+    def copy(self):
+        return Basis(self.columns, self.at_upper.copy())
+
+
+def basis_from_point(sf, z):
+    """꼭짓점 해에서 기저 복원
+
+    솔버 해의 미세 오차를 감안해 상/하한에서 떨어진 변수를 거리 순으로 선택하고,
+    퇴화로 부족한 계수(rank)는 여유변수 우선으로 보충한다.
+    """
+    m = sf.n_rows
+    distance = np.minimum(z - sf.lower, sf.upper - z)
+    between = distance > BASIS_TOLERANCE
+
+    columns = []
+    candidates = sorted(np.flatnonzero(between), key=lambda j: -distance[j])
+    candidates += [j for j in range(sf.n, sf.M.shape[1]) if not between[j]]
+    candidates += [j for j in range(sf.n) if not between[j]]
+    for j in candidates:
+        if len(columns) == m:
+            break
+        if np.linalg.matrix_rank(sf.M[:, columns + [j]]) == len(columns) + 1:
+            columns.append(j)
+
+    if len(columns) < m:
+        return None
+
+    at_upper = np.zeros(sf.M.shape[1], dtype=bool)
+    at_upper[:sf.n] = z[:sf.n] >= sf.upper[:sf.n] - BASIS_TOLERANCE
+    at_upper[columns] = False
+    basis = Basis(columns, at_upper)
+
+    # 복원한 기저의 해가 실행가능한지 확인
+    z_basis, _ = _basic_solution(sf, basis)
+    if np.any(z_basis < sf.lower - BASIS_TOLERANCE) or np.any(z_basis > sf.upper + BASIS_TOLERANCE):
+        return None
+    return basis
+
+
+def _basic_solution(sf, basis):
+    """현재 기저에 대한 해 (비기저 변수는 상/하한값)"""
+    z = np.where(basis.at_upper, sf.upper, sf.lower)
+    z[basis.columns] = 0.0
+    B = sf.M[:, basis.columns]
+    z[basis.columns] = np.linalg.solve(B, sf.b - sf.M @ z)
+    return z, B
+
+
+def reduced_costs(sf, c_full, basis):
+    """감소비용 d = c - Mᵀ·y (y: 쌍대 변수)"""
+    B = sf.M[:, basis.columns]
+    y = np.linalg.solve(B.T, c_full[basis.columns])
+    d = c_full - sf.M.T @ y
+    d[basis.columns] = 0.0
+    return d
+
+
+def _improving_columns(sf, basis, d):
+    nonbasic = np.ones(sf.M.shape[1], dtype=bool)
+    nonbasic[basis.columns] = False
+    movable = nonbasic & (sf.upper - sf.lower > TOLERANCE)
+    return movable & ((~basis.at_upper & (d < -TOLERANCE)) | (basis.at_upper & (d > TOLERANCE)))
+
+
+def is_optimal(sf, c_full, basis):
+    """가격 변경 후에도 기저가 최적인지 확인 (쌍대 실행가능성)"""
+    return not _improving_columns(sf, basis, reduced_costs(sf, c_full, basis)).any()
+
+
+def primal_simplex(sf, c_full, basis, max_pivots=MAX_PIVOTS):
+    """상하한 변수 개정 단체법 (실행가능 기저에서 시작)
+
+    반환값: (상태, 해 z, 최종 기저)
+    """
+    basis = basis.copy()
+    degenerate_run = 0
+
+    for _ in range(max_pivots):
+        z, B = _basic_solution(sf, basis)
+        d = reduced_costs(sf, c_full, basis)
+        improving = np.flatnonzero(_improving_columns(sf, basis, d))
+        if improving.size == 0:
+            return 'Optimal', z, basis
+
+        # 진입 변수: Dantzig 규칙, 퇴화가 반복되면 Bland 규칙으로 전환 (순환 방지)
+        if degenerate_run > 10:
+            j = improving[0]
+        else:
+            j = improving[np.argmax(np.abs(d[improving]))]
+        direction = -1.0 if basis.at_upper[j] else 1.0
+
+        # 진입 변수 1단위 이동 시 기저 변수 변화량
+        delta = -direction * np.linalg.solve(B, sf.M[:, j])
+        x_B = z[basis.columns]
+        lb_B = sf.lower[basis.columns]
+        ub_B = sf.upper[basis.columns]
+
+        steps = np.full(len(basis.columns), np.inf)
+        falling = delta < -TOLERANCE
+        rising = delta > TOLERANCE
+        steps[falling] = np.maximum(x_B[falling] - lb_B[falling], 0.0) / -delta[falling]
+        steps[rising] = np.maximum(ub_B[rising] - x_B[rising], 0.0) / delta[rising]
+
+        flip_step = sf.upper[j] - sf.lower[j]
+        r = int(np.argmin(steps))
+        step = steps[r]
+
+        if flip_step <= step:
+            # 진입 변수가 반대쪽 한계에 먼저 도달 (기저 변경 없음)
+            if np.isinf(flip_step):
+                return 'Unbounded', None, basis
+            basis.at_upper[j] = not basis.at_upper[j]
+            step = flip_step
+        else:
+            leaving = basis.columns[r]
+            basis.at_upper[leaving] = bool(rising[r])
+            basis.at_upper[j] = False
+            basis.columns[r] = j
+
+        degenerate_run = degenerate_run + 1 if step <= TOLERANCE else 0
+
+    return 'Not Solved', None, basis
+
+
+def cost_ranges(sf, c_full, basis):
+    """원료별 비용 범위 (다른 가격이 고정일 때 현재 기저가 최적으로 유지되는 가격 구간)"""
+    n = sf.n
+    d = reduced_costs(sf, c_full, basis)
+    low = np.full(n, -np.inf)
+    high = np.full(n, np.inf)
+
+    nonbasic = np.ones(sf.M.shape[1], dtype=bool)
+    nonbasic[basis.columns] = False
+    movable = nonbasic & (sf.upper - sf.lower > TOLERANCE)
+
+    # 비기저 변수: 감소비용의 부호가 유지되는 범위
+    at_lower = movable[:n] & ~basis.at_upper[:n]
+    at_upper = movable[:n] & basis.at_upper[:n]
+    low[at_lower] = c_full[:n][at_lower] - d[:n][at_lower]
+    high[at_upper] = c_full[:n][at_upper] - d[:n][at_upper]
+
+    # 기저 변수: 가격 변화 Δ에 대해 d_k - Δ·α_rk 의 부호가 유지되는 범위
+    alpha = np.linalg.solve(sf.M[:, basis.columns], sf.M)
+    lower_side = movable & ~basis.at_upper
+    upper_side = movable & basis.at_upper
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for r, j in enumerate(basis.columns):
+            if j >= n:
+                continue
+            a = alpha[r]
+            ratio = d / a
+            pos = a > TOLERANCE
+            neg = a < -TOLERANCE
+            max_candidates = ratio[(lower_side & pos) | (upper_side & neg)]
+            min_candidates = ratio[(lower_side & neg) | (upper_side & pos)]
+            high[j] = c_full[j] + (max_candidates.min() if max_candidates.size else np.inf)
+            low[j] = c_full[j] + (min_candidates.max() if min_candidates.size else -np.inf)
+
+    return d[:n], low, high
+
+
+class FormulationState:
+    """배합 한 건의 목표값과 최적 기저"""
+
+    def __init__(self, targets, sf, basis, ratios):
+        self.targets = targets
+        self.sf = sf
+        self.basis = basis
+        self.ratios = ratios
+
+
+class PriceReoptimizer:
+    """원료 가격 변경 시 저장된 배합들을 증분 재최적화
+
+    영양소 조성과 제약조건은 그대로이고 가격(목적함수)만 바뀐다고 가정한다.
+    """
+
+    def __init__(self, matrix, solver=None):
+        self.matrix = copy.copy(matrix)  # 가격 벡터만 교체하므로 얕은 복사
+        self.model = FormulationModel(self.matrix, solver=solver)
+        self.prices = matrix.prices.copy()
+        self._states = {}
+
+    def __contains__(self, key):
+        return key in self._states
+
+    def register(self, key, target_energy, target_protein, target_dry_matter):
+        """배합 최초 계산 후 최적 기저 보관"""
+        targets = (target_energy, target_protein, target_dry_matter)
+        lp = self.model.lp(*targets)
+        status, ratios = self.model.solver.solve(lp)
+        if ratios is None:
+            self._states.pop(key, None)
+            return infeasible_result()
+
+        sf = StandardForm(lp)
+        basis = basis_from_point(sf, sf.full_point(ratios))
+        if basis is not None:
+            status, z, basis = primal_simplex(sf, sf.full_cost(self.prices), basis)
+            if status == 'Optimal':
+                ratios = z[:sf.n]
+            else:
+                basis = None
+
+        self._states[key] = FormulationState(targets, sf, basis, ratios)
+        return self._summarize(ratios, targets)
+
+    def sensitivity(self, key):
+        """원료별 감소비용 및 비용 범위"""
+        state = self._states[key]
+        if state.basis is None:
+            return None
+        d, low, high = cost_ranges(state.sf, state.sf.full_cost(self.prices), state.basis)
+        return {
+            name: {
+                'ratio': float(state.ratios[i]),
+                'price': float(self.prices[i]),
+                'reduced_cost': float(d[i]),
+                'cost_range': (float(low[i]), float(high[i]))
+            }
+            for i, name in enumerate(self.matrix.names)
+        }
+
+    def update_prices(self, prices):
+        """새 가격으로 전체 배합 재최적화
+
+        반환값: {key: 결과 딕셔너리} — 결과의 'reoptimization' 항목은
+        'unchanged'(기저가 여전히 최적, 계산 생략), 'warm_start'(기존 기저에서 재개),
+        'cold_start'(처음부터 다시 풀이) 중 하나
+        """
+        self.prices = np.asarray(prices, dtype=np.float64).copy()
+        self.matrix.prices = self.prices
+        results = {}
+
+        # 콜드 스타트가 실패하면 register()가 상태를 지우므로 목록으로 복사해 순회
+        for key, state in list(self._states.items()):
+            c_full = state.sf.full_cost(self.prices)
+            if state.basis is not None and is_optimal(state.sf, c_full, state.basis):
+                action = 'unchanged'
+            else:
+                action = 'warm_start'
+                status, z = 'Not Solved', None
+                if state.basis is not None:
+                    status, z, basis = primal_simplex(state.sf, c_full, state.basis)
+                if status == 'Optimal':
+                    state.basis = basis
+                    state.ratios = z[:state.sf.n]
+                else:
+                    action = 'cold_start'
+                    self.register(key, *state.targets)
+                    state = self._states.get(key)
+                    if state is None:
+                        results[key] = {**infeasible_result(), 'reoptimization': action}
+                        continue
+
+            results[key] = {**self._summarize(state.ratios, state.targets), 'reoptimization': action}
+
+        return results
+
+    def _summarize(self, ratios, targets):
+        return summarize_formulation(self.matrix, ratios, *targets, self.model.tolerance)
+
+
+def build_price_reoptimizer(matrix, formulations, solver=None):
+    """저장된 배합 기록(feed_formulations 데이터프레임)별 최적 기저를 보관하는 재최적화기 생성
+
+    matrix는 기록을 계산할 때(가격 변경 전)의 원료 행렬이고, 목표값이 빠진 기록은 건너뛴다.
+    원료 가격이 바뀌면 reoptimizer.update_prices(새 가격 벡터)로 전체 배합을 갱신한다.
+    """
+    reoptimizer = PriceReoptimizer(matrix, solver)
+    columns = ['target_energy', 'target_protein', 'target_dry_matter']
+    for _, row in formulations.dropna(subset=columns).iterrows():
+        reoptimizer.register(row['id'], *(float(row[column]) for column in columns))
+    return reoptimizer
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 확률 제약 사료 배합 (chance-constrained formulation)
+원료 분석 이력의 영양소 평균/공분산으로 에너지·단백질 최소 기준을
+목표 확률 이상으로 만족하는 최소 비용 배합을 계산한다.
+분석 이력: 배합 앱 SQLite DB의 ingredient_analyses (마이그레이션 8),
+사료 라이브러리 서비스 DB의 feed_analyses (load_feed_analyses)
+"""
+
+import json
+import threading
+
+import numpy as np
+from scipy.stats import norm, multivariate_normal
+
+from cnucnm_formulation_engine import FormulationModel, LinearProgram, summarize_formulation, infeasible_result
+
+# 확률 제약을 적용하는 영양소 (FormulationModel.A_ub의 하한 행 인덱스)
+CHANCE_NUTRIENTS = {'energy_mcal': 0, 'crude_protein': 2}
+
+# 분석 결과(JSON) 키 → 배합 영양소 (앞의 키 우선)
+ANALYSIS_FIELDS = {
+    'energy_mcal': ('energy_mcal', 'net_energy_lactation'),
+    'crude_protein': ('crude_protein',)
+}
+
+# 기본 목표 확률 (두 영양소를 동시에 만족할 확률)
+DEFAULT_PROBABILITY = 0.95
+
+# 절단 평면 반복 설정
+MAX_CUTS = 50
+CUT_TOLERANCE = 1e-4  # 최소 기준 대비 상대 위반 허용치
+
+
+def analysis_values(results):
+    """분석 결과 딕셔너리에서 CHANCE_NUTRIENTS 값 추출 (없으면 None)"""
+    if isinstance(results, str):
+        results = json.loads(results)
+    values = []
+    for nutrient in CHANCE_NUTRIENTS:
+        value = next((results[key] for key in ANALYSIS_FIELDS[nutrient] if results.get(key) is not None), None)
+        if value is None:
+            return None
+        values.append(float(value))
+    return values
+
+
+def load_ingredient_analyses(conn):
+    """ingredient_analyses 조회 (SQLite, 반환값: [(분석 ID, 원료명, 분석 결과)])"""
+    rows = conn.execute('''
+        SELECT a.id, i.ingredient_name, a.energy_mcal, a.crude_protein
+        FROM ingredient_analyses a
+        JOIN feed_ingredients i ON i.id = a.ingredient_id
+        ORDER BY a.id
+    ''').fetchall()
+    return [(analysis_id, name, {'energy_mcal': energy, 'crude_protein': protein})
+            for analysis_id, name, energy, protein in rows]
+
+
+def load_feed_analyses(conn):
+    """feed_analyses 조회 (사료 라이브러리 서비스 DB 연결, 반환값: [(분석 ID, 사료명, 분석 결과)])"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT a.id, f.name, a.analysis_results
+        FROM feed_analyses a
+        JOIN feeds f ON f.id = a.feed_id
+        ORDER BY a.id
+    ''')
+    return cursor.fetchall()
+
+
+class FeedStatistics:
+    """사료 한 종의 분석 통계 (표본 수, 평균 벡터, 공분산 행렬)"""
+
+    def __init__(self, samples):
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, len(CHANCE_NUTRIENTS))
+        self.count = len(samples)
+        self.mean = samples.mean(axis=0)
+        self.cov = np.cov(samples, rowvar=False) if self.count > 1 else np.zeros((len(CHANCE_NUTRIENTS),) * 2)
+
+
+class NutrientStatisticsCache:
+    """사료별 분석 통계 캐시
+
+    refresh()는 사료별 (분석 건수, 마지막 분석 ID)가 바뀐 사료만 다시 계산한다.
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, analyses):
+        """분석 이력 반영 (analyses: [(분석 ID, 사료명, 분석 결과)]), 다시 계산한 사료 수 반환"""
+        grouped = {}
+        for analysis_id, name, results in analyses:
+            grouped.setdefault(name, []).append((analysis_id, results))
+
+        updated = 0
+        with self._lock:
+            for name, rows in grouped.items():
+                signature = (len(rows), max(analysis_id for analysis_id, _ in rows))
+                if self._signatures.get(name) == signature:
+                    continue
+                samples = [values for values in (analysis_values(results) for _, results in rows) if values is not None]
+                if samples:
+                    self._stats[name] = FeedStatistics(samples)
+                else:
+                    self._stats.pop(name, None)
+                self._signatures[name] = signature
+                updated += 1
+        return updated
+
+    def get(self, name):
+        return self._stats.get(name)
+
+    def arrays(self, matrix):
+        """원료 순서에 맞춘 평균(n × k)과 공분산(n × k × k) 배열
+
+        분석 이력이 없는 원료는 원료 라이브러리 값을 평균, 분산 0으로 본다.
+        """
+        columns = [matrix.column_index[nutrient] for nutrient in CHANCE_NUTRIENTS]
+        means = matrix.nutrients[:, columns].copy()
+        covs = np.zeros((len(matrix), len(columns), len(columns)))
+        with self._lock:
+            for i, name in enumerate(matrix.names):
+                stats = self._stats.get(name)
+                if stats is not None:
+                    means[i] = stats.mean
+                    covs[i] = stats.cov
+        return means, covs
+
+
+def nutrient_probabilities(ratios, means, covs, minimums):
+    """배합이 영양소별/동시에 최소 기준을 만족할 확률 (사료 간 변동은 독립으로 가정)"""
+    mean = ratios @ means
+    cov = np.einsum('i,ijk->jk', ratios ** 2, covs)
+    std = np.sqrt(np.maximum(np.diag(cov), 0.0))
+
+    with np.errstate(divide='ignore'):
+        individual = np.where(std > 0, norm.sf((minimums - mean) / np.where(std > 0, std, 1.0)),
+                              (mean >= minimums * (1 - CUT_TOLERANCE)).astype(float))
+    if np.all(std > 0):
+        # P(모든 영양소 >= 최소) = P(-a <= -min)
+        joint = float(multivariate_normal(mean=-mean, cov=cov, allow_singular=True).cdf(-minimums))
+    else:
+        joint = float(np.prod(individual))
+    return {nutrient: float(individual[i]) for i, nutrient in enumerate(CHANCE_NUTRIENTS)}, joint
+
+
+class RobustFormulationModel:
+    """확률 제약 배합 모델
+
+    영양소 k의 최소 기준 b에 대해 P(aₖ·x >= b) >= p 를
+    μₖ·x - z_p·‖Sₖx‖ >= b (Sₖ = 사료별 표준편차 대각행렬)로 바꾸고,
+    ‖Sₖx‖를 접평면 절단으로 선형 근사하며 위반이 없어질 때까지 반복한다.
+    두 영양소를 동시에 만족할 확률이 probability 이상이 되도록 본페로니 분할을 사용한다.
+    """
+
+    def __init__(self, matrix, statistics, probability=DEFAULT_PROBABILITY, solver=None):
+        self.base = FormulationModel(matrix, solver=solver)
+        self.matrix = matrix
+        self.probability = probability
+        self.means, self.covs = statistics.arrays(matrix)
+        self.variances = np.stack([self.covs[:, k, k] for k in range(len(CHANCE_NUTRIENTS))], axis=1)
+
+        per_nutrient = 1 - (1 - probability) / len(CHANCE_NUTRIENTS)
+        self.z = float(norm.ppf(per_nutrient))
+
+    def minimums(self, target_energy, target_protein):
+        low = 1 - self.base.tolerance
+        return np.array([target_energy * low, target_protein * low])
+
+    def optimize(self, target_energy, target_protein, target_dry_matter):
+        """확률 제약 비용 최소화 배합
+
+        MAX_CUTS 번 안에 위반이 없어지지 않으면 status 'not_converged', converged False 로
+        마지막 배합과 확률을 함께 돌려준다.
+        """
+        targets = (target_energy, target_protein, target_dry_matter)
+        minimums = self.minimums(target_energy, target_protein)
+
+        # 하한 행은 평균 영양소로 교체, 상한/기타 제약은 기본 모델 그대로
+        A_ub = self.base.A_ub.copy()
+        for k, row in enumerate(CHANCE_NUTRIENTS.values()):
+            A_ub[row] = -self.means[:, k]
+        b_ub = self.base.rhs(*targets)
+
+        cuts, cut_rhs = [], []
+        for _ in range(MAX_CUTS):
+            lp = LinearProgram(self.matrix.prices, np.vstack([A_ub] + cuts) if cuts else A_ub,
+                               np.concatenate([b_ub, cut_rhs]), self.base.A_eq, self.base.b_eq,
+                               self.base.lower, self.base.upper)
+            status, ratios = self.base.solver.solve(lp)
+            if ratios is None:
+                return infeasible_result()
+
+            violated = False
+            for k in range(len(CHANCE_NUTRIENTS)):
+                spread = np.sqrt(self.variances[:, k] @ ratios ** 2)
+                if spread <= 0 or self.means[:, k] @ ratios - self.z * spread >= minimums[k] * (1 - CUT_TOLERANCE):
+                    continue
+                # ‖Sx‖ >= g·x (g = S²x₀ / ‖Sx₀‖) 이므로 μ·x - z·g·x >= b 는 타당한 절단
+                gradient = self.variances[:, k] * ratios / spread
+                cuts.append(-(self.means[:, k] - self.z * gradient))
+                cut_rhs.append(-minimums[k])
+                violated = True
+            if not violated:
+                converged = True
+                break
+        else:
+            converged = False
+
+        result = summarize_formulation(self.matrix, ratios, *targets, self.base.tolerance)
+        individual, joint = nutrient_probabilities(ratios, self.means, self.covs, minimums)
+        result['expected_nutrients'] = {nutrient: float(ratios @ self.means[:, k])
+                                        for k, nutrient in enumerate(CHANCE_NUTRIENTS)}
+        result['probabilities'] = individual
+        result['joint_probability'] = joint
+        result['cuts'] = len(cuts)
+        result['converged'] = converged
+        if not converged:
+            # 마지막 배합은 목표 확률을 만족하지 못할 수 있으므로 최적 배합으로 돌려주지 않는다
+            result['status'] = 'not_converged'
+            result['message'] = f'절단 평면 {MAX_CUTS}회 안에 확률 제약을 만족하는 배합을 찾지 못했습니다.'
+        return result
+
+
+def optimize_formulation_robust(matrix, statistics, target_energy, target_protein, target_dry_matter,
+                                probability=DEFAULT_PROBABILITY, solver=None):
+    """분석 이력 기반 확률 제약 사료 배합 최적화"""
+    return RobustFormulationModel(matrix, statistics, probability, solver).optimize(
+        target_energy, target_protein, target_dry_matter)
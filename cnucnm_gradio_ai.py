@@ -7,7 +7,6 @@ CNUCNM Gradio AI 모델 인터페이스
 import gradio as gr
 import pandas as pd
 import numpy as np
-import sqlite3
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
@@ -16,49 +15,21 @@ import hashlib
 import pulp
 from scipy.optimize import minimize
 
+from cnucnm_database import connect
+from cnucnm_migrations import migrate
+from cnucnm_growth_simulation import predict_productivity as simulate_productivity, FEED_COST_PER_DAY
+
 # 데이터베이스 초기화
 def init_database():
     """데이터베이스 초기화"""
     db_path = Path("cnucnm_data/cnucnm.db")
     db_path.parent.mkdir(exist_ok=True)
     
-    conn = sqlite3.connect(db_path)
+    conn = connect()
     cursor = conn.cursor()
     
-    # 사료 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feeds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            feed_name TEXT NOT NULL,
-            feed_type TEXT,
-            protein REAL,
-            fat REAL,
-            fiber REAL,
-            ash REAL,
-            calcium REAL,
-            phosphorus REAL,
-            price_per_kg REAL,
-            supplier TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 동물 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS animals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id TEXT UNIQUE NOT NULL,
-            species TEXT NOT NULL,
-            breed TEXT,
-            gender TEXT,
-            birth_date DATE,
-            initial_weight REAL,
-            current_weight REAL,
-            status TEXT DEFAULT 'active',
-            owner_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    # 사료/동물 테이블
+    migrate(conn)
     
     # 샘플 사료 데이터 생성
     if cursor.execute("SELECT COUNT(*) FROM feeds").fetchone()[0] == 0:
@@ -103,7 +74,7 @@ def optimize_feed_formulation(animal_weight, target_protein, target_fat, max_cos
     """사료 배합 최적화 AI 모델 (선형계획법)"""
     
     # 사료 데이터 로드
-    conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+    conn = connect()
     feeds_df = pd.read_sql_query("SELECT * FROM feeds", conn)
     conn.close()
     
@@ -187,7 +158,7 @@ def analyze_nutrition(*feed_ratios):
     """영양 분석 AI 모델"""
     
     # 사료 데이터 로드
-    conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+    conn = connect()
     feeds_df = pd.read_sql_query("SELECT * FROM feeds", conn)
     conn.close()
     
@@ -249,40 +220,22 @@ def analyze_nutrition(*feed_ratios):
 def predict_productivity(animal_weight, feed_quality, management_level, breed_type, age_months):
     """생산성 예측 AI 모델 (머신러닝 기반)"""
     
-    # 기본 성장 모델 (실제로는 더 복잡한 ML 모델 사용)
-    base_growth_rate = 0.8  # kg/day
-    
-    # 요인별 조정 계수
-    weight_factor = 1.0 if animal_weight > 300 else 0.9
-    quality_factor = feed_quality / 100
-    management_factor = management_level / 100
-    breed_factor = 1.2 if breed_type == "한우" else 1.0
-    age_factor = 1.0 if 12 <= age_months <= 24 else 0.8
-    
-    # 예측 성장률
-    predicted_growth = base_growth_rate * weight_factor * quality_factor * management_factor * breed_factor * age_factor
-    
-    # 수익성 계산
-    feed_cost_per_day = 15  # 원/일
-    meat_price_per_kg = 8000  # 원/kg (한우 기준)
-    daily_revenue = predicted_growth * meat_price_per_kg
-    daily_profit = daily_revenue - feed_cost_per_day
-    
-    # 30일 예측
-    days = list(range(1, 31))
-    weights = [animal_weight + predicted_growth * day for day in days]
-    profits = [daily_profit * day for day in days]
+    # 일 단위 성장 시뮬레이션 (365일, 품종/월령은 증체 계수로 반영)
+    projection = simulate_productivity(animal_weight, feed_quality, management_level, breed_type, age_months)
+    days, weights, profits = projection['days'], projection['weights'], projection['profits']
+    predicted_growth = projection['daily_gain'][:30].mean()
+    daily_profit = profits[29] / 30
     
     # Plotly 차트 생성
-    fig_weight = px.line(x=days, y=weights, title="체중 증가 예측 (30일)")
+    fig_weight = px.line(x=days, y=weights, title="체중 증가 예측 (365일)")
     fig_weight.update_layout(xaxis_title="일수", yaxis_title="체중 (kg)")
     
-    fig_profit = px.line(x=days, y=profits, title="누적 수익 예측 (30일)")
+    fig_profit = px.line(x=days, y=profits, title="누적 수익 예측 (365일)")
     fig_profit.update_layout(xaxis_title="일수", yaxis_title="누적 수익 (원)")
     
     # ROI 계산
-    total_investment = feed_cost_per_day * 30
-    total_return = profits[-1]
+    total_investment = FEED_COST_PER_DAY * 30
+    total_return = profits[29]
     roi = (total_return / total_investment * 100) if total_investment > 0 else 0
     
     prediction_result = f"""
@@ -297,9 +250,10 @@ def predict_productivity(animal_weight, feed_quality, management_level, breed_ty
     
     **예측 결과:**
     - 일일 성장률: {predicted_growth:.2f} kg/일
-    - 30일 후 체중: {weights[-1]:.1f} kg
+    - 30일 후 체중: {weights[29]:.1f} kg
+    - 365일 후 체중: {weights[-1]:.1f} kg
     - 일일 수익: {daily_profit:,.0f}원
-    - 30일 누적 수익: {profits[-1]:,.0f}원
+    - 30일 누적 수익: {profits[29]:,.0f}원
     
     **투자 분석:**
     - 총 투자: {total_investment:,.0f}원 (30일 사료비)
@@ -383,7 +337,7 @@ def create_interface():
                         gr.Markdown("**배합 비율 입력 (%):**")
                         
                         # 사료 데이터 로드
-                        conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+                        conn = connect()
                         feeds_df = pd.read_sql_query("SELECT feed_name FROM feeds", conn)
                         conn.close()
                         
@@ -470,7 +424,7 @@ def create_interface():
                 refresh_btn = gr.Button("🔄 데이터 새로고침")
                 
                 def load_data():
-                    conn = sqlite3.connect("cnucnm_data/cnucnm.db")
+                    conn = connect()
                     feeds_df = pd.read_sql_query("""
                         SELECT id, feed_name, feed_type, protein, fat, price_per_kg 
                         FROM feeds LIMIT 10
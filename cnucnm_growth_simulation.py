@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 일 단위 성장 시뮬레이션
+사료의 에너지/단백질 공급량과 영양 요구량(cnucnm_nasem_requirements)을 매일 비교해 증체량을 적분한다.
+체중/사료/관리 조건을 배열로 받아 여러 개체와 시나리오를 한 번에 계산하고 궤적은 float32 배열로 돌려준다.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from cnucnm_nasem_requirements import (calculate_requirements, maintenance_requirements,
+                                       DRY_MATTER_INTAKE_RATIO, GROWTH_PROTEIN)
+
+SIMULATION_DAYS = 365
+
+# 사료 품질 100% 기준 사료 (건물 기준)
+REFERENCE_ENERGY_DENSITY = 2.6     # Mcal ME/kg DM
+REFERENCE_PROTEIN_PERCENT = 14.0   # 조단백질 % DM
+
+# 에너지/단백질 이용 효율
+GAIN_EFFICIENCY = 0.4              # 대사 에너지 → 증체 축적 에너지
+PROTEIN_EFFICIENCY = 0.67          # 조단백질 → 대사 단백질
+MOBILIZED_ENERGY = 5.8             # 에너지 부족 시 체중 1 kg 감소로 충당하는 에너지 (Mcal)
+
+# 축적 에너지 → 공복체 증체량 (NRC 1996 육우: EBG = 13.91 RE^0.9116 EBW^-0.6837)
+EMPTY_BODY_GAIN_COEFFICIENT = 13.91
+RETAINED_ENERGY_EXPONENT = 0.9116
+EMPTY_BODY_WEIGHT_EXPONENT = -0.6837
+EMPTY_BODY_RATIO = 0.891 * 0.96    # 체중 → 공복체중
+EMPTY_GAIN_RATIO = 0.956           # 체중 증가량 → 공복체 증가량
+
+# 성숙 체중에 가까울수록 증체 감소 (1 - (체중/성숙 체중)^지수)
+MATURE_WEIGHT = 800                # kg
+MATURITY_EXPONENT = 3
+
+# 생산성 예측 (사료비 원/일, 육가 원/kg)
+FEED_COST_PER_DAY = 15
+MEAT_PRICE_PER_KG = 8000
+
+GrowthSimulation = namedtuple('GrowthSimulation', ['weights', 'daily_gain', 'dry_matter_intake'])
+
+
+def simulate_growth(initial_weight, energy_mcal_kg=REFERENCE_ENERGY_DENSITY,
+                    protein_percent=REFERENCE_PROTEIN_PERCENT, days=SIMULATION_DAYS,
+                    intake_ratio=DRY_MATTER_INTAKE_RATIO, gain_factor=1.0, mature_weight=MATURE_WEIGHT,
+                    production_stage='유지', milk_yield=0.0, pregnancy_stage=0, breed_factor=1.0):
+    """일 단위 성장 시뮬레이션
+
+    인자는 스칼라 또는 서로 브로드캐스트되는 배열 (예: 개체 (n, 1) × 시나리오 (1, m)).
+    반환값 GrowthSimulation 의 배열은 float32 이고 첫 축이 일수다.
+    weights 는 (days + 1, ...) 로 0일(시작 체중)부터, daily_gain / dry_matter_intake 는 (days, ...).
+    """
+    weight = np.asarray(initial_weight, dtype=np.float64)
+    energy = np.asarray(energy_mcal_kg, dtype=np.float64) * 1000          # kcal/kg DM
+    protein = np.asarray(protein_percent, dtype=np.float64) * 10 * PROTEIN_EFFICIENCY  # 대사 단백질 g/kg DM
+    intake_ratio = np.asarray(intake_ratio, dtype=np.float64)
+    gain_factor = np.asarray(gain_factor, dtype=np.float64)
+    mature_weight = np.asarray(mature_weight, dtype=np.float64)
+
+    # 비유/임신 요구량은 체중과 무관하므로 한 번만 계산 (성장 단계의 증체 요구량은 시뮬레이션이 대신한다)
+    stage = np.asarray(production_stage, dtype=object)
+    production = calculate_requirements(weight, None, stage, milk_yield, pregnancy_stage, breed_factor)
+    growing = stage == '성장'
+    production_energy = np.where(growing, 0.0, production['production_energy_kcal'])
+    production_protein = np.where(growing, 0.0, production['production_protein_g'])
+
+    shape = np.broadcast_shapes(weight.shape, energy.shape, protein.shape, intake_ratio.shape, gain_factor.shape,
+                                mature_weight.shape, production_energy.shape)
+    weight = np.broadcast_to(weight, shape).copy()
+    weights = np.empty((days + 1,) + shape, dtype=np.float32)
+    daily_gain = np.empty((days,) + shape, dtype=np.float32)
+    dry_matter_intake = np.empty((days,) + shape, dtype=np.float32)
+    weights[0] = weight
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for day in range(days):
+            maintenance_energy, maintenance_protein = maintenance_requirements(weight, breed_factor)
+            intake = weight * intake_ratio
+            energy_balance = intake * energy - maintenance_energy - production_energy
+            protein_balance = intake * protein - maintenance_protein - production_protein
+
+            # 에너지 허용 증체량 (축적 에너지 Mcal → 증체 kg)
+            retained_energy = np.maximum(energy_balance, 0.0) * (GAIN_EFFICIENCY / 1000)
+            energy_gain = (EMPTY_BODY_GAIN_COEFFICIENT * retained_energy ** RETAINED_ENERGY_EXPONENT
+                           * (weight * EMPTY_BODY_RATIO) ** EMPTY_BODY_WEIGHT_EXPONENT / EMPTY_GAIN_RATIO)
+            # 단백질 허용 증체량
+            protein_gain = np.maximum(protein_balance, 0.0) / GROWTH_PROTEIN
+            maturity = np.maximum(1 - (weight / mature_weight) ** MATURITY_EXPONENT, 0.0)
+            gain = np.where(energy_balance >= 0,
+                            np.minimum(energy_gain, protein_gain) * maturity * gain_factor,
+                            energy_balance / (MOBILIZED_ENERGY * 1000))
+
+            weight += gain
+            weights[day + 1] = weight
+            daily_gain[day] = gain
+            dry_matter_intake[day] = intake
+
+    return GrowthSimulation(weights, daily_gain, dry_matter_intake)
+
+
+def predict_productivity(animal_weight, feed_quality, management_level, breed_type=None, age_months=None,
+                         days=SIMULATION_DAYS):
+    """생산성 예측 (성장 시뮬레이션 기반)
+
+    사료 품질(%)은 기준 사료의 에너지/단백질 농도, 관리 수준(%)은 건물 섭취량에 반영한다.
+    한우와 12-24개월령 조정은 증체 계수로 적용한다.
+    반환값: {'days', 'weights', 'daily_gain', 'profits', 'average_daily_gain'} (일수 1..days)
+    """
+    quality = feed_quality / 100
+    breed_factor = 1.2 if breed_type == "한우" else 1.0
+    age_factor = 0.8 if age_months is not None and not 12 <= age_months <= 24 else 1.0
+    simulation = simulate_growth(
+        animal_weight,
+        energy_mcal_kg=REFERENCE_ENERGY_DENSITY * quality,
+        protein_percent=REFERENCE_PROTEIN_PERCENT * quality,
+        days=days,
+        intake_ratio=DRY_MATTER_INTAKE_RATIO * management_level / 100,
+        gain_factor=breed_factor * age_factor
+    )
+    daily_gain = simulation.daily_gain.astype(np.float64)
+    profits = np.cumsum(daily_gain * MEAT_PRICE_PER_KG - FEED_COST_PER_DAY)
+    return {
+        'days': np.arange(1, days + 1),
+        'weights': simulation.weights[1:].astype(np.float64),
+        'daily_gain': daily_gain,
+        'profits': profits,
+        'average_daily_gain': float(daily_gain.mean())
+    }
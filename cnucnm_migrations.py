@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 데이터베이스 스키마 마이그레이션
+모듈마다 흩어져 있던 CREATE TABLE 을 버전별 마이그레이션으로 모으고, 적용한 버전을 schema_migrations 에 기록한다.
+각 모듈의 초기화 함수는 migrate() 를 호출해 아직 적용하지 않은 버전만 순서대로 적용한다.
+
+실행: python cnucnm_migrations.py [--db cnucnm_data/cnucnm.db] [--target 5]
+"""
+
+import argparse
+from collections import namedtuple
+
+from cnucnm_database import DB_PATH, connect
+from cnucnm_rollups import create_rollups
+
+SCHEMA_TABLE = 'schema_migrations'
+
+# apply: SQL 문 목록 또는 함수(conn)
+Migration = namedtuple('Migration', ['version', 'name', 'apply'])
+
+INITIAL_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        username TEXT UNIQUE NOT NULL,
+        hashed_password TEXT NOT NULL,
+        first_name TEXT,
+        last_name TEXT,
+        phone TEXT,
+        role TEXT DEFAULT 'farmer',
+        status TEXT DEFAULT 'active',
+        farm_name TEXT,
+        farm_address TEXT,
+        farm_size INTEGER,
+        farm_type TEXT,
+        is_email_verified BOOLEAN DEFAULT 0,
+        is_phone_verified BOOLEAN DEFAULT 0,
+        is_active BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login_at TIMESTAMP,
+        profile_image_url TEXT,
+        language TEXT DEFAULT 'ko',
+        timezone TEXT DEFAULT 'Asia/Seoul',
+        notification_email BOOLEAN DEFAULT 1,
+        notification_sms BOOLEAN DEFAULT 0,
+        notification_push BOOLEAN DEFAULT 1
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS animals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        animal_id TEXT UNIQUE NOT NULL,
+        name TEXT,
+        species TEXT NOT NULL,
+        breed TEXT,
+        gender TEXT,
+        birth_date DATE,
+        initial_weight REAL,
+        current_weight REAL,
+        status TEXT DEFAULT 'active',
+        owner_id INTEGER,
+        farm_location TEXT,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (owner_id) REFERENCES users (id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS feeds (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feed_name TEXT NOT NULL,
+        feed_type TEXT,
+        protein REAL,
+        fat REAL,
+        fiber REAL,
+        ash REAL,
+        calcium REAL,
+        phosphorus REAL,
+        price_per_kg REAL,
+        supplier TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS weight_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        animal_id INTEGER,
+        weight REAL NOT NULL,
+        measurement_date DATE NOT NULL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (animal_id) REFERENCES animals (id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS health_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        animal_id TEXT NOT NULL,
+        check_date DATE NOT NULL,
+        temperature REAL,
+        heart_rate INTEGER,
+        respiratory_rate INTEGER,
+        appetite_score INTEGER,
+        activity_score INTEGER,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS feed_formulations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        formulation_name TEXT,
+        animal_id INTEGER,
+        animal_name TEXT,
+        target_energy REAL,
+        target_protein REAL,
+        target_dry_matter REAL,
+        total_cost REAL,
+        formulation_date TIMESTAMP,
+        formulation_data TEXT,
+        FOREIGN KEY (animal_id) REFERENCES animals (id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS feed_ingredients (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ingredient_name TEXT,
+        category TEXT,
+        dry_matter REAL,
+        crude_protein REAL,
+        energy_mcal REAL,
+        ndf REAL,
+        adf REAL,
+        ca REAL,
+        p REAL,
+        price_per_kg REAL,
+        max_inclusion REAL,
+        min_inclusion REAL,
+        description TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS nutrition_requirements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        animal_id INTEGER,
+        animal_name TEXT,
+        breed TEXT,
+        weight REAL,
+        age_months INTEGER,
+        production_stage TEXT,
+        milk_yield REAL,
+        pregnancy_stage INTEGER,
+        calculation_date TIMESTAMP,
+        requirements_data TEXT,
+        FOREIGN KEY (animal_id) REFERENCES animals (id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS nasem_standards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nutrient_name TEXT,
+        unit TEXT,
+        category TEXT,
+        min_value REAL,
+        max_value REAL,
+        recommended_value REAL,
+        description TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS requirements_watermarks (
+        source_table TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS growth_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        animal_id TEXT NOT NULL,
+        measurement_date DATE NOT NULL,
+        weight REAL NOT NULL,
+        daily_gain REAL,
+        feed_intake REAL,
+        feed_cost REAL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cost_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        record_date DATE NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        amount REAL NOT NULL,
+        animal_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS revenue_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        record_date DATE NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        amount REAL NOT NULL,
+        animal_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS notification_settings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER DEFAULT 1,
+        alert_type TEXT NOT NULL,
+        enabled BOOLEAN DEFAULT 1,
+        threshold_value REAL,
+        frequency TEXT DEFAULT 'daily',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS notification_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        alert_type TEXT NOT NULL,
+        animal_id TEXT,
+        message TEXT NOT NULL,
+        severity TEXT DEFAULT 'info',
+        is_read BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS feed_inventory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feed_name TEXT NOT NULL,
+        current_stock REAL NOT NULL,
+        min_stock_level REAL NOT NULL,
+        unit TEXT DEFAULT 'kg',
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+]
+
+# 모듈마다 정의가 달라 기존 DB 에 빠져 있을 수 있는 열 (ALTER TABLE 은 상수 기본값만 허용)
+MISSING_COLUMNS = {
+    'users': [('phone', 'TEXT'), ('status', "TEXT DEFAULT 'active'"), ('farm_name', 'TEXT'),
+              ('farm_address', 'TEXT'), ('farm_size', 'INTEGER'), ('farm_type', 'TEXT'),
+              ('is_email_verified', 'BOOLEAN DEFAULT 0'), ('is_phone_verified', 'BOOLEAN DEFAULT 0'),
+              ('is_active', 'BOOLEAN DEFAULT 1'), ('updated_at', 'TIMESTAMP'), ('last_login_at', 'TIMESTAMP'),
+              ('profile_image_url', 'TEXT'), ('language', "TEXT DEFAULT 'ko'"),
+              ('timezone', "TEXT DEFAULT 'Asia/Seoul'"), ('notification_email', 'BOOLEAN DEFAULT 1'),
+              ('notification_sms', 'BOOLEAN DEFAULT 0'), ('notification_push', 'BOOLEAN DEFAULT 1')],
+    'animals': [('name', 'TEXT'), ('farm_location', 'TEXT'), ('notes', 'TEXT'), ('updated_at', 'TIMESTAMP')],
+    # 동물 관리 화면의 이전 정의로 만들어진 health_records
+    'health_records': [('check_date', 'DATE'), ('temperature', 'REAL'), ('heart_rate', 'INTEGER'),
+                       ('respiratory_rate', 'INTEGER'), ('appetite_score', 'INTEGER'), ('activity_score', 'INTEGER')],
+}
+
+
+def add_missing_columns(conn):
+    for table, columns in MISSING_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for column, definition in columns:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+# 자주 쓰는 조회용 인덱스 (조회 열까지 포함해 테이블을 읽지 않도록)
+HOT_QUERY_INDEXES = [
+    # 증분 재계산 파이프라인이 만들던 인덱스를 체중까지 포함한 인덱스로 교체
+    'DROP INDEX IF EXISTS idx_weight_records_animal_date',
+    'DROP INDEX IF EXISTS idx_growth_records_animal_date',
+    # 개체별 체중 이력 (WHERE animal_id = ? ORDER BY measurement_date), 개체별 최근 측정
+    'CREATE INDEX IF NOT EXISTS idx_weight_records_animal_date ON weight_records (animal_id, measurement_date, weight)',
+    'CREATE INDEX IF NOT EXISTS idx_growth_records_animal_date ON growth_records (animal_id, measurement_date, weight)',
+    # 월간 성과 (측정일 범위 + 개체별 평균 증체량/사료비)
+    '''CREATE INDEX IF NOT EXISTS idx_growth_records_date
+       ON growth_records (measurement_date, animal_id, daily_gain, feed_cost)''',
+    'CREATE INDEX IF NOT EXISTS idx_cost_records_date ON cost_records (record_date, category, amount)',
+    'CREATE INDEX IF NOT EXISTS idx_revenue_records_date ON revenue_records (record_date, category, amount)',
+    # 최근 건강 기록 (check_date >= date('now', '-7 days'))
+    'CREATE INDEX IF NOT EXISTS idx_health_records_date ON health_records (check_date)',
+    'CREATE INDEX IF NOT EXISTS idx_health_records_animal_date ON health_records (animal_id, check_date)',
+    # 최근 기록 목록 (ORDER BY ... DESC LIMIT)
+    'CREATE INDEX IF NOT EXISTS idx_notification_logs_created ON notification_logs (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_feed_formulations_date ON feed_formulations (formulation_date)',
+    'CREATE INDEX IF NOT EXISTS idx_nutrition_requirements_date ON nutrition_requirements (calculation_date)',
+    # 요구량 upsert 키 (개체, 계산일): 기존 중복 행은 upsert 와 같게 마지막으로 넣은 행만 남긴다
+    '''DELETE FROM nutrition_requirements
+       WHERE animal_id IS NOT NULL AND calculation_date IS NOT NULL
+         AND id NOT IN (SELECT MAX(id) FROM nutrition_requirements GROUP BY animal_id, calculation_date)''',
+    '''CREATE UNIQUE INDEX IF NOT EXISTS idx_nutrition_requirements_animal_date
+       ON nutrition_requirements (animal_id, calculation_date)''',
+    'CREATE INDEX IF NOT EXISTS idx_animals_status ON animals (status)',
+    # ANALYZE 는 하지 않는다: 통계가 있으면 월간 조회에 (animal_id, measurement_date) 건너뛰기 검색을 골라
+    # 날짜 포함 인덱스 범위 검색보다 느려진다 (benchmarks/bench_schema_migrations.py)
+]
+
+# 기본 데이터(seed) 적용 기록 (cnucnm_bootstrap)
+SEED_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS seed_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+]
+
+# 변경 시 버전이 증가하는 원료 테이블 (결과 캐시 무효화용, cnucnm_feeds_optimizer.current_table_version)
+VERSIONED_TABLES = ('feeds', 'feed_ingredients')
+
+
+def create_table_versions(conn):
+    """table_versions 와 INSERT/UPDATE/DELETE 마다 버전을 올리는 트리거"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in VERSIONED_TABLES:
+        conn.execute('INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)', (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+
+# 측정 기록 테이블: 추가는 id 로 이어 받으므로 수정/삭제만 센다 (cnucnm_timeseries 저장소 재생성 판단용)
+EDIT_VERSIONED_TABLES = ('growth_records', 'weight_records')
+
+
+def create_record_versions(conn):
+    """측정 기록 테이블의 UPDATE/DELETE 마다 table_versions 버전을 올리는 트리거"""
+    for table in EDIT_VERSIONED_TABLES:
+        conn.execute('INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)', (table,))
+        for event in ('UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+
+# 원료별 성분 분석 이력 (cnucnm_formulation_robust 확률 제약 배합의 평균/분산)
+INGREDIENT_ANALYSES = [
+    '''
+    CREATE TABLE IF NOT EXISTS ingredient_analyses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ingredient_id INTEGER NOT NULL,
+        analysis_date DATE,
+        energy_mcal REAL,
+        crude_protein REAL,
+        laboratory TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (ingredient_id) REFERENCES feed_ingredients (id)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_ingredient_analyses_ingredient ON ingredient_analyses (ingredient_id, id)',
+]
+
+
+MIGRATIONS = [
+    Migration(1, '기본 테이블', INITIAL_TABLES),
+    Migration(2, '누락 열 추가', add_missing_columns),
+    Migration(3, '조회 인덱스', HOT_QUERY_INDEXES),
+    Migration(4, '기본 데이터 기록', SEED_TABLES),
+    Migration(5, '월간 성과 집계', create_rollups),
+    Migration(6, '원료 테이블 버전', create_table_versions),
+    Migration(7, '측정 기록 수정 버전', create_record_versions),
+    Migration(8, '원료 성분 분석 이력', INGREDIENT_ANALYSES),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _ensure_schema_table(conn):
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+
+def current_version(conn):
+    """적용한 마지막 마이그레이션 버전 (없으면 0)"""
+    _ensure_schema_table(conn)
+    return conn.execute(f'SELECT COALESCE(MAX(version), 0) FROM {SCHEMA_TABLE}').fetchone()[0]
+
+
+def migrate(conn=None, db_path=DB_PATH, target=None):
+    """아직 적용하지 않은 마이그레이션을 버전 순서로 적용 (버전마다 한 트랜잭션)
+
+    conn 에 진행 중인 트랜잭션이 있으면 RuntimeError (호출한 쪽의 변경을 대신 커밋하지 않는다)
+    반환값: 이번에 적용한 버전 목록
+    """
+    if conn is not None and conn.in_transaction:
+        raise RuntimeError('migrate() 는 진행 중인 트랜잭션이 없는 연결이 필요합니다 (commit/rollback 후 호출)')
+    own_connection = conn is None
+    if own_connection:
+        conn = connect(db_path)
+    try:
+        if current_version(conn) >= (target or LATEST_VERSION):
+            return []
+        applied = []
+        for migration in MIGRATIONS:
+            if target is not None and migration.version > target:
+                break
+            # 다른 프로세스가 먼저 적용했을 수 있으므로 쓰기 잠금을 잡은 뒤 다시 확인
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                done = conn.execute(f'SELECT 1 FROM {SCHEMA_TABLE} WHERE version = ?',
+                                    (migration.version,)).fetchone()
+                if not done:
+                    if callable(migration.apply):
+                        migration.apply(conn)
+                    else:
+                        for statement in migration.apply:
+                            conn.execute(statement)
+                    conn.execute(f'INSERT INTO {SCHEMA_TABLE} (version, name) VALUES (?, ?)',
+                                 (migration.version, migration.name))
+                    applied.append(migration.version)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return applied
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='데이터베이스 스키마 마이그레이션')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--target', type=int, help='적용할 마지막 버전 (기본: 최신)')
+    args = parser.parse_args()
+
+    applied = migrate(db_path=args.db, target=args.target)
+    conn = connect(args.db)
+    version = current_version(conn)
+    conn.close()
+    names = {migration.version: migration.name for migration in MIGRATIONS}
+    if applied:
+        print('적용: ' + ', '.join(f'{v} ({names[v]})' for v in applied))
+    print(f'현재 스키마 버전: {version}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 영양 요구량 계산 (NASEM 2021 기준)
+체중/월령/생산 단계/착유량/임신 단계 배열을 받아 우군 전체의 유지/생산/총 요구량과
+영양소 농도를 한 번의 numpy 연산으로 계산한다. 한 마리 계산도 같은 구현을 사용한다.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRODUCTION_STAGES = ('유지', '유우', '임신', '성장')
+
+# 유지 요구량
+BASAL_METABOLIC_COEFFICIENT = 70      # kcal/kg^0.75
+ACTIVITY_RATIO = 0.15                 # 기초 대사율 대비 활동 요구량
+MAINTENANCE_PROTEIN_COEFFICIENT = 3.8  # g/kg^0.75
+MAINTENANCE_DRY_MATTER_RATIO = 0.02   # 체중 대비
+
+# 생산 요구량
+MILK_ENERGY = 750                     # kcal/kg milk
+MILK_PROTEIN = 85                     # g/kg milk
+PREGNANCY_ENERGY = 5000               # kcal/day
+PREGNANCY_PROTEIN = 200               # g/day
+PREGNANCY_FACTORS = {1: 0.1, 2: 0.2, 3: 0.4}  # 1-3개월, 4-6개월, 7-9개월
+DEFAULT_PREGNANCY_FACTOR = 0.1
+GROWTH_ENERGY = 3000                  # kcal/kg 체중 증가
+GROWTH_PROTEIN = 150                  # g/kg 체중 증가
+
+# 건물 섭취량 (체중 대비)
+DRY_MATTER_INTAKE_RATIO = 0.025
+
+# 결과 열 (중첩 결과의 (구분, 항목))
+REQUIREMENT_FIELDS = {
+    'maintenance_energy_kcal': ('maintenance', 'energy_kcal'),
+    'maintenance_protein_g': ('maintenance', 'protein_g'),
+    'maintenance_dry_matter_kg': ('maintenance', 'dry_matter_kg'),
+    'production_energy_kcal': ('production', 'energy_kcal'),
+    'production_protein_g': ('production', 'protein_g'),
+    'total_energy_kcal': ('total', 'energy_kcal'),
+    'total_energy_mcal': ('total', 'energy_mcal'),
+    'total_protein_g': ('total', 'protein_g'),
+    'total_protein_percent': ('total', 'protein_percent'),
+    'total_dry_matter_kg': ('total', 'dry_matter_kg'),
+    'energy_mcal_kg': ('concentrations', 'energy_mcal_kg'),
+    'protein_percent': ('concentrations', 'protein_percent'),
+}
+
+
+def maintenance_requirements(weight, breed_factor=1.0):
+    """유지 에너지(kcal/일)와 단백질(g/일) 요구량 (weight 는 float64 배열 또는 스칼라)"""
+    metabolic_weight = weight ** 0.75
+    basal_metabolic_rate = BASAL_METABOLIC_COEFFICIENT * metabolic_weight
+    return (basal_metabolic_rate * (1 + ACTIVITY_RATIO) * breed_factor,
+            MAINTENANCE_PROTEIN_COEFFICIENT * metabolic_weight)
+
+
+def calculate_requirements(weight, age_months=None, production_stage='유지', milk_yield=0.0, pregnancy_stage=0,
+                           breed_factor=1.0):
+    """우군 영양 요구량 (인자는 두수 길이 배열 또는 스칼라, 반환값: {열 이름: float64 배열})
+
+    월령은 현재 식에 쓰이지 않지만 입력 형식을 맞추기 위해 받는다.
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    stage = np.asarray(production_stage, dtype=object)
+    milk_yield = np.asarray(milk_yield, dtype=np.float64)
+    pregnancy_stage = np.asarray(pregnancy_stage)
+    shape = np.broadcast_shapes(weight.shape, stage.shape, milk_yield.shape, pregnancy_stage.shape)
+
+    # 유지 요구량
+    maintenance_energy, maintenance_protein = maintenance_requirements(weight, breed_factor)
+
+    # 생산 요구량 (단계별 선택)
+    lactating, pregnant, growing = stage == '유우', stage == '임신', stage == '성장'
+    pregnancy_factor = np.full(pregnancy_stage.shape, DEFAULT_PREGNANCY_FACTOR)
+    for months, factor in PREGNANCY_FACTORS.items():
+        pregnancy_factor = np.where(pregnancy_stage == months, factor, pregnancy_factor)
+    production_energy = np.select(
+        [lactating, pregnant, growing],
+        [milk_yield * MILK_ENERGY, PREGNANCY_ENERGY * pregnancy_factor, np.float64(GROWTH_ENERGY)], 0.0)
+    production_protein = np.select(
+        [lactating, pregnant, growing],
+        [milk_yield * MILK_PROTEIN, PREGNANCY_PROTEIN * pregnancy_factor, np.float64(GROWTH_PROTEIN)], 0.0)
+
+    # 총 요구량과 농도
+    total_energy = maintenance_energy + production_energy
+    total_protein = maintenance_protein + production_protein
+    dry_matter_intake = weight * DRY_MATTER_INTAKE_RATIO
+    with np.errstate(divide='ignore', invalid='ignore'):
+        energy_concentration = total_energy / (dry_matter_intake * 1000)  # Mcal/kg DM
+        protein_concentration = (total_protein / 1000) / dry_matter_intake * 100  # % DM
+
+    columns = {
+        'maintenance_energy_kcal': maintenance_energy,
+        'maintenance_protein_g': maintenance_protein,
+        'maintenance_dry_matter_kg': weight * MAINTENANCE_DRY_MATTER_RATIO,
+        'production_energy_kcal': production_energy,
+        'production_protein_g': production_protein,
+        'total_energy_kcal': total_energy,
+        'total_energy_mcal': total_energy / 1000,
+        'total_protein_g': total_protein,
+        'total_protein_percent': protein_concentration,
+        'total_dry_matter_kg': dry_matter_intake,
+        'energy_mcal_kg': energy_concentration,
+        'protein_percent': protein_concentration,
+    }
+    return {name: np.broadcast_to(np.asarray(values, dtype=np.float64), shape) for name, values in columns.items()}
+
+
+def calculate_herd_requirements(herd):
+    """DataFrame(weight, age_months, production_stage, milk_yield, pregnancy_stage 열) → 요구량 DataFrame
+
+    착유량/임신 단계 열이 없거나 비어 있으면 0으로 본다.
+    """
+    def column(name, default):
+        if name not in herd:
+            return default
+        return herd[name].fillna(default).to_numpy()
+
+    columns = calculate_requirements(
+        herd['weight'].to_numpy(dtype=np.float64),
+        column('age_months', 0),
+        column('production_stage', '유지'),
+        column('milk_yield', 0.0),
+        column('pregnancy_stage', 0)
+    )
+    return pd.DataFrame(columns, index=herd.index)
+
+
+def requirements_record(columns, index=None):
+    """열 결과에서 한 마리분 중첩 딕셔너리 (maintenance/production/total/concentrations, Python float)"""
+    record = {}
+    for name, (group, field) in REQUIREMENT_FIELDS.items():
+        values = columns[name]
+        record.setdefault(group, {})[field] = float(values if index is None else values[index])
+    return record
+
+
+def calculate_total_requirements(weight, age_months, production_stage, milk_yield=0, pregnancy_stage=0):
+    """한 마리 총 영양 요구량 (우군 계산과 같은 구현, 중첩 딕셔너리 반환)"""
+    return requirements_record(calculate_requirements(weight, age_months, production_stage,
+                                                      milk_yield or 0, pregnancy_stage or 0))
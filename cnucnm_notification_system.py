@@ -7,13 +7,15 @@ CNUCNM 알림 시스템
 import streamlit as st
 import pandas as pd
 import numpy as np
-import sqlite3
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import json
 
+from cnucnm_database import connect
+from cnucnm_bootstrap import Seed, bootstrap
+
 # 페이지 설정
 st.set_page_config(
     page_title="CNUCNM 알림 시스템",
@@ -81,66 +83,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def init_database():
-    """데이터베이스 초기화"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+def seed_notification_settings(conn):
+    """기본 알림 설정 (설정이 없을 때만)"""
     cursor = conn.cursor()
-    
-    # 알림 설정 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS notification_settings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER DEFAULT 1,
-            alert_type TEXT NOT NULL,
-            enabled BOOLEAN DEFAULT 1,
-            threshold_value REAL,
-            frequency TEXT DEFAULT 'daily',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 알림 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS notification_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            alert_type TEXT NOT NULL,
-            animal_id TEXT,
-            message TEXT NOT NULL,
-            severity TEXT DEFAULT 'info',
-            is_read BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 사료 재고 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feed_inventory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            feed_name TEXT NOT NULL,
-            current_stock REAL NOT NULL,
-            min_stock_level REAL NOT NULL,
-            unit TEXT DEFAULT 'kg',
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 건강 상태 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS health_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id TEXT NOT NULL,
-            check_date DATE NOT NULL,
-            temperature REAL,
-            heart_rate INTEGER,
-            respiratory_rate INTEGER,
-            appetite_score INTEGER,
-            activity_score INTEGER,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 샘플 데이터 생성
     if cursor.execute("SELECT COUNT(*) FROM notification_settings").fetchone()[0] == 0:
         sample_settings = [
             ('weight_measurement', 1, 7, 'weekly'),
@@ -155,7 +100,10 @@ def init_database():
                 INSERT INTO notification_settings (alert_type, enabled, threshold_value, frequency)
                 VALUES (?, ?, ?, ?)
             """, setting)
-    
+
+def seed_feed_inventory(conn):
+    """사료 재고 샘플 데이터 (재고가 없을 때만)"""
+    cursor = conn.cursor()
     if cursor.execute("SELECT COUNT(*) FROM feed_inventory").fetchone()[0] == 0:
         sample_inventory = [
             ('옥수수', 500, 200),
@@ -172,7 +120,10 @@ def init_database():
                 INSERT INTO feed_inventory (feed_name, current_stock, min_stock_level)
                 VALUES (?, ?, ?)
             """, inventory)
-    
+
+def seed_sample_health(conn):
+    """건강 기록 샘플 데이터 (기록이 없을 때만)"""
+    cursor = conn.cursor()
     if cursor.execute("SELECT COUNT(*) FROM health_records").fetchone()[0] == 0:
         sample_health = [
             ('ANM001', '2024-01-01', 38.5, 72, 20, 4, 4, '정상'),
@@ -189,13 +140,21 @@ def init_database():
                                           respiratory_rate, appetite_score, activity_score, notes)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, health)
-    
-    conn.commit()
-    conn.close()
+
+SEEDS = [
+    Seed('notification_settings', 1, seed_notification_settings),
+    Seed('feed_inventory', 1, seed_feed_inventory),
+    Seed('sample_health', 1, seed_sample_health),
+]
+
+@st.cache_resource
+def init_database():
+    """데이터베이스 초기화 (프로세스당 한 번: 마이그레이션과 기본 데이터 적용)"""
+    return bootstrap(SEEDS)
 
 def check_weight_measurement_alerts():
     """체중 측정 알림 확인"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     
     # 최근 체중 측정 기록 확인
     weight_records = pd.read_sql_query("""
@@ -243,7 +202,7 @@ def check_weight_measurement_alerts():
 
 def check_feed_inventory_alerts():
     """사료 재고 알림 확인"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     
     inventory_df = pd.read_sql_query("""
         SELECT feed_name, current_stock, min_stock_level, unit
@@ -277,7 +236,7 @@ def check_feed_inventory_alerts():
 
 def check_health_alerts():
     """건강 상태 알림 확인"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     
     # 최근 건강 기록 조회
     health_df = pd.read_sql_query("""
@@ -328,7 +287,7 @@ def check_health_alerts():
 
 def save_notification_log(alert_type, animal_id, message, severity):
     """알림 로그 저장"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -341,14 +300,14 @@ def save_notification_log(alert_type, animal_id, message, severity):
 
 def get_notification_settings():
     """알림 설정 조회"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     settings_df = pd.read_sql_query("SELECT * FROM notification_settings", conn)
     conn.close()
     return settings_df
 
 def update_notification_settings(alert_type, enabled, threshold_value, frequency):
     """알림 설정 업데이트"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -362,7 +321,7 @@ def update_notification_settings(alert_type, enabled, threshold_value, frequency
 
 def get_notification_history(limit=50):
     """알림 히스토리 조회"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     history_df = pd.read_sql_query("""
         SELECT * FROM notification_logs 
         ORDER BY created_at DESC 
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 전체 영양소 프로필 기반 최소 비용 배합
+사료 라이브러리(feed-library-service Feed 모델)의 임의 영양소 컬럼에 대해
+최소/최대/비율 제약 명세를 받아 선형계획으로 푼다.
+사료/가격 조회와 버전 확인은 모두 사료 라이브러리 서비스 DB(PostgreSQL) 연결을 사용한다.
+"""
+
+import threading
+
+import numpy as np
+
+from cnucnm_formulation_engine import LinearProgram, solve_lp, MIN_REPORTED_RATIO
+
+# Feed 모델의 영양소 컬럼 (services/feed-library-service/app/models/feed.py)
+FEED_NUTRIENT_COLUMNS = [
+    # 기본 성분
+    'dry_matter', 'crude_protein', 'crude_fat', 'crude_fiber', 'ash', 'nitrogen_free_extract',
+    # 에너지
+    'total_digestible_nutrients', 'net_energy_lactation', 'net_energy_maintenance', 'net_energy_gain',
+    'metabolizable_energy', 'gross_energy',
+    # 아미노산
+    'lysine', 'methionine', 'threonine', 'tryptophan', 'arginine', 'histidine', 'isoleucine',
+    'leucine', 'valine', 'phenylalanine',
+    # 무기질
+    'calcium', 'phosphorus', 'magnesium', 'potassium', 'sodium', 'chlorine', 'sulfur',
+    'iron', 'zinc', 'copper', 'manganese', 'selenium', 'cobalt', 'iodine',
+    # 비타민
+    'vitamin_a', 'vitamin_d', 'vitamin_e', 'vitamin_k', 'thiamine', 'riboflavin', 'niacin',
+    'pantothenic_acid', 'pyridoxine', 'biotin', 'folic_acid', 'vitamin_b12', 'choline',
+    # 기타
+    'starch', 'sugar', 'ndf', 'adf', 'lignin', 'ether_extract'
+]
+
+
+class NutrientConstraint:
+    """영양소 함량 제약 (minimum <= Σ 함량·비율 <= maximum)"""
+
+    def __init__(self, nutrient, minimum=None, maximum=None):
+        self.nutrient = nutrient
+        self.minimum = minimum
+        self.maximum = maximum
+
+
+class RatioConstraint:
+    """영양소 비율 제약 (minimum <= 분자 영양소 / 분모 영양소 <= maximum, 예: Ca:P)"""
+
+    def __init__(self, numerator, denominator, minimum=None, maximum=None):
+        self.numerator = numerator
+        self.denominator = denominator
+        self.minimum = minimum
+        self.maximum = maximum
+
+
+def parse_constraints(specs):
+    """딕셔너리 명세 목록을 제약 객체로 변환
+
+    {'nutrient': 'lysine', 'min': 0.6}, {'nutrient': 'ndf', 'min': 25, 'max': 35},
+    {'ratio': ['calcium', 'phosphorus'], 'min': 1.5, 'max': 2.5}
+    """
+    constraints = []
+    for spec in specs:
+        if isinstance(spec, (NutrientConstraint, RatioConstraint)):
+            constraints.append(spec)
+        elif 'ratio' in spec:
+            numerator, denominator = spec['ratio']
+            constraints.append(RatioConstraint(numerator, denominator, spec.get('min'), spec.get('max')))
+        else:
+            constraints.append(NutrientConstraint(spec['nutrient'], spec.get('min'), spec.get('max')))
+    return constraints
+
+
+class NutrientLibrary:
+    """사료 라이브러리 영양소 행렬
+
+    by_nutrient: 영양소 × 사료 float64 C-연속 배열 (영양소별 행이 연속이라 제약 행을 바로 잘라 쓴다)
+    값이 없는(NULL) 영양소는 0으로 본다.
+    """
+
+    def __init__(self, names, by_nutrient, prices, lower, upper, columns):
+        self.names = list(names)
+        self.columns = list(columns)
+        self.column_index = {name: i for i, name in enumerate(self.columns)}
+        self.by_nutrient = np.ascontiguousarray(np.nan_to_num(by_nutrient), dtype=np.float64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_rows(cls, rows, columns=FEED_NUTRIENT_COLUMNS):
+        """(사료명, 가격, 최대 첨가율(%), 영양소...) 행 목록에서 생성 (영양소별로 한 번에 변환)"""
+        rows = list(rows)
+        names = [row[0] for row in rows]
+        prices = np.array([row[1] if row[1] is not None else np.nan for row in rows], dtype=np.float64)
+        max_rates = np.array([row[2] if row[2] is not None else 100.0 for row in rows], dtype=np.float64)
+        by_nutrient = np.empty((len(columns), len(rows)), dtype=np.float64)
+        for k in range(len(columns)):
+            by_nutrient[k] = [np.nan if row[3 + k] is None else row[3 + k] for row in rows]
+        return cls(names, by_nutrient, prices, np.zeros(len(rows)), np.clip(max_rates / 100.0, 0.0, 1.0), columns)
+
+    def rows_for(self, nutrients):
+        """영양소 이름 목록에 해당하는 행렬 행 (알 수 없는 이름은 ValueError)"""
+        unknown = [name for name in nutrients if name not in self.column_index]
+        if unknown:
+            raise ValueError(f"알 수 없는 영양소 컬럼입니다: {', '.join(unknown)}")
+        return self.by_nutrient[[self.column_index[name] for name in nutrients]]
+
+
+def load_feed_library(conn, columns=FEED_NUTRIENT_COLUMNS):
+    """feeds + 최신 feed_prices 조회 (사료 라이브러리 서비스 DB 연결, 가격이 있는 활성 사료만)"""
+    unknown = [name for name in columns if name not in FEED_NUTRIENT_COLUMNS]
+    if unknown:
+        raise ValueError(f"알 수 없는 영양소 컬럼입니다: {', '.join(unknown)}")
+
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT f.name, p.price, f.max_inclusion_rate, {', '.join('f.' + name for name in columns)}
+        FROM feeds f
+        JOIN feed_prices p ON p.feed_id = f.id
+        WHERE f.is_active
+          AND p.price_date = (SELECT MAX(price_date) FROM feed_prices WHERE feed_id = f.id)
+        ORDER BY f.id
+    ''')
+    return NutrientLibrary.from_rows(cursor.fetchall(), columns)
+
+
+# 라이브러리 버전을 이루는 테이블 (사료 라이브러리 서비스 DB)
+LIBRARY_TABLES = ('feeds', 'feed_prices')
+
+# 사료 라이브러리 서비스 DB(PostgreSQL)의 변경 카운터: 문장마다 테이블 버전을 올리는 트리거
+LIBRARY_VERSION_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    )
+    ''',
+    f'''
+    INSERT INTO table_versions (table_name, version)
+    VALUES {', '.join(f"('{table}', 0)" for table in LIBRARY_TABLES)}
+    ON CONFLICT (table_name) DO NOTHING
+    ''',
+    '''
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END
+    $$
+    ''',
+] + [
+    statement
+    for table in LIBRARY_TABLES
+    for statement in (
+        f'DROP TRIGGER IF EXISTS {table}_version ON {table}',
+        f'''
+        CREATE TRIGGER {table}_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        ''',
+    )
+]
+
+
+def install_library_versioning(conn):
+    """사료 라이브러리 서비스 DB에 table_versions와 트리거 생성 (스키마 생성 후 한 번, 테이블이 없으면 오류)"""
+    cursor = conn.cursor()
+    for statement in LIBRARY_VERSION_DDL:
+        cursor.execute(statement)
+    conn.commit()
+
+
+def library_version(conn):
+    """사료/가격 테이블 변경 감지용 버전
+
+    트리거 카운터가 설치되어 있으면 테이블별 변경 횟수, 없으면 (건수, 최대 ID, 마지막 수정 시각) 집계
+    (집계 방식은 feed_prices 의 제자리 UPDATE 를 감지하지 못한다).
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'table_versions'")
+    if cursor.fetchone()[0]:
+        cursor.execute(f'''
+            SELECT table_name, version FROM table_versions
+            WHERE table_name IN ({', '.join(f"'{table}'" for table in LIBRARY_TABLES)})
+        ''')
+        versions = dict(cursor.fetchall())
+        if all(table in versions for table in LIBRARY_TABLES):
+            return tuple(versions[table] for table in LIBRARY_TABLES)
+
+    cursor.execute('''
+        SELECT (SELECT COUNT(*) FROM feeds),
+               (SELECT MAX(id) FROM feeds),
+               (SELECT MAX(COALESCE(updated_at, created_at)) FROM feeds),
+               (SELECT COUNT(*) FROM feed_prices),
+               (SELECT MAX(id) FROM feed_prices),
+               (SELECT MAX(created_at) FROM feed_prices)
+    ''')
+    return ('aggregate', *cursor.fetchone())
+
+
+class NutrientLibraryCache:
+    """라이브러리 버전별 영양소 행렬 캐시 (버전이 바뀔 때만 다시 로드)"""
+
+    def __init__(self, loader=load_feed_library, versioner=library_version):
+        self.loader = loader
+        self.versioner = versioner
+        self._version = None
+        self._library = None
+        self._lock = threading.Lock()
+
+    def get(self, conn):
+        version = self.versioner(conn)
+        with self._lock:
+            if self._library is None or version != self._version:
+                self._library = self.loader(conn)
+                self._version = version
+            return self._library
+
+
+def build_constraint_lp(library, constraints):
+    """제약 명세로 선형계획 문제 생성 (종류별로 행을 한 번에 쌓음)"""
+    constraints = parse_constraints(constraints)
+    blocks, rhs = [], []
+
+    bounds = [c for c in constraints if isinstance(c, NutrientConstraint)]
+    mins = [c for c in bounds if c.minimum is not None]
+    maxs = [c for c in bounds if c.maximum is not None]
+    if mins:
+        blocks.append(-library.rows_for([c.nutrient for c in mins]))
+        rhs.append(-np.array([c.minimum for c in mins], dtype=np.float64))
+    if maxs:
+        blocks.append(library.rows_for([c.nutrient for c in maxs]))
+        rhs.append(np.array([c.maximum for c in maxs], dtype=np.float64))
+
+    # 비율 제약: lo·분모 - 분자 <= 0, 분자 - hi·분모 <= 0
+    ratios = [c for c in constraints if isinstance(c, RatioConstraint)]
+    for side in ('minimum', 'maximum'):
+        active = [c for c in ratios if getattr(c, side) is not None]
+        if not active:
+            continue
+        numerators = library.rows_for([c.numerator for c in active])
+        denominators = library.rows_for([c.denominator for c in active])
+        limits = np.array([getattr(c, side) for c in active], dtype=np.float64)[:, None]
+        blocks.append(limits * denominators - numerators if side == 'minimum' else numerators - limits * denominators)
+        rhs.append(np.zeros(len(active)))
+
+    n = len(library)
+    return LinearProgram(
+        c=library.prices,
+        A_ub=np.vstack(blocks) if blocks else np.zeros((0, n)),
+        b_ub=np.concatenate(rhs) if rhs else np.zeros(0),
+        A_eq=np.ones((1, n)),
+        b_eq=np.array([1.0]),
+        lower=library.lower,
+        upper=np.maximum(library.upper, library.lower)
+    )
+
+
+def _constrained_nutrients(constraints):
+    names = []
+    for c in constraints:
+        for name in ([c.nutrient] if isinstance(c, NutrientConstraint) else [c.numerator, c.denominator]):
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def optimize_nutrient_profile(library, constraints, solver=None):
+    """영양소 제약 명세에 대한 최소 비용 배합
+
+    가격이 없는 사료는 제외한다. 결과 'nutrients'에는 제약에 사용된 영양소 함량이 담긴다.
+    """
+    priced = np.flatnonzero(~np.isnan(library.prices))
+    if len(priced) < len(library):
+        library = NutrientLibrary([library.names[i] for i in priced], library.by_nutrient[:, priced],
+                                  library.prices[priced], library.lower[priced], library.upper[priced],
+                                  library.columns)
+
+    constraints = parse_constraints(constraints)
+    status, ratios = solve_lp(build_constraint_lp(library, constraints), solver)
+    if ratios is None:
+        return {
+            'status': 'infeasible',
+            'message': '주어진 제약조건으로 최적해를 찾을 수 없습니다.'
+        }
+
+    included = ratios > MIN_REPORTED_RATIO
+    ratios = np.where(included, ratios, 0.0)
+    nutrients = _constrained_nutrients(constraints)
+    supplied = library.rows_for(nutrients) @ ratios
+    return {
+        'status': 'success',
+        'formulation': {library.names[i]: float(ratios[i] * 100) for i in np.flatnonzero(included)},
+        'total_cost': float(library.prices @ ratios),
+        'nutrients': {name: float(supplied[k]) for k, name in enumerate(nutrients)}
+    }
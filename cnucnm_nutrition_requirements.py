@@ -4,9 +4,13 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
-import sqlite3
 import json
 
+from cnucnm_database import connect
+from cnucnm_nasem_requirements import calculate_total_requirements
+from cnucnm_bootstrap import Seed, bootstrap
+from cnucnm_requirements_pipeline import upsert_requirements, run_pipeline
+
 # 페이지 설정
 st.set_page_config(
     page_title="CNUCNM - 영양 요구량 계산",
@@ -41,44 +45,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def init_database():
-    """데이터베이스 초기화"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
-    cursor = conn.cursor()
-    
-    # 영양 요구량 계산 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS nutrition_requirements (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id INTEGER,
-            animal_name TEXT,
-            breed TEXT,
-            weight REAL,
-            age_months INTEGER,
-            production_stage TEXT,
-            milk_yield REAL,
-            pregnancy_stage INTEGER,
-            calculation_date TIMESTAMP,
-            requirements_data TEXT,
-            FOREIGN KEY (animal_id) REFERENCES animals (id)
-        )
-    ''')
-    
-    # NASEM 영양소 표준 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS nasem_standards (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nutrient_name TEXT,
-            unit TEXT,
-            category TEXT,
-            min_value REAL,
-            max_value REAL,
-            recommended_value REAL,
-            description TEXT
-        )
-    ''')
-    
-    # NASEM 표준 데이터 삽입 (기본값)
+def seed_nasem_standards(conn):
+    """NASEM 영양소 표준 기본값 (표준 표를 이 목록으로 교체)"""
     nasem_data = [
         ('CP', '%', '단백질', 12.0, 18.0, 16.0, '조단백질'),
         ('NDF', '%', '섬유질', 25.0, 35.0, 30.0, '중성세제불용성섬유'),
@@ -102,128 +70,36 @@ def init_database():
         ('Vit_E', 'IU/kg', '비타민', 15, 30, 22.5, '비타민 E')
     ]
     
-    cursor.execute('DELETE FROM nasem_standards')
-    cursor.executemany('''
+    conn.execute('DELETE FROM nasem_standards')
+    conn.executemany('''
         INSERT INTO nasem_standards 
         (nutrient_name, unit, category, min_value, max_value, recommended_value, description)
         VALUES (?, ?, ?, ?, ?, ?, ?)
     ''', nasem_data)
-    
-    conn.commit()
-    conn.close()
 
-def calculate_maintenance_requirements(weight, breed_factor=1.0):
-    """유지 요구량 계산 (NASEM 2021 기준)"""
-    # 기초 대사율 (kcal/day)
-    basal_metabolic_rate = 70 * (weight ** 0.75)
-    
-    # 활동 요구량 (기초 대사율의 10-20%)
-    activity_requirement = basal_metabolic_rate * 0.15
-    
-    # 총 유지 요구량
-    maintenance_energy = (basal_metabolic_rate + activity_requirement) * breed_factor
-    
-    # 단백질 유지 요구량 (g/day)
-    maintenance_protein = 3.8 * (weight ** 0.75)
-    
-    return {
-        'energy_kcal': maintenance_energy,
-        'protein_g': maintenance_protein,
-        'dry_matter_kg': weight * 0.02  # 체중의 2%
-    }
+SEEDS = [
+    Seed('nasem_standards', 1, seed_nasem_standards),
+]
 
-def calculate_production_requirements(production_stage, milk_yield=0, pregnancy_stage=0):
-    """생산 요구량 계산"""
-    production_energy = 0
-    production_protein = 0
-    
-    if production_stage == "유우":
-        # 유우 에너지 요구량 (kcal/kg milk)
-        energy_per_kg_milk = 750
-        production_energy = milk_yield * energy_per_kg_milk
-        
-        # 유우 단백질 요구량 (g/kg milk)
-        protein_per_kg_milk = 85
-        production_protein = milk_yield * protein_per_kg_milk
-        
-    elif production_stage == "임신":
-        # 임신 단계별 요구량 증가
-        pregnancy_factors = {
-            1: 0.1,  # 1-3개월: 10% 증가
-            2: 0.2,  # 4-6개월: 20% 증가
-            3: 0.4   # 7-9개월: 40% 증가
-        }
-        factor = pregnancy_factors.get(pregnancy_stage, 0.1)
-        production_energy = 5000 * factor  # 기본 임신 에너지 요구량
-        production_protein = 200 * factor   # 기본 임신 단백질 요구량
-        
-    elif production_stage == "성장":
-        # 성장 요구량 (체중 증가 1kg당)
-        production_energy = 3000  # kcal/kg 체중 증가
-        production_protein = 150   # g/kg 체중 증가
-        
-    return {
-        'energy_kcal': production_energy,
-        'protein_g': production_protein
-    }
-
-def calculate_total_requirements(weight, age_months, production_stage, milk_yield=0, pregnancy_stage=0):
-    """총 영양 요구량 계산"""
-    # 유지 요구량
-    maintenance = calculate_maintenance_requirements(weight)
-    
-    # 생산 요구량
-    production = calculate_production_requirements(production_stage, milk_yield, pregnancy_stage)
-    
-    # 총 요구량
-    total_energy = maintenance['energy_kcal'] + production['energy_kcal']
-    total_protein = maintenance['protein_g'] + production['protein_g']
-    
-    # 건물 섭취량 (체중의 2-3%)
-    dry_matter_intake = weight * 0.025
-    
-    # 영양소 농도 계산
-    energy_concentration = total_energy / (dry_matter_intake * 1000)  # Mcal/kg DM
-    protein_concentration = (total_protein / 1000) / dry_matter_intake * 100  # % DM
-    
-    return {
-        'maintenance': maintenance,
-        'production': production,
-        'total': {
-            'energy_kcal': total_energy,
-            'energy_mcal': total_energy / 1000,
-            'protein_g': total_protein,
-            'protein_percent': protein_concentration,
-            'dry_matter_kg': dry_matter_intake
-        },
-        'concentrations': {
-            'energy_mcal_kg': energy_concentration,
-            'protein_percent': protein_concentration
-        }
-    }
+@st.cache_resource
+def init_database():
+    """데이터베이스 초기화 (프로세스당 한 번: 마이그레이션과 기본 데이터 적용)"""
+    return bootstrap(SEEDS)
 
 def save_requirements(animal_id, animal_name, breed, weight, age_months, 
                       production_stage, milk_yield, pregnancy_stage, requirements):
     """영양 요구량 계산 결과 저장"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO nutrition_requirements 
-        (animal_id, animal_name, breed, weight, age_months, production_stage, 
-         milk_yield, pregnancy_stage, calculation_date, requirements_data)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        animal_id, animal_name, breed, weight, age_months, production_stage,
-        milk_yield, pregnancy_stage, datetime.now(), json.dumps(requirements)
-    ))
-    
-    conn.commit()
+    conn = connect()
+    with conn:
+        upsert_requirements(conn, [(
+            animal_id, animal_name, breed, weight, age_months, production_stage,
+            milk_yield, pregnancy_stage, datetime.now(), json.dumps(requirements)
+        )])
     conn.close()
 
 def get_requirements_history():
     """영양 요구량 계산 기록 조회"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     df = pd.read_sql_query('''
         SELECT * FROM nutrition_requirements 
         ORDER BY calculation_date DESC 
@@ -340,12 +216,20 @@ def main():
             # NASEM 표준과 비교
             st.subheader("📋 NASEM 영양소 표준")
             
-            conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+            conn = connect()
             nasem_df = pd.read_sql_query('SELECT * FROM nasem_standards', conn)
             conn.close()
             
             st.dataframe(nasem_df, use_container_width=True)
     
+    # 새 체중 기록 반영
+    if st.sidebar.button("🔄 체중 기록 반영 재계산"):
+        summary = run_pipeline()
+        if summary['animals']:
+            st.sidebar.success(f"{summary['animals']}두의 영양 요구량을 다시 계산했습니다.")
+        else:
+            st.sidebar.info("새 체중 기록이 없습니다.")
+    
     # 계산 기록
     st.subheader("📚 최근 계산 기록")
     
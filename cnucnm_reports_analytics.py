@@ -7,7 +7,6 @@ CNUCNM 보고서 및 분석 시스템
 import streamlit as st
 import pandas as pd
 import numpy as np
-import sqlite3
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
@@ -15,6 +14,11 @@ from plotly.subplots import make_subplots
 import calendar
 from pathlib import Path
 
+from cnucnm_database import connect
+from cnucnm_bootstrap import Seed, bootstrap
+from cnucnm_rollups import read_rollups, performance_summary, monthly_performance
+import cnucnm_timeseries as timeseries
+
 # 페이지 설정
 st.set_page_config(
     page_title="CNUCNM 보고서 및 분석",
@@ -61,53 +65,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def init_database():
-    """데이터베이스 초기화"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+def seed_sample_growth(conn):
+    """성장 기록 샘플 데이터 (기록이 없을 때만)"""
     cursor = conn.cursor()
-    
-    # 동물 성장 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS growth_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            animal_id TEXT NOT NULL,
-            measurement_date DATE NOT NULL,
-            weight REAL NOT NULL,
-            daily_gain REAL,
-            feed_intake REAL,
-            feed_cost REAL,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 비용 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS cost_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            record_date DATE NOT NULL,
-            category TEXT NOT NULL,
-            description TEXT,
-            amount REAL NOT NULL,
-            animal_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 수익 기록 테이블
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS revenue_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            record_date DATE NOT NULL,
-            category TEXT NOT NULL,
-            description TEXT,
-            amount REAL NOT NULL,
-            animal_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # 샘플 데이터 생성
     if cursor.execute("SELECT COUNT(*) FROM growth_records").fetchone()[0] == 0:
         # 성장 기록 샘플 데이터
         sample_growth = [
@@ -127,7 +87,10 @@ def init_database():
                 INSERT INTO growth_records (animal_id, measurement_date, weight, daily_gain, feed_intake, feed_cost)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, record)
-    
+
+def seed_sample_costs(conn):
+    """비용 기록 샘플 데이터 (기록이 없을 때만)"""
+    cursor = conn.cursor()
     if cursor.execute("SELECT COUNT(*) FROM cost_records").fetchone()[0] == 0:
         # 비용 기록 샘플 데이터
         sample_costs = [
@@ -147,7 +110,10 @@ def init_database():
                 INSERT INTO cost_records (record_date, category, description, amount, animal_id)
                 VALUES (?, ?, ?, ?, ?)
             """, record)
-    
+
+def seed_sample_revenue(conn):
+    """수익 기록 샘플 데이터 (기록이 없을 때만)"""
+    cursor = conn.cursor()
     if cursor.execute("SELECT COUNT(*) FROM revenue_records").fetchone()[0] == 0:
         # 수익 기록 샘플 데이터 (도축 판매 시뮬레이션)
         sample_revenue = [
@@ -161,81 +127,39 @@ def init_database():
                 INSERT INTO revenue_records (record_date, category, description, amount, animal_id)
                 VALUES (?, ?, ?, ?, ?)
             """, record)
-    
-    conn.commit()
-    conn.close()
+
+SEEDS = [
+    Seed('sample_growth', 1, seed_sample_growth),
+    Seed('sample_costs', 1, seed_sample_costs),
+    Seed('sample_revenue', 1, seed_sample_revenue),
+]
+
+@st.cache_resource
+def init_database():
+    """데이터베이스 초기화 (프로세스당 한 번: 마이그레이션과 기본 데이터 적용)"""
+    return bootstrap(SEEDS)
 
 def calculate_monthly_performance(year, month):
-    """월간 성과 계산"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
-    
-    # 월간 비용
-    costs_df = pd.read_sql_query("""
-        SELECT category, SUM(amount) as total_amount
-        FROM cost_records 
-        WHERE strftime('%Y-%m', record_date) = ?
-        GROUP BY category
-    """, conn, params=[f"{year:04d}-{month:02d}"])
-    
-    # 월간 수익
-    revenue_df = pd.read_sql_query("""
-        SELECT category, SUM(amount) as total_amount
-        FROM revenue_records 
-        WHERE strftime('%Y-%m', record_date) = ?
-        GROUP BY category
-    """, conn, params=[f"{year:04d}-{month:02d}"])
-    
-    # 월간 성장 데이터
-    growth_df = pd.read_sql_query("""
-        SELECT animal_id, 
-               AVG(daily_gain) as avg_daily_gain,
-               SUM(feed_cost) as total_feed_cost,
-               COUNT(*) as measurement_count
-        FROM growth_records 
-        WHERE strftime('%Y-%m', measurement_date) = ?
-        GROUP BY animal_id
-    """, conn, params=[f"{year:04d}-{month:02d}"])
-    
+    """월간 성과 계산 (월간 집계표에서 조회)"""
+    conn = connect()
+    month_key = f"{year:04d}-{month:02d}"
+    rollups = read_rollups(conn, month_key, month_key)
     conn.close()
-    
-    total_cost = costs_df['total_amount'].sum() if not costs_df.empty else 0
-    total_revenue = revenue_df['total_amount'].sum() if not revenue_df.empty else 0
-    net_profit = total_revenue - total_cost
-    roi = (net_profit / total_cost * 100) if total_cost > 0 else 0
-    
-    avg_daily_gain = growth_df['avg_daily_gain'].mean() if not growth_df.empty else 0
-    total_feed_cost = growth_df['total_feed_cost'].sum() if not growth_df.empty else 0
-    
-    return {
-        'total_cost': total_cost,
-        'total_revenue': total_revenue,
-        'net_profit': net_profit,
-        'roi': roi,
-        'avg_daily_gain': avg_daily_gain,
-        'total_feed_cost': total_feed_cost,
-        'costs_by_category': costs_df,
-        'revenue_by_category': revenue_df,
-        'growth_data': growth_df
-    }
+    return performance_summary(rollups)
 
 def create_growth_trend_chart(animal_id, months=6):
     """동물별 성장 추이 차트 생성"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
+    timeseries.sync_from_database(conn, series=['growth'])
+    conn.close()
     
-    # 최근 N개월 데이터 조회
+    # 최근 N개월 데이터 조회 (시계열 저장소에서 열 배열로)
     end_date = datetime.now()
     start_date = end_date - timedelta(days=months*30)
     
-    growth_df = pd.read_sql_query("""
-        SELECT measurement_date, weight, daily_gain, feed_intake, feed_cost
-        FROM growth_records 
-        WHERE animal_id = ? AND measurement_date >= ?
-        ORDER BY measurement_date
-    """, conn, params=[animal_id, start_date.strftime('%Y-%m-%d')])
-    
-    conn.close()
+    growth_df = timeseries.scan(timeseries.STORE_PATH, 'growth', [animal_id], start_date, end_date)
     
-    if growth_df.empty:
+    if len(growth_df['animal_id']) == 0:
         return None
     
     # 성장 추이 차트
@@ -277,26 +201,38 @@ def create_growth_trend_chart(animal_id, months=6):
     fig.update_layout(height=600, title_text=f"{animal_id} 성장 추이 분석")
     return fig
 
+def create_growth_comparison_chart(animal_ids, months=24, days=7):
+    """여러 동물의 체중 추이 비교 차트 (days 일 평균)"""
+    conn = connect()
+    timeseries.sync_from_database(conn, series=['growth'])
+    conn.close()
+    
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=months*30)
+    
+    growth = timeseries.scan(timeseries.STORE_PATH, 'growth', animal_ids, start_date, end_date, columns=['weight'])
+    weights = timeseries.series_arrays(timeseries.downsample(growth, 'growth', days), 'growth', 'weight')
+    
+    if not weights:
+        return None
+    
+    fig = go.Figure()
+    for animal_id, (dates, values) in weights.items():
+        fig.add_trace(go.Scattergl(x=dates, y=values, mode='lines', name=str(animal_id)))
+    
+    fig.update_layout(height=500, title_text=f"체중 추이 비교 ({days}일 평균)",
+                      xaxis_title="날짜", yaxis_title="체중 (kg)")
+    return fig
+
 def create_roi_analysis_chart():
     """ROI 분석 차트 생성"""
-    conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+    conn = connect()
     
-    # 월별 ROI 데이터
-    roi_data = []
-    for year in [2024]:
-        for month in range(1, 13):
-            performance = calculate_monthly_performance(year, month)
-            roi_data.append({
-                'month': f"{year}-{month:02d}",
-                'roi': performance['roi'],
-                'net_profit': performance['net_profit'],
-                'total_cost': performance['total_cost']
-            })
+    # 월별 ROI 데이터 (기간 집계 행을 한 번에 조회)
+    roi_df = monthly_performance(conn, "2024-01", "2024-12")
     
     conn.close()
     
-    roi_df = pd.DataFrame(roi_data)
-    
     # ROI 추이 차트
     fig = make_subplots(
         rows=2, cols=1,
@@ -395,7 +331,7 @@ def main():
         
         if report_type == "동물별 성장 분석":
             # 동물 선택
-            conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+            conn = connect()
             animals_df = pd.read_sql_query("SELECT DISTINCT animal_id FROM growth_records", conn)
             conn.close()
             
@@ -407,6 +343,14 @@ def main():
                     st.plotly_chart(growth_chart, use_container_width=True)
                 else:
                     st.info("해당 동물의 성장 데이터가 없습니다.")
+            
+            compared_animals = st.multiselect("비교할 동물", animals_df['animal_id'].tolist())
+            if compared_animals:
+                comparison_chart = create_growth_comparison_chart(compared_animals)
+                if comparison_chart:
+                    st.plotly_chart(comparison_chart, use_container_width=True)
+                else:
+                    st.info("선택한 동물의 성장 데이터가 없습니다.")
         
         elif report_type == "ROI 분석":
             roi_chart = create_roi_analysis_chart()
@@ -450,7 +394,7 @@ def main():
         st.header("🔍 데이터 탐색")
         
         # 데이터베이스 연결
-        conn = sqlite3.connect('cnucnm_data/cnucnm.db')
+        conn = connect()
         
         # 성장 기록 조회
         st.subheader("성장 기록")
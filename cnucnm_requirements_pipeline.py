@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 영양 요구량 증분 재계산 파이프라인
+weight_records / growth_records 에 마지막 처리 이후 새로 들어온 체중 기록만 찾아
+해당 개체의 요구량을 우군 계산(calculate_requirements)으로 다시 계산하고,
+nutrition_requirements 에 한 트랜잭션으로 일괄 upsert 한다.
+
+실행: python cnucnm_requirements_pipeline.py [--db cnucnm_data/cnucnm.db] [--interval 86400]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from cnucnm_database import DB_PATH, connect
+from cnucnm_migrations import migrate
+from cnucnm_nasem_requirements import calculate_requirements, requirements_record
+
+# 체중 원천 테이블: (테이블, animals 와 연결할 열)
+# weight_records.animal_id 는 animals.id, growth_records.animal_id 는 animals.animal_id (개체 번호)
+WEIGHT_SOURCES = (
+    ('weight_records', 'id'),
+    ('growth_records', 'animal_id'),
+)
+
+DEFAULT_PRODUCTION_STAGE = '유지'
+DAYS_PER_MONTH = 30.4375
+
+REQUIREMENT_COLUMNS = ('animal_id', 'animal_name', 'breed', 'weight', 'age_months', 'production_stage',
+                       'milk_yield', 'pregnancy_stage', 'calculation_date', 'requirements_data')
+
+# 같은 개체/계산일은 한 행으로 유지 (파이프라인을 다시 돌려도 중복되지 않음)
+UPSERT_REQUIREMENTS = f'''
+    INSERT INTO nutrition_requirements ({', '.join(REQUIREMENT_COLUMNS)})
+    VALUES ({', '.join('?' * len(REQUIREMENT_COLUMNS))})
+    ON CONFLICT (animal_id, calculation_date) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in REQUIREMENT_COLUMNS[1:])}
+'''
+
+
+def upsert_requirements(conn, rows):
+    """요구량 행(REQUIREMENT_COLUMNS 순서 튜플) 일괄 upsert (커밋은 호출하는 쪽에서)"""
+    conn.executemany(UPSERT_REQUIREMENTS, rows)
+
+
+def _watermarks(conn):
+    return dict(conn.execute('SELECT source_table, last_id FROM requirements_watermarks'))
+
+
+def _latest_weights(conn, source, key, last_id, high_id):
+    """새 기록이 있는 개체의 가장 최근 측정값 (새 기록이 아닌 과거 측정이 더 최근이면 그 값)"""
+    # SQLite 는 MAX() 집계와 함께 선택한 열을 최댓값 행에서 가져온다
+    return pd.read_sql_query(f'''
+        SELECT a.id AS animal_id, COALESCE(a.name, a.animal_id) AS animal_name, a.breed, a.birth_date,
+               s.weight, MAX(s.measurement_date) AS measurement_date
+        FROM {source} s
+        JOIN animals a ON a.{key} = s.animal_id
+        WHERE s.animal_id IN (SELECT animal_id FROM {source} WHERE id > ? AND id <= ?)
+        GROUP BY a.id
+    ''', conn, params=(last_id, high_id))
+
+
+def _production_context(conn, animal_ids):
+    """개체별 마지막 계산의 생산 단계/착유량/임신 단계/월령"""
+    if not len(animal_ids):
+        return pd.DataFrame(columns=['animal_id', 'production_stage', 'milk_yield', 'pregnancy_stage',
+                                     'last_age_months'])
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS affected_animals (animal_id INTEGER PRIMARY KEY)')
+    conn.execute('DELETE FROM affected_animals')
+    conn.executemany('INSERT OR IGNORE INTO affected_animals VALUES (?)', ((int(i),) for i in animal_ids))
+    return pd.read_sql_query('''
+        SELECT r.animal_id, r.production_stage, r.milk_yield, r.pregnancy_stage,
+               r.age_months AS last_age_months, MAX(r.id)
+        FROM nutrition_requirements r
+        JOIN affected_animals USING (animal_id)
+        GROUP BY r.animal_id
+    ''', conn).drop(columns='MAX(r.id)')
+
+
+def _age_months(birth_date, measurement_date, fallback):
+    """측정일 기준 월령 (생년월일이 없으면 마지막 계산의 월령)"""
+    days = (pd.to_datetime(measurement_date, errors='coerce') - pd.to_datetime(birth_date, errors='coerce')).dt.days
+    months = np.floor(days / DAYS_PER_MONTH)
+    return months.where(months.notna(), fallback)
+
+
+def requirement_rows(animals):
+    """개체 DataFrame → nutrition_requirements upsert 행 (요구량은 한 번의 열 단위 계산)"""
+    columns = calculate_requirements(
+        animals['weight'].to_numpy(dtype=np.float64),
+        animals['age_months'].to_numpy(),
+        animals['production_stage'].to_numpy(dtype=object),
+        animals['milk_yield'].to_numpy(dtype=np.float64),
+        animals['pregnancy_stage'].to_numpy()
+    )
+    rows = []
+    for i, animal in enumerate(animals.itertuples(index=False)):
+        age = None if pd.isna(animal.age_months) else int(animal.age_months)
+        rows.append((int(animal.animal_id), animal.animal_name, animal.breed, float(animal.weight), age,
+                     animal.production_stage, float(animal.milk_yield), int(animal.pregnancy_stage),
+                     animal.measurement_date, json.dumps(requirements_record(columns, i))))
+    return rows
+
+
+def run_pipeline(db_path=DB_PATH, conn=None):
+    """마지막 처리 위치 이후 새 체중 기록이 있는 개체만 재계산
+
+    반환값: {'animals': 재계산 두수, 'sources': {테이블: (이전 위치, 새 위치)}}
+    """
+    own_connection = conn is None
+    if own_connection:
+        conn = connect(db_path)
+    try:
+        # 요구량 테이블, upsert 용 고유 인덱스, 처리 위치 테이블, 원천 테이블 인덱스
+        migrate(conn)
+        # 읽기부터 쓰기까지 한 트랜잭션 (처리 중 들어온 기록은 다음 실행에서 처리)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            marks = _watermarks(conn)
+            latest, sources = [], {}
+            for source, key in WEIGHT_SOURCES:
+                last_id = marks.get(source, 0)
+                high_id = conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {source}').fetchone()[0]
+                if high_id <= last_id:
+                    continue
+                latest.append(_latest_weights(conn, source, key, last_id, high_id))
+                sources[source] = (last_id, high_id)
+
+            animals = pd.concat(latest, ignore_index=True) if latest else pd.DataFrame()
+            rows = []
+            if not animals.empty:
+                # 원천 테이블이 여럿이면 측정일이 가장 늦은 기록 사용
+                animals = (animals.sort_values('measurement_date', kind='stable')
+                           .drop_duplicates('animal_id', keep='last'))
+                animals = animals.merge(_production_context(conn, animals['animal_id']), on='animal_id', how='left')
+                animals['production_stage'] = animals['production_stage'].fillna(DEFAULT_PRODUCTION_STAGE)
+                animals['milk_yield'] = animals['milk_yield'].fillna(0.0)
+                animals['pregnancy_stage'] = animals['pregnancy_stage'].fillna(0)
+                animals['age_months'] = _age_months(animals['birth_date'], animals['measurement_date'],
+                                                    animals['last_age_months'])
+                rows = requirement_rows(animals)
+                upsert_requirements(conn, rows)
+
+            conn.executemany('''
+                INSERT INTO requirements_watermarks (source_table, last_id, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (source_table) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at
+            ''', [(source, high_id) for source, (_, high_id) in sources.items()])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return {'animals': len(rows), 'sources': sources}
+    finally:
+        if own_connection:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='새 체중 기록 기준 영양 요구량 증분 재계산')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--interval', type=float, help='주기 실행 간격(초), 지정하지 않으면 한 번만 실행')
+    args = parser.parse_args()
+
+    while True:
+        summary = run_pipeline(args.db)
+        ranges = ', '.join(f'{source} {start}→{end}' for source, (start, end) in summary['sources'].items())
+        print(f"요구량 재계산 {summary['animals']}두" + (f" ({ranges})" if ranges else ' (새 기록 없음)'))
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
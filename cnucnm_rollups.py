@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 월간 성과 집계표 (monthly_rollups)
+비용/수익/성장 기록을 월 × 분류 × 개체 단위로 미리 합산해 두고, 원본 테이블의 트리거가 행을 넣고/고치고/지울 때마다
+해당 집계 행만 갱신한다. 보고서는 기간에 해당하는 집계 행을 기본 키 범위로 한 번 읽어 ROI/비용/증체량을 계산한다.
+트리거 이전에 들어간 기록이나 외부에서 고친 기록은 rebuild_rollups() 로 다시 합산한다.
+
+실행: python cnucnm_rollups.py [--db cnucnm_data/cnucnm.db] [--from 2024-01] [--to 2024-12]
+"""
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cnucnm_database import DB_PATH, connect, month_range
+
+# 원본 테이블 → 집계 (category/gain 열이 없으면 None)
+RollupSource = namedtuple('RollupSource', ['table', 'source', 'date_column', 'category_column', 'amount_column',
+                                           'gain_column'])
+
+ROLLUP_SOURCES = (
+    RollupSource('cost_records', 'cost', 'record_date', 'category', 'amount', None),
+    RollupSource('revenue_records', 'revenue', 'record_date', 'category', 'amount', None),
+    RollupSource('growth_records', 'growth', 'measurement_date', None, 'feed_cost', 'daily_gain'),
+)
+
+ROLLUP_KEY = ('month', 'source', 'category', 'animal_id')
+ROLLUP_VALUES = ('record_count', 'amount', 'daily_gain_sum', 'daily_gain_count')
+
+# 월('YYYY-MM')이 기본 키 맨 앞이라 기간 조회는 기본 키 범위 검색 한 번
+ROLLUP_TABLE = '''
+    CREATE TABLE IF NOT EXISTS monthly_rollups (
+        month TEXT NOT NULL,
+        source TEXT NOT NULL,
+        category TEXT NOT NULL DEFAULT '',
+        animal_id TEXT NOT NULL DEFAULT '',
+        record_count INTEGER NOT NULL DEFAULT 0,
+        amount REAL NOT NULL DEFAULT 0,
+        daily_gain_sum REAL NOT NULL DEFAULT 0,
+        daily_gain_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (month, source, category, animal_id)
+    ) WITHOUT ROWID
+'''
+
+
+def _row_values(spec, row, sign):
+    """트리거의 NEW/OLD 행 → 집계 행 값 (sign=-1 이면 빼기)"""
+    category = f"COALESCE({row}.{spec.category_column}, '')" if spec.category_column else "''"
+    gain = (f'{sign} * COALESCE({row}.{spec.gain_column}, 0)', f'{sign} * ({row}.{spec.gain_column} IS NOT NULL)') \
+        if spec.gain_column else ('0', '0')
+    return (f'substr({row}.{spec.date_column}, 1, 7)', f"'{spec.source}'", category,
+            f"COALESCE({row}.animal_id, '')", f'{sign}', f'{sign} * COALESCE({row}.{spec.amount_column}, 0)') + gain
+
+
+def _upsert(spec, row, sign):
+    updates = ', '.join(f'{column} = {column} + excluded.{column}' for column in ROLLUP_VALUES)
+    statement = f'''
+            INSERT INTO monthly_rollups ({', '.join(ROLLUP_KEY + ROLLUP_VALUES)})
+            VALUES ({', '.join(_row_values(spec, row, sign))})
+            ON CONFLICT ({', '.join(ROLLUP_KEY)}) DO UPDATE SET {updates};'''
+    if sign < 0:
+        # 기록이 모두 빠진 집계 행은 지운다
+        month, source, category, animal_id = _row_values(spec, row, sign)[:4]
+        statement += f'''
+            DELETE FROM monthly_rollups
+            WHERE month = {month} AND source = {source} AND category = {category} AND animal_id = {animal_id}
+              AND record_count <= 0;'''
+    return statement
+
+
+def rollup_triggers(spec):
+    """원본 테이블 INSERT/UPDATE/DELETE 시 집계 행을 고치는 트리거 SQL 목록"""
+    prefix = f'trg_{spec.table}_rollup'
+    return [
+        f'DROP TRIGGER IF EXISTS {prefix}_insert',
+        f'DROP TRIGGER IF EXISTS {prefix}_update',
+        f'DROP TRIGGER IF EXISTS {prefix}_delete',
+        f'''CREATE TRIGGER {prefix}_insert AFTER INSERT ON {spec.table} BEGIN{_upsert(spec, 'NEW', 1)}
+        END''',
+        f'''CREATE TRIGGER {prefix}_update AFTER UPDATE ON {spec.table} BEGIN{_upsert(spec, 'OLD', -1)}{_upsert(spec, 'NEW', 1)}
+        END''',
+        f'''CREATE TRIGGER {prefix}_delete AFTER DELETE ON {spec.table} BEGIN{_upsert(spec, 'OLD', -1)}
+        END''',
+    ]
+
+
+def _date_bounds(start_month=None, end_month=None):
+    """'YYYY-MM' 기간(양끝 포함) → 날짜 조회 범위 (없는 쪽은 None)"""
+    start = month_range(*map(int, start_month.split('-')))[0] if start_month else None
+    end = month_range(*map(int, end_month.split('-')))[1] if end_month else None
+    return start, end
+
+
+def rebuild_rollups(conn, start_month=None, end_month=None):
+    """기간(기본: 전체)의 집계 행을 원본 테이블에서 다시 합산 (커밋은 호출하는 쪽에서)"""
+    start, end = _date_bounds(start_month, end_month)
+    for spec in ROLLUP_SOURCES:
+        conditions, params = [], []
+        if start:
+            conditions.append(f'{spec.date_column} >= ?')
+            params.append(start)
+        if end:
+            conditions.append(f'{spec.date_column} < ?')
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        month_conditions = ['source = ?'] + [condition for condition, value in
+                                            (('month >= ?', start_month), ('month <= ?', end_month)) if value]
+        conn.execute(f"DELETE FROM monthly_rollups WHERE {' AND '.join(month_conditions)}",
+                     [spec.source] + [value for value in (start_month, end_month) if value])
+        category = f"COALESCE({spec.category_column}, '')" if spec.category_column else "''"
+        gain = (f'COALESCE(SUM({spec.gain_column}), 0)', f'COUNT({spec.gain_column})') \
+            if spec.gain_column else ('0', '0')
+        conn.execute(f'''
+            INSERT INTO monthly_rollups ({', '.join(ROLLUP_KEY + ROLLUP_VALUES)})
+            SELECT substr({spec.date_column}, 1, 7), '{spec.source}', {category}, COALESCE(animal_id, ''),
+                   COUNT(*), COALESCE(SUM({spec.amount_column}), 0), {gain[0]}, {gain[1]}
+            FROM {spec.table}
+            {where}
+            GROUP BY 1, 3, 4
+        ''', params)
+
+
+def create_rollups(conn):
+    """집계 테이블과 트리거를 만들고 기존 기록 합산 (마이그레이션에서 호출)"""
+    conn.execute(ROLLUP_TABLE)
+    for spec in ROLLUP_SOURCES:
+        for statement in rollup_triggers(spec):
+            conn.execute(statement)
+    rebuild_rollups(conn)
+
+
+def read_rollups(conn, start_month, end_month):
+    """기간('YYYY-MM', 양끝 포함)의 집계 행 DataFrame"""
+    return pd.read_sql_query('SELECT * FROM monthly_rollups WHERE month >= ? AND month <= ?', conn,
+                             params=(start_month, end_month))
+
+
+def performance_summary(rollups):
+    """집계 행 → 성과 (calculate_monthly_performance 와 같은 형식, 기간 전체 합산)"""
+    def by_category(source):
+        rows = rollups[rollups['source'] == source]
+        return (rows.groupby('category', as_index=False)['amount'].sum()
+                .rename(columns={'amount': 'total_amount'}))
+
+    costs_df = by_category('cost')
+    revenue_df = by_category('revenue')
+    growth = rollups[rollups['source'] == 'growth']
+    growth_df = growth.groupby('animal_id', as_index=False)[['daily_gain_sum', 'daily_gain_count', 'amount',
+                                                             'record_count']].sum()
+    growth_df = pd.DataFrame({
+        'animal_id': growth_df['animal_id'],
+        'avg_daily_gain': growth_df['daily_gain_sum'] / growth_df['daily_gain_count'].replace(0, np.nan),
+        'total_feed_cost': growth_df['amount'],
+        'measurement_count': growth_df['record_count'],
+    })
+
+    total_cost = costs_df['total_amount'].sum() if not costs_df.empty else 0
+    total_revenue = revenue_df['total_amount'].sum() if not revenue_df.empty else 0
+    net_profit = total_revenue - total_cost
+    return {
+        'total_cost': total_cost,
+        'total_revenue': total_revenue,
+        'net_profit': net_profit,
+        'roi': (net_profit / total_cost * 100) if total_cost > 0 else 0,
+        'avg_daily_gain': growth_df['avg_daily_gain'].mean() if not growth_df.empty else 0,
+        'total_feed_cost': growth_df['total_feed_cost'].sum() if not growth_df.empty else 0,
+        'costs_by_category': costs_df,
+        'revenue_by_category': revenue_df,
+        'growth_data': growth_df,
+    }
+
+
+def monthly_performance(conn, start_month, end_month):
+    """기간('YYYY-MM', 양끝 포함)의 월별 성과 DataFrame (집계 행 기간 조회 한 번, 기록 없는 달은 0)
+
+    열: month, total_cost, total_revenue, net_profit, roi, avg_daily_gain, total_feed_cost
+    avg_daily_gain 은 개체별 월평균 증체량의 평균 (성장 집계 행은 월 × 개체마다 하나).
+    """
+    monthly = pd.read_sql_query('''
+        SELECT month,
+               COALESCE(SUM(CASE WHEN source = 'cost' THEN amount END), 0) AS total_cost,
+               COALESCE(SUM(CASE WHEN source = 'revenue' THEN amount END), 0) AS total_revenue,
+               COALESCE(AVG(CASE WHEN source = 'growth' AND daily_gain_count > 0
+                                 THEN daily_gain_sum / daily_gain_count END), 0) AS avg_daily_gain,
+               COALESCE(SUM(CASE WHEN source = 'growth' THEN amount END), 0) AS total_feed_cost
+        FROM monthly_rollups
+        WHERE month >= ? AND month <= ?
+        GROUP BY month
+    ''', conn, params=(start_month, end_month), index_col='month')
+    months = pd.period_range(start_month, end_month, freq='M').strftime('%Y-%m')
+    monthly = monthly.reindex(months, fill_value=0).rename_axis('month').reset_index()
+    monthly['net_profit'] = monthly['total_revenue'] - monthly['total_cost']
+    cost = monthly['total_cost'].where(monthly['total_cost'] > 0)
+    monthly['roi'] = (monthly['net_profit'] / cost * 100).fillna(0)
+    return monthly[['month', 'total_cost', 'total_revenue', 'net_profit', 'roi', 'avg_daily_gain',
+                    'total_feed_cost']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='월간 성과 집계표 다시 합산')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--from', dest='start_month', help='시작 월 YYYY-MM (기본: 전체)')
+    parser.add_argument('--to', dest='end_month', help='끝 월 YYYY-MM (포함)')
+    args = parser.parse_args()
+
+    from cnucnm_migrations import migrate   # 순환 import 방지 (마이그레이션이 이 모듈을 쓴다)
+
+    conn = connect(args.db)
+    migrate(conn)
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        rebuild_rollups(conn, args.start_month, args.end_month)
+    count = conn.execute('SELECT COUNT(*) FROM monthly_rollups').fetchone()[0]
+    conn.close()
+    print(f"집계 행 {count:,}개")
+
+
+if __name__ == '__main__':
+    main()
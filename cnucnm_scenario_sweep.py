@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 영양 시나리오 일괄 계산 (what-if 조회표)
+체중 × 착유량 × 임신 단계 × 사료 조건 격자를 구간(chunk)으로 나눠 프로세스 풀에서 계산하고,
+구간마다 Parquet 파일로 바로 저장한다. 중단된 계산은 같은 출력 폴더로 다시 실행하면 남은 구간만 계산한다.
+
+실행: python cnucnm_scenario_sweep.py grid.json 출력폴더 [--chunk-size 50000] [--workers 4] [--growth-days 365]
+grid.json 예: {"weight": [300, 400, 500], "milk_yield": [0, 20, 40], "ration_energy_mcal_kg": [2.2, 2.6]}
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cnucnm_nasem_requirements import calculate_requirements, REQUIREMENT_FIELDS
+from cnucnm_growth_simulation import simulate_growth
+
+SWEEP_VERSION = 1
+MANIFEST_NAME = '_sweep.json'
+DEFAULT_CHUNK_SIZE = 50000
+
+# 격자 축: 요구량 계산 인자 (기본값은 축이 없을 때 사용)
+REQUIREMENT_AXES = {'weight': None, 'age_months': 0, 'production_stage': '유지', 'milk_yield': 0.0,
+                    'pregnancy_stage': 0, 'breed_factor': 1.0}
+# 격자 축 → 성장 시뮬레이션 인자 (사료 농도 축은 요구 농도 결과 열과 구분되는 이름)
+GROWTH_AXES = {'ration_energy_mcal_kg': 'energy_mcal_kg', 'ration_protein_percent': 'protein_percent',
+               'intake_ratio': 'intake_ratio', 'gain_factor': 'gain_factor', 'mature_weight': 'mature_weight'}
+
+
+def grid_size(grid):
+    return int(np.prod([len(values) for values in grid.values()], dtype=np.int64))
+
+
+def validate_grid(grid):
+    """격자 축 이름/값 확인 (weight 축은 필수)"""
+    unknown = set(grid) - set(REQUIREMENT_AXES) - set(GROWTH_AXES)
+    if unknown:
+        raise ValueError(f"알 수 없는 격자 축: {sorted(unknown)}")
+    if 'weight' not in grid:
+        raise ValueError("격자에 weight 축이 필요합니다")
+    empty = [axis for axis, values in grid.items() if len(values) == 0]
+    if empty:
+        raise ValueError(f"값이 없는 격자 축: {empty}")
+
+
+def grid_chunk(grid, start, stop):
+    """격자 행 start..stop-1 의 축 값 배열 (마지막 축이 가장 빠르게 변한다)"""
+    index = np.unravel_index(np.arange(start, stop), [len(values) for values in grid.values()])
+    return {axis: np.asarray(values)[positions] for (axis, values), positions in zip(grid.items(), index)}
+
+
+def compute_chunk(grid, start, stop, growth_days=None):
+    """격자 한 구간 계산, 반환값: {열 이름: 배열} (요구량/성장 결과는 float32)"""
+    axes = grid_chunk(grid, start, stop)
+    columns = {'scenario': np.arange(start, stop, dtype=np.int64)}
+    columns.update(axes)
+
+    inputs = {name: axes.get(name, default) for name, default in REQUIREMENT_AXES.items()}
+    requirements = calculate_requirements(**inputs)
+    for name in REQUIREMENT_FIELDS:
+        columns[name] = requirements[name].astype(np.float32)
+
+    if growth_days:
+        growth_inputs = {argument: axes[axis] for axis, argument in GROWTH_AXES.items() if axis in axes}
+        simulation = simulate_growth(inputs['weight'], days=growth_days, production_stage=inputs['production_stage'],
+                                     milk_yield=inputs['milk_yield'], pregnancy_stage=inputs['pregnancy_stage'],
+                                     breed_factor=inputs['breed_factor'], **growth_inputs)
+        columns['final_weight'] = simulation.weights[-1]
+        columns['average_daily_gain'] = simulation.daily_gain.mean(axis=0, dtype=np.float64).astype(np.float32)
+        columns['cumulative_dry_matter_kg'] = (simulation.dry_matter_intake.sum(axis=0, dtype=np.float64)
+                                               .astype(np.float32))
+    return columns
+
+
+def _part_path(output_dir, chunk):
+    return Path(output_dir) / f'part-{chunk:06d}.parquet'
+
+
+def _write_part(output_dir, chunk, columns):
+    """구간 결과를 임시 파일에 쓴 뒤 이름 변경 (완성된 파일만 남는다)"""
+    path = _part_path(output_dir, chunk)
+    temporary = path.with_name(f'.{path.name}.tmp')   # '.' 으로 시작하는 파일은 읽을 때 제외된다
+    pq.write_table(pa.table(columns), temporary)
+    os.replace(temporary, path)
+
+
+def _prepare_output(output_dir, manifest):
+    """출력 폴더와 설정 기록, 같은 설정으로 중단된 계산이면 완료된 구간 번호 반환"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing != manifest:
+            raise ValueError(f"{output_dir} 에 다른 설정의 계산 결과가 있습니다")
+    else:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return {chunk for chunk in range(manifest['chunks']) if _part_path(output_dir, chunk).exists()}
+
+
+def run_sweep(grid, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None, growth_days=None,
+              progress=None):
+    """격자 전체 계산 (이미 저장된 구간은 건너뜀)
+
+    grid: {축 이름: 값 목록} (순서가 행 순서를 정한다), growth_days 를 주면 성장 시뮬레이션 요약도 계산한다.
+    max_workers=1 이면 프로세스 풀 없이 현재 프로세스에서 계산한다.
+    progress(완료 구간 수, 전체 구간 수) 는 구간을 저장할 때마다 호출된다.
+    반환값: {'scenarios', 'chunks', 'computed', 'resumed'}
+    """
+    grid = {axis: np.asarray(values).tolist() for axis, values in grid.items()}
+    validate_grid(grid)
+    total = grid_size(grid)
+    n_chunks = -(-total // chunk_size)
+    manifest = {'version': SWEEP_VERSION, 'grid': grid, 'chunk_size': chunk_size, 'growth_days': growth_days,
+                'scenarios': total, 'chunks': n_chunks}
+    done = _prepare_output(output_dir, manifest)
+    pending = [chunk for chunk in range(n_chunks) if chunk not in done]
+    completed = len(done)
+
+    def bounds(chunk):
+        return chunk * chunk_size, min((chunk + 1) * chunk_size, total)
+
+    def finished(chunk, columns):
+        nonlocal completed
+        _write_part(output_dir, chunk, columns)
+        completed += 1
+        if progress is not None:
+            progress(completed, n_chunks)
+
+    if max_workers == 1:
+        for chunk in pending:
+            finished(chunk, compute_chunk(grid, *bounds(chunk), growth_days))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # 결과가 메모리에 쌓이지 않도록 작업자 수의 두 배까지만 제출
+            in_flight = 2 * (max_workers or os.cpu_count() or 1)
+            queue = iter(pending)
+            futures = {}
+            while True:
+                for chunk in queue:
+                    futures[executor.submit(compute_chunk, grid, *bounds(chunk), growth_days)] = chunk
+                    if len(futures) >= in_flight:
+                        break
+                if not futures:
+                    break
+                ready, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in ready:
+                    finished(futures.pop(future), future.result())
+
+    return {'scenarios': total, 'chunks': n_chunks, 'computed': len(pending), 'resumed': len(done)}
+
+
+def read_sweep(output_dir, columns=None, filters=None):
+    """저장된 계산 결과를 scenario 순서의 DataFrame 으로 읽기 (filters 는 pyarrow 조건)"""
+    table = pq.read_table(output_dir, columns=columns, filters=filters)
+    frame = table.to_pandas()
+    if 'scenario' in frame:
+        frame = frame.sort_values('scenario', ignore_index=True)
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description='영양 시나리오 격자 일괄 계산')
+    parser.add_argument('grid', help='격자 JSON 파일 ({축 이름: 값 목록})')
+    parser.add_argument('output_dir')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--growth-days', type=int, help='성장 시뮬레이션 일수 (지정하지 않으면 요구량만 계산)')
+    args = parser.parse_args()
+
+    with open(args.grid, encoding='utf-8') as f:
+        grid = json.load(f)
+    summary = run_sweep(grid, args.output_dir, args.chunk_size, args.workers, args.growth_days,
+                        progress=lambda done, total: print(f"\r구간 {done}/{total}", end='', flush=True))
+    print(f"\n시나리오 {summary['scenarios']:,}개: 구간 {summary['computed']}개 계산, "
+          f"{summary['resumed']}개는 이전 결과 사용")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,8 @@ import hashlib
 import os
 from pathlib import Path
 
+from cnucnm_migrations import migrate
+
 # 페이지 설정
 st.set_page_config(
     page_title="CNUCNM 사용자 관리 시스템",
@@ -29,36 +31,8 @@ def init_database():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # 사용자 테이블 생성
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            username TEXT UNIQUE NOT NULL,
-            hashed_password TEXT NOT NULL,
-            first_name TEXT,
-            last_name TEXT,
-            phone TEXT,
-            role TEXT DEFAULT 'farmer',
-            status TEXT DEFAULT 'active',
-            farm_name TEXT,
-            farm_address TEXT,
-            farm_size INTEGER,
-            farm_type TEXT,
-            is_email_verified BOOLEAN DEFAULT 0,
-            is_phone_verified BOOLEAN DEFAULT 0,
-            is_active BOOLEAN DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login_at TIMESTAMP,
-            profile_image_url TEXT,
-            language TEXT DEFAULT 'ko',
-            timezone TEXT DEFAULT 'Asia/Seoul',
-            notification_email BOOLEAN DEFAULT 1,
-            notification_sms BOOLEAN DEFAULT 0,
-            notification_push BOOLEAN DEFAULT 1
-        )
-    ''')
+    # 사용자 테이블
+    migrate(conn)
     
     # 관리자 계정 생성 (존재하지 않는 경우)
     cursor.execute("SELECT id FROM users WHERE email = 'admin@cnucnm.com'")
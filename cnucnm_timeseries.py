@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+CNUCNM 개체별 측정 시계열 저장소 (열 기반, 월 단위 NumPy memmap)
+growth_records / weight_records 를 월 폴더별 구간(segment)으로 추가 저장하고, 차트는 SQLite/pandas 대신
+여기서 개체 × 기간을 열 배열 조각으로 읽는다.
+
+    {root}/{시계열}/{YYYY-MM}/part-{첫 id}-{끝 id}/
+        animals.npy   정렬된 개체 키
+        offsets.npy   개체별 행 시작 위치 (len(animals) + 1)
+        dates.npy     측정일 datetime64[D] (개체 안에서 날짜 순서)
+        {값 열}.npy   float32 (결측은 NaN)
+
+구간은 임시 폴더에 쓴 뒤 이름을 바꿔 완성된 것만 보이고, 쓴 뒤에는 바뀌지 않아 memmap 으로 열어 프로세스 안에서 재사용한다.
+폴더 이름의 id 범위가 SQLite 에서 가져온 위치(high-water mark)이고, 같은 달의 다른 구간 범위에 포함되는 구간은
+압축(compact) 도중 남은 것이므로 읽지 않는다. 동기화할 때 구간이 많아진 월은 자동으로 합친다.
+원본에서 기록을 고치거나 지우면 table_versions 의 수정 버전(마이그레이션 7 트리거)이 올라가고, 동기화할 때
+{root}/{시계열}/source_version 과 다르면 그 시계열을 지우고 다시 가져온다.
+
+실행: python cnucnm_timeseries.py [--db cnucnm_data/cnucnm.db] [--root cnucnm_data/timeseries] [--compact] [--rebuild]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cnucnm_database import DB_PATH, connect
+
+STORE_PATH = 'cnucnm_data/timeseries'
+SYNC_CHUNK_ROWS = 500000
+
+# 시계열: SQLite 원본 테이블, 개체 키 형식, 측정일 열, 값 열 (float32 로 저장)
+TimeSeries = namedtuple('TimeSeries', ['name', 'table', 'animal_dtype', 'date_column', 'value_columns'])
+
+SERIES = {
+    # growth_records.animal_id 는 개체 번호(TEXT), weight_records.animal_id 는 animals.id
+    'growth': TimeSeries('growth', 'growth_records', np.str_, 'measurement_date',
+                         ('weight', 'daily_gain', 'feed_intake', 'feed_cost')),
+    'weight': TimeSeries('weight', 'weight_records', np.int64, 'measurement_date', ('weight',)),
+}
+
+PART_PATTERN = re.compile(r'part-(\d+)-(\d+)$')
+# 저장소를 만든 원본의 수정 버전 파일
+SOURCE_VERSION_FILE = 'source_version'
+# 월 폴더의 구간이 이보다 많아지면 동기화 때 합친다
+COMPACT_PARTS = 8
+
+Segment = namedtuple('Segment', ['animals', 'offsets', 'dates', 'values'])
+
+# 열어 둔 구간 {월 폴더: {경로: (폴더 mtime, Segment)}}, 목록에서 사라진 구간은 월 폴더를 읽을 때 뺀다
+_segments = {}
+# Streamlit 세션(스레드)이 동시에 같은 범위를 추가하지 않도록 (프로세스 사이는 SQLite 쓰기 잠금)
+_write_lock = threading.Lock()
+
+
+def _list_parts(month_dir):
+    """월 폴더의 구간 ([(첫 id, 끝 id, 경로)] 유효한 것, [경로] 다른 구간 범위에 포함되는 것)"""
+    parts = []
+    for entry in os.scandir(month_dir):
+        match = PART_PATTERN.match(entry.name)
+        if match and entry.is_dir():
+            parts.append((int(match.group(1)), int(match.group(2)), entry.path))
+    hidden = [part for part in parts
+              if any(other is not part and other[0] <= part[0] and part[1] <= other[1] for other in parts)]
+    return sorted(part for part in parts if part not in hidden), [path for _, _, path in hidden]
+
+
+def _month_parts(month_dir):
+    """월 폴더의 유효한 구간 [(첫 id, 끝 id, 경로)] (다른 구간 범위에 포함되는 구간 제외)"""
+    return _list_parts(month_dir)[0]
+
+
+def _months(root, series, start_month=None, end_month=None):
+    """저장된 월 폴더 {YYYY-MM: 경로} (기간 안의 것만)"""
+    base = Path(root) / series
+    if not base.exists():
+        return {}
+    return {entry.name: entry.path for entry in sorted(os.scandir(base), key=lambda entry: entry.name)
+            if entry.is_dir() and (start_month is None or entry.name >= start_month)
+            and (end_month is None or entry.name <= end_month)}
+
+
+def last_record_id(root, series):
+    """저장소에 들어간 마지막 원본 id (구간 이름의 끝 id 최댓값)"""
+    return max((end for month_dir in _months(root, series).values() for _, end, _ in _month_parts(month_dir)),
+               default=0)
+
+
+def _write_segment(path, series, animals, dates, values):
+    """(개체, 측정일) 순서로 정렬해 구간 폴더 쓰기 (임시 폴더에 쓴 뒤 이름 변경)
+
+    다른 프로세스가 같은 구간을 먼저 만들었으면 그대로 둔다 (같은 id 범위는 같은 내용).
+    """
+    order = np.lexsort((dates, animals))
+    animals, dates = animals[order], dates[order]
+    keys, starts = np.unique(animals, return_index=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = Path(tempfile.mkdtemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent))
+    try:
+        np.save(temporary / 'animals.npy', keys)
+        np.save(temporary / 'offsets.npy', np.append(starts, len(animals)).astype(np.int64))
+        np.save(temporary / 'dates.npy', dates)
+        for column in SERIES[series].value_columns:
+            np.save(temporary / f'{column}.npy', values[column][order])
+        os.replace(temporary, path)
+    except OSError:
+        shutil.rmtree(temporary, ignore_errors=True)
+        if not path.is_dir():
+            raise
+
+
+def _load_segment(cache, path):
+    """구간 memmap (폴더가 다시 만들어졌을 때만 새로 연다)"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = cache.get(path)
+    if cached is None or cached[0] != mtime:
+        files = {entry.name[:-4]: entry.path for entry in os.scandir(path) if entry.name.endswith('.npy')}
+        segment = Segment(np.load(files.pop('animals'), mmap_mode='r'), np.load(files.pop('offsets'), mmap_mode='r'),
+                          np.load(files.pop('dates'), mmap_mode='r'),
+                          {column: np.load(file, mmap_mode='r') for column, file in files.items()})
+        cached = cache[path] = (mtime, segment)
+    return cached[1]
+
+
+def _month_segments(month_dir, attempts=3):
+    """월 폴더의 유효한 구간 [((첫 id, 끝 id, 경로), Segment)]
+
+    다른 프로세스가 압축하며 지운 구간을 만나면 목록을 다시 읽는다.
+    """
+    for attempt in range(attempts):
+        parts = _month_parts(month_dir)
+        cache = _segments.setdefault(month_dir, {})
+        for path in set(cache) - {path for _, _, path in parts}:
+            del cache[path]
+        try:
+            return [(part, _load_segment(cache, part[2])) for part in parts]
+        except FileNotFoundError:
+            if attempt == attempts - 1:
+                raise
+
+
+def append(root, series, records, first_id, last_id):
+    """원본 id first_id+1..last_id 기록을 월별 구간으로 추가
+
+    records: animal_id, 측정일, 값 열을 가진 DataFrame. 개체나 측정일을 읽을 수 없는 행은 버린다.
+    반환값: 구간을 쓴 월 ('YYYY-MM') 목록
+    """
+    spec = SERIES[series]
+    animals = records['animal_id']
+    if spec.animal_dtype is not np.str_:
+        animals = pd.to_numeric(animals, errors='coerce')
+    dates = pd.to_datetime(records[spec.date_column], errors='coerce', format='mixed')
+    records = records.assign(animal_id=animals, **{spec.date_column: dates}).dropna(
+        subset=['animal_id', spec.date_column])
+    dates = records[spec.date_column].to_numpy().astype('datetime64[D]')
+    animals = records['animal_id'].to_numpy().astype(spec.animal_dtype)
+    values = {column: pd.to_numeric(records[column], errors='coerce').to_numpy(np.float32, na_value=np.nan)
+              for column in spec.value_columns}
+    months = dates.astype('datetime64[M]')
+    written = []
+    for month in np.unique(months):
+        rows = months == month
+        _write_segment(Path(root) / series / str(month) / f'part-{first_id + 1:012d}-{last_id:012d}', series,
+                       animals[rows], dates[rows], {column: array[rows] for column, array in values.items()})
+        written.append(str(month))
+    return written
+
+
+def _source_version(conn, table):
+    """원본 테이블의 수정/삭제 버전 (트리거가 없으면 None)"""
+    row = conn.execute('SELECT version FROM table_versions WHERE table_name = ?', (table,)).fetchone()
+    return row[0] if row else None
+
+
+def _stored_version(root, series):
+    try:
+        return int((Path(root) / series / SOURCE_VERSION_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _reset_series(root, series, version=None):
+    """시계열 폴더를 비우고 열어 둔 구간을 버림 (version 이 있으면 새 폴더에 기록)"""
+    base = Path(root) / series
+    shutil.rmtree(base, ignore_errors=True)
+    for month_dir in [path for path in _segments if Path(path).parent == base]:
+        del _segments[month_dir]
+    if version is not None:
+        base.mkdir(parents=True, exist_ok=True)
+        temporary = base / f'.{SOURCE_VERSION_FILE}.{os.getpid()}.tmp'
+        temporary.write_text(str(version))
+        os.replace(temporary, base / SOURCE_VERSION_FILE)
+
+
+def sync_from_database(conn, root=STORE_PATH, series=None):
+    """SQLite 원본에서 저장소 이후 들어온 기록만 추가 (SYNC_CHUNK_ROWS 개씩 구간으로 끊어 중단돼도 이어서)
+
+    원본 기록이 수정/삭제되어 수정 버전이 바뀌었으면 그 시계열을 비우고 처음부터 다시 가져온다.
+    구간이 COMPACT_PARTS 개를 넘은 월은 바로 합친다.
+    반환값: {시계열: 추가한 행 수}
+    """
+    added = {}
+    with _write_lock:
+        for name in series or SERIES:
+            spec = SERIES[name]
+            added[name] = 0
+            touched = set()
+            version = _source_version(conn, spec.table)
+            if version is not None and version != _stored_version(root, name):
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    version = _source_version(conn, spec.table)
+                    if version != _stored_version(root, name):
+                        _reset_series(root, name, version)
+                finally:
+                    conn.rollback()
+            while True:
+                high_id = conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {spec.table}').fetchone()[0]
+                if last_record_id(root, name) >= high_id:
+                    break
+                # 다른 프로세스(다른 Streamlit 앱)가 같은 범위를 쓰지 않도록 원본 쓰기 잠금을 잡은 뒤 다시 확인
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    last_id = last_record_id(root, name)
+                    chunk_end = min(last_id + SYNC_CHUNK_ROWS, high_id)
+                    if last_id < chunk_end:
+                        records = pd.read_sql_query(f'''
+                            SELECT animal_id, {spec.date_column}, {', '.join(spec.value_columns)}
+                            FROM {spec.table}
+                            WHERE id > ? AND id <= ?
+                        ''', conn, params=(last_id, chunk_end))
+                        touched.update(append(root, name, records, last_id, chunk_end))
+                        added[name] += len(records)
+                finally:
+                    conn.rollback()   # 읽기만 했으므로 잠금만 푼다
+            for month in sorted(touched):
+                month_dir = Path(root) / name / month
+                if len(_month_parts(month_dir)) > COMPACT_PARTS:
+                    _compact_month(name, str(month_dir))
+    return added
+
+
+def _compact_month(series, month_dir):
+    """월 폴더의 구간을 하나로 합치고 다른 구간 범위에 포함되는 구간을 지움, 반환값: 합쳤는지 여부"""
+    try:
+        loaded = _month_segments(month_dir)
+    except FileNotFoundError:
+        return False   # 다른 프로세스가 같은 월을 압축했다
+    merged = False
+    if len(loaded) >= 2:
+        segments = [segment for _, segment in loaded]
+        animals = np.concatenate([np.repeat(segment.animals, np.diff(segment.offsets)) for segment in segments])
+        dates = np.concatenate([segment.dates for segment in segments])
+        values = {column: np.concatenate([segment.values[column] for segment in segments])
+                  for column in SERIES[series].value_columns}
+        first, last = loaded[0][0][0], max(part[1] for part, _ in loaded)
+        _write_segment(Path(month_dir) / f'part-{first:012d}-{last:012d}', series, animals, dates, values)
+        merged = True
+    # 새 구간 범위에 포함되는 이전 구간은 지우기 전에 중단돼도 읽히지 않는다
+    hidden = _list_parts(month_dir)[1]
+    cache = _segments.get(month_dir, {})
+    for path in hidden:
+        cache.pop(path, None)
+        shutil.rmtree(path, ignore_errors=True)
+    return merged
+
+
+def compact(root=STORE_PATH, series=None, months=None):
+    """월 폴더마다 여러 구간을 하나로 합침
+
+    반환값: 합친 월 수
+    """
+    compacted = 0
+    with _write_lock:
+        for name in series or SERIES:
+            for month, month_dir in _months(root, name).items():
+                if months is None or month in months:
+                    compacted += _compact_month(name, month_dir)
+    return compacted
+
+
+def rebuild(conn, root=STORE_PATH, series=None):
+    """저장소를 지우고 원본 전체를 다시 가져와 압축"""
+    with _write_lock:
+        for name in series or SERIES:
+            _reset_series(root, name)
+    added = sync_from_database(conn, root, series)
+    compact(root, series)
+    return added
+
+
+def _empty(series, columns):
+    spec = SERIES[series]
+    return {'animal_id': np.empty(0, spec.animal_dtype), spec.date_column: np.empty(0, 'datetime64[D]'),
+            **{column: np.empty(0, np.float32) for column in columns}}
+
+
+def scan(root, series, animal_ids=None, start_date=None, end_date=None, columns=None):
+    """개체 × 기간(측정일, 양끝 포함) 범위 조회
+
+    반환값: {'animal_id', 측정일 열 (datetime64[D]), 값 열 (float32)} 배열 dict, (개체, 측정일) 순서.
+    columns 는 값 열 목록 (기본: 전체). 구간마다 개체 위치(offsets)로 필요한 행만 memmap 에서 읽는다.
+    """
+    spec = SERIES[series]
+    columns = list(columns or spec.value_columns)
+    start = np.datetime64(pd.Timestamp(start_date).date(), 'D') if start_date is not None else None
+    end = np.datetime64(pd.Timestamp(end_date).date(), 'D') if end_date is not None else None
+    month_dirs = _months(root, series, None if start is None else str(start.astype('datetime64[M]')),
+                         None if end is None else str(end.astype('datetime64[M]')))
+    wanted = np.unique(np.asarray(list(animal_ids), dtype=spec.animal_dtype)) if animal_ids is not None else None
+
+    animals, dates, values = [], [], {column: [] for column in columns}
+    for month_dir in month_dirs.values():
+        for _, segment in _month_segments(month_dir):
+            if wanted is None:
+                keys, counts, rows = segment.animals, np.diff(segment.offsets), slice(None)
+            else:
+                positions = np.searchsorted(segment.animals, wanted)
+                found = positions < len(segment.animals)
+                found[found] = segment.animals[positions[found]] == wanted[found]
+                positions = positions[found]
+                keys = wanted[found]
+                starts = segment.offsets[positions]
+                counts = segment.offsets[positions + 1] - starts
+                # 개체별 행 범위 [start, start + count) 를 이어 붙인 행 번호
+                rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            segment_dates = np.asarray(segment.dates[rows])
+            mask = np.ones(len(segment_dates), dtype=bool)
+            if start is not None:
+                mask &= segment_dates >= start
+            if end is not None:
+                mask &= segment_dates <= end
+            animals.append(np.repeat(keys, counts)[mask])
+            dates.append(segment_dates[mask])
+            for column in columns:
+                values[column].append(np.asarray(segment.values[column][rows])[mask])
+
+    if not animals:
+        return _empty(series, columns)
+    animals, dates = np.concatenate(animals), np.concatenate(dates)
+    # 월 구간을 이어 붙인 순서 (월, 개체, 측정일) → (개체, 측정일)
+    order = np.lexsort((dates, animals))
+    return {'animal_id': animals[order], spec.date_column: dates[order],
+            **{column: np.concatenate(parts)[order] for column, parts in values.items()}}
+
+
+def downsample(measurements, series, days=7):
+    """개체별 days 일 구간 평균 (구간 시작일 기준, 결측 제외, scan() 과 같은 형식)"""
+    spec = SERIES[series]
+    animals, dates = measurements['animal_id'], measurements[spec.date_column]
+    if len(animals) == 0:
+        return measurements
+    buckets = dates.astype(np.int64) // days * days
+    starts = np.flatnonzero(np.concatenate(([True], (animals[1:] != animals[:-1]) | (buckets[1:] != buckets[:-1]))))
+    result = {'animal_id': animals[starts], spec.date_column: buckets[starts].astype('datetime64[D]')}
+    for column in measurements:
+        if column in spec.value_columns:
+            values = measurements[column]
+            present = ~np.isnan(values)
+            sums = np.add.reduceat(np.where(present, values, 0).astype(np.float64), starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[column] = (sums / np.add.reduceat(present, starts)).astype(np.float32)
+    return result
+
+
+def series_arrays(measurements, series, value_column):
+    """{개체: (측정일 배열, 값 배열)}, scan()/downsample() 결과를 복사 없이 자른 조각이라 Plotly 에 그대로 넘긴다"""
+    animals = measurements['animal_id']
+    if len(animals) == 0:
+        return {}
+    dates, values = measurements[SERIES[series].date_column], measurements[value_column]
+    starts = np.flatnonzero(np.concatenate(([True], animals[1:] != animals[:-1])))
+    stops = np.append(starts[1:], len(animals))
+    return {animals[start].item(): (dates[start:stop], values[start:stop]) for start, stop in zip(starts, stops)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='측정 시계열 저장소 동기화')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--root', default=STORE_PATH)
+    parser.add_argument('--compact', action='store_true', help='동기화 후 월별 구간 합치기')
+    parser.add_argument('--rebuild', action='store_true', help='저장소를 지우고 원본 전체를 다시 가져오기')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    added = rebuild(conn, args.root) if args.rebuild else sync_from_database(conn, args.root)
+    conn.close()
+    print('추가: ' + ', '.join(f'{name} {count:,}행' for name, count in added.items()))
+    if args.compact and not args.rebuild:
+        print(f"합친 월 {compact(args.root)}개")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+수식 의존성 추적 엔드포인트
+"""
+import json
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.evaluation import FormulaTracer, load_tracer
+from app.schemas.formula import (
+    FormulaSummary, FormulaListResponse, TraceRequest, TraceResponse, CacheStatistics
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@lru_cache()
+def get_tracer() -> FormulaTracer:
+    """수식 추적기 (프로세스당 한 번 로드, 값 캐시 공유)"""
+    return load_tracer()
+
+@router.get("/", response_model=FormulaListResponse)
+def get_formulas(
+    level: Optional[int] = None,
+    tracer: FormulaTracer = Depends(get_tracer)
+):
+    """수식/입력값 목록 조회"""
+    formulas = []
+    for name in tracer.plan.names:
+        node = tracer.graph.nodes.get(name)
+        if level is not None and (node is None or node.level != level):
+            continue
+        formulas.append(FormulaSummary(
+            name=name,
+            expression=node.expression if node is not None else None,
+            description=node.description if node is not None else None,
+            level=node.level if node is not None else None,
+            is_input=name not in tracer.graph.nodes or node.is_input
+        ))
+    return FormulaListResponse(formulas=formulas, total=len(formulas))
+
+@router.post("/trace", response_model=TraceResponse)
+def trace_formula(
+    trace_request: TraceRequest,
+    request: Request,
+    tracer: FormulaTracer = Depends(get_tracer)
+):
+    """수식의 잎 입력값까지 의존성 하위 트리와 중간 값 조회
+
+    stream=true 이거나 Accept 헤더가 application/x-ndjson이면 노드를 한 줄씩 스트리밍한다.
+    """
+    try:
+        records = tracer.trace(trace_request.formula, trace_request.inputs, trace_request.max_depth)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if trace_request.stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        lines = (json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+    nodes = list(records)
+    return TraceResponse(formula=trace_request.formula, value=nodes[0]["value"], nodes=nodes)
+
+@router.get("/cache/stats", response_model=CacheStatistics)
+def get_cache_stats(tracer: FormulaTracer = Depends(get_tracer)):
+    """수식 값 캐시 통계"""
+    return tracer.stats()
+
+@router.delete("/cache")
+def clear_cache(tracer: FormulaTracer = Depends(get_tracer)):
+    """수식 값 캐시 비우기"""
+    tracer.clear()
+    logger.info("수식 값 캐시를 비웠습니다")
+    return {"message": "수식 값 캐시를 비웠습니다"}
@@ -0,0 +1,219 @@
+"""
+수식 값 계산 캐시와 의존성 추적
+수식 값을 (수식, 하위 트리의 잎 입력값) 단위로 메모이제이션해
+계층 뷰어에서 노드를 펼칠 때 이미 계산한 가지는 다시 계산하지 않는다.
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from cnucnm_formula_engine import DATABASE_JSON, DATABASE_SQL, load_formula_graph, load_formula_plan
+
+# 수식 DB 파일 위치 (기본값: 저장소 루트)
+FORMULA_DATABASE_DIR = Path(os.getenv("FORMULA_DATABASE_DIR") or os.getenv("CNUCNM_ROOT")
+                            or Path(__file__).resolve().parents[4])
+
+# 계산 계획 캐시 파일 (기본값: 수식 DB 옆, 수식 DB 디렉토리가 읽기 전용이면 쓰기 가능한 경로 지정)
+FORMULA_PLAN_CACHE = os.getenv("FORMULA_PLAN_CACHE")
+
+# 캐시할 수식 값 최대 개수
+DEFAULT_CACHE_SIZE = 100_000
+
+
+def _key_value(value):
+    """캐시 키용 값 (NaN/없음은 None으로 통일)"""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _json_value(value):
+    """JSON으로 보낼 수 있는 값 (NaN/inf는 None)"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class FormulaTracer:
+    """수식 그래프 의존성 추적기
+
+    수식 값 캐시 키는 (수식 슬롯, 하위 트리의 잎 입력값 튜플)이므로
+    관련 없는 입력값이 바뀌어도 캐시된 가지는 그대로 재사용된다.
+    """
+
+    def __init__(self, graph, cache_size: int = DEFAULT_CACHE_SIZE, plan=None):
+        self.graph = graph
+        self.plan = plan if plan is not None else graph.compile()
+        self.cache_size = cache_size
+        self._entries = OrderedDict()
+        self._leaves = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def leaf_slots(self, slot: int) -> tuple:
+        """슬롯 하위 트리의 입력값 슬롯 (정렬된 튜플, 입력값은 자기 자신)"""
+        dependencies = self.plan.dependency_slots
+        stack = [slot]
+        while stack:
+            current = stack[-1]
+            if current in self._leaves:
+                stack.pop()
+                continue
+            references = dependencies.get(current)
+            if references is None:
+                self._leaves[current] = (current,)
+                stack.pop()
+                continue
+            pending = [reference for reference in references if reference not in self._leaves]
+            if pending:
+                stack.extend(pending)
+                continue
+            self._leaves[current] = tuple(sorted(set().union(*(self._leaves[r] for r in references))))
+            stack.pop()
+        return self._leaves[slot]
+
+    def _slot_values(self, inputs: Optional[Dict[str, float]]) -> list:
+        for name in inputs or {}:
+            slot = self.plan.slots.get(name)
+            if slot is None:
+                raise KeyError(f"알 수 없는 입력값입니다: {name}")
+            if slot in self.plan.dependency_slots:
+                raise ValueError(f"계산 수식은 입력값으로 바꿀 수 없습니다: {name}")
+        return self.plan.initial_values(inputs)
+
+    def _compute(self, slot, computed):
+        function = self.plan.node_functions[slot]
+        try:
+            return function(computed)
+        except ZeroDivisionError:
+            references = self.plan.dependency_slots[slot]
+            with np.errstate(all='ignore'):
+                return float(function({r: np.float64(computed[r]) for r in references}))
+
+    def _evaluate(self, slot, values, computed, evaluated, descend=False):
+        """slot 하위 트리 값 계산 (캐시에 없는 수식만 계산, 계산한 슬롯은 evaluated에 추가)
+
+        descend=True이면 캐시된 수식의 하위 노드 값도 모두 computed에 채운다.
+        """
+        dependencies = self.plan.dependency_slots
+        expanded = set()
+        stack = [slot]
+        while stack:
+            current = stack[-1]
+            if current in computed:
+                stack.pop()
+                continue
+            references = dependencies.get(current)
+            if references is None:
+                computed[current] = values[current]
+                stack.pop()
+                continue
+
+            key = (current, tuple(_key_value(values[leaf]) for leaf in self.leaf_slots(current)))
+            if current not in expanded:
+                with self._lock:
+                    cached = self._entries.get(key, self._entries)
+                    if cached is not self._entries:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                if cached is not self._entries:
+                    computed[current] = cached
+                    stack.pop()
+                    if descend:
+                        # 추적 시 하위 노드 값도 필요 (캐시에서 조회)
+                        stack.extend(reference for reference in references if reference not in computed)
+                    continue
+                expanded.add(current)
+                stack.extend(reference for reference in references if reference not in computed)
+                continue
+
+            computed[current] = value = self._compute(current, computed)
+            evaluated.add(current)
+            stack.pop()
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = value
+                if len(self._entries) > self.cache_size:
+                    self._entries.popitem(last=False)
+
+    def value(self, name: str, inputs: Optional[Dict[str, float]] = None) -> float:
+        """수식 값 (캐시 사용)"""
+        slot = self.plan.slots[name]
+        computed = {}
+        self._evaluate(slot, self._slot_values(inputs), computed, set())
+        return computed[slot]
+
+    def trace(self, name: str, inputs: Optional[Dict[str, float]] = None,
+              max_depth: Optional[int] = None) -> Iterator[dict]:
+        """수식의 의존성 하위 트리 (깊이 우선, 노드마다 한 번)
+
+        값 계산은 호출 시점에 끝나고, 반환된 제너레이터는 노드 레코드만 차례로 만든다.
+        """
+        slot = self.plan.slots.get(name)
+        if slot is None:
+            raise KeyError(f"알 수 없는 수식입니다: {name}")
+        computed, evaluated = {}, set()
+        self._evaluate(slot, self._slot_values(inputs), computed, evaluated, descend=True)
+        return self._records(slot, computed, evaluated, max_depth)
+
+    def _records(self, root, computed, evaluated, max_depth):
+        names = self.plan.names
+        seen = set()
+        stack = [(root, 0, None)]
+        while stack:
+            slot, depth, parent = stack.pop()
+            if slot in seen:
+                continue
+            seen.add(slot)
+            name = names[slot]
+            node = self.graph.nodes.get(name)
+            references = self.plan.dependency_slots.get(slot)
+            is_formula = references is not None
+            references = references or []
+            yield {
+                "name": name,
+                "expression": node.expression if node is not None else None,
+                "description": node.description if node is not None else None,
+                "level": node.level if node is not None else None,
+                "is_input": not is_formula,
+                "kind": "formula" if is_formula else "input",
+                "value": _json_value(computed[slot]),
+                "depth": depth,
+                "parent": parent,
+                "dependencies": [names[reference] for reference in references],
+                # 입력값은 캐시 대상이 아님 (메모이제이션된 수식만 True)
+                "cached": is_formula and slot not in evaluated
+            }
+            if max_depth is None or depth < max_depth:
+                stack.extend((reference, depth + 1, name) for reference in reversed(references))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "formulas": len(self.plan),
+                "inputs": len(self.plan.inputs)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+def load_tracer(database_dir: Path = FORMULA_DATABASE_DIR,
+                cache_path: Optional[str] = FORMULA_PLAN_CACHE) -> FormulaTracer:
+    """수식 DB(JSON + SQL)로 추적기 생성 (계산 계획은 계획 캐시 파일 재사용)"""
+    json_path, sql_path = Path(database_dir) / DATABASE_JSON, Path(database_dir) / DATABASE_SQL
+    if cache_path:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    graph = load_formula_graph(json_path, sql_path)
+    return FormulaTracer(graph, plan=load_formula_plan(json_path, sql_path, cache_path=cache_path))
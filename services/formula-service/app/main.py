@@ -0,0 +1,90 @@
+"""
+수식 서비스 메인 애플리케이션
+"""
+import os
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가 (shared, cnucnm_formula_engine; 컨테이너에서는 CNUCNM_ROOT)
+project_root = os.getenv("CNUCNM_ROOT") or Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import uvicorn
+import logging
+
+from shared.common.config import settings
+from app.api.v1.endpoints import formulas
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """애플리케이션 생명주기 관리"""
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL.upper()), format=settings.LOG_FORMAT)
+    logger = logging.getLogger(__name__)
+    logger.info("수식 서비스 시작 중...")
+
+    # 수식 그래프 로드/컴파일
+    tracer = formulas.get_tracer()
+    logger.info(f"수식 그래프 로드 완료: 수식 {len(tracer.plan)}개, 입력값 {len(tracer.plan.inputs)}개")
+
+    yield
+
+    logger.info("수식 서비스가 종료되었습니다.")
+
+def create_application() -> FastAPI:
+    """FastAPI 애플리케이션 생성"""
+    app = FastAPI(
+        title="CNUCNM Formula Service",
+        description="수식 계산/의존성 추적 마이크로서비스",
+        version="1.0.0",
+        docs_url="/docs" if settings.DEBUG else None,
+        redoc_url="/redoc" if settings.DEBUG else None,
+        lifespan=lifespan
+    )
+
+    # CORS 미들웨어 설정
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
+        allow_methods=settings.CORS_ALLOW_METHODS,
+        allow_headers=settings.CORS_ALLOW_HEADERS,
+    )
+
+    # API 라우터 포함
+    app.include_router(formulas.router, prefix="/api/v1/formulas", tags=["formulas"])
+
+    @app.get("/health", tags=["Health"])
+    async def health_check():
+        """헬스 체크 엔드포인트"""
+        tracer = formulas.get_tracer()
+        return {
+            "status": "healthy",
+            "service": "formula",
+            "version": "1.0.0",
+            "formulas": len(tracer.plan)
+        }
+
+    @app.get("/", tags=["Root"])
+    async def root():
+        """루트 엔드포인트"""
+        return {
+            "message": "CNUCNM Formula Service",
+            "version": "1.0.0",
+            "docs": "/docs" if settings.DEBUG else None
+        }
+
+    return app
+
+app = create_application()
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        reload=settings.DEBUG,
+        log_level=settings.LOG_LEVEL.lower()
+    )
@@ -0,0 +1,48 @@
+"""
+수식 관련 Pydantic 스키마
+"""
+from typing import Optional, List, Dict
+from pydantic import BaseModel, Field
+
+class FormulaSummary(BaseModel):
+    name: str
+    expression: Optional[str] = None
+    description: Optional[str] = None
+    level: Optional[int] = None
+    is_input: bool
+
+class FormulaListResponse(BaseModel):
+    formulas: List[FormulaSummary]
+    total: int
+
+# 의존성 추적 스키마
+class TraceRequest(BaseModel):
+    formula: str = Field(..., min_length=1)
+    inputs: Dict[str, float] = Field(default_factory=dict)
+    max_depth: Optional[int] = Field(None, ge=0)
+    stream: bool = False  # True이면 NDJSON 스트리밍
+
+class TraceNode(BaseModel):
+    name: str
+    expression: Optional[str] = None
+    description: Optional[str] = None
+    level: Optional[int] = None
+    is_input: bool
+    kind: str  # "input" 또는 "formula"
+    value: Optional[float] = None  # NaN/inf는 None
+    depth: int
+    parent: Optional[str] = None
+    dependencies: List[str]
+    cached: bool  # 메모이제이션된 수식 값 사용 여부 (입력값은 항상 False)
+
+class TraceResponse(BaseModel):
+    formula: str
+    value: Optional[float] = None
+    nodes: List[TraceNode]
+
+class CacheStatistics(BaseModel):
+    entries: int
+    hits: int
+    misses: int
+    formulas: int
+    inputs: int